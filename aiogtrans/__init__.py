@@ -24,9 +24,11 @@ __all__ = (
     "LANGCODES",
     "LANGUAGES",
     "Translated",
+    "BatchTranslated",
     "Detected",
+    "Lookup",
 )
 
 from aiogtrans.client import Translator
 from aiogtrans.constants import LANGCODES, LANGUAGES
-from aiogtrans.models import Detected, Translated
+from aiogtrans.models import BatchTranslated, Detected, Lookup, Translated
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import argparse
+import logging
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="aiogtrans")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the translation gateway.")
+    serve.add_argument("--host", default="127.0.0.1", help="(Default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="(Default: 8080)")
+    serve.add_argument(
+        "--cache-mb",
+        type=int,
+        default=256,
+        help="Megabytes kept by the shared cache, 0 disables it. (Default: 256)",
+    )
+    serve.add_argument(
+        "--batch-window",
+        type=float,
+        default=5,
+        help="Milliseconds to collect requests into one upstream request, 0 disables it. (Default: 5)",
+    )
+    serve.add_argument(
+        "--batch-size", type=int, default=32, help="Texts per upstream request. (Default: 32)"
+    )
+    serve.add_argument(
+        "--retries", type=int, default=2, help="Retries per request. (Default: 2)"
+    )
+    serve.add_argument(
+        "--backend",
+        choices=("httpx", "aiohttp"),
+        default="httpx",
+        help="HTTP stack used for upstream requests. (Default: httpx)",
+    )
+    serve.add_argument("-v", "--verbose", action="store_true", default=False)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    if args.command == "serve":
+        from aiogtrans.server import serve as run
+
+        run(
+            host=args.host,
+            port=args.port,
+            cache_bytes=args.cache_mb * 1024 * 1024,
+            batch_window=args.batch_window / 1000 if args.batch_window else None,
+            batch_size=args.batch_size,
+            retries=args.retries,
+            backend=args.backend,
+        )
+
+
+if __name__ == "__main__":
+    main()
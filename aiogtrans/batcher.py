@@ -0,0 +1,124 @@
+"""
+Automatic micro-batching of independent requests
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import typing
+
+# send(items, key) must return one result or exception per item, in order
+SendFunction = typing.Callable[
+    [typing.List[typing.Hashable], typing.Hashable],
+    typing.Awaitable[typing.List[typing.Any]],
+]
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within a short window and sends them together
+    """
+
+    def __init__(self, send: SendFunction, window: float = 0.005, max_size: int = 32) -> None:
+        """Micro Batcher Init
+
+        Parameters
+        ----------
+        send: Callable
+            Coroutine function sending a list of items, returns a result or an exception per item
+        window: float
+            Seconds to wait for more items after the first one arrives
+            Default 0.005
+        max_size: int
+            A batch is sent right away once it holds this many items
+            Default 32
+
+        Returns
+        -------
+        None"""
+        self.send = send
+        self.window = window
+        self.max_size = max_size
+        self.batches = 0
+        self.items = 0
+        self._pending = {}
+        self._timers = {}
+        self._tasks = set()
+
+    async def submit(self, item: typing.Hashable, key: typing.Hashable = None) -> typing.Any:
+        """Queue an item and wait for its own result
+
+        Parameters
+        ----------
+        item: Hashable
+            The item to send, identical items in one batch are sent once
+        key: Hashable
+            Only items with the same key are batched together
+
+        Returns
+        -------
+        Any
+            The result for this item, its exception is raised instead if it failed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key: typing.Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(batch, key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list, key: typing.Hashable) -> None:
+        # Callers that already gave up are not sent
+        batch = [(item, future) for item, future in batch if not future.done()]
+        unique = list(dict.fromkeys(item for item, _ in batch))
+        if not unique:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.send(unique, key)
+        except Exception as e:
+            results = [e] * len(unique)
+        results = dict(zip(unique, results))
+
+        for item, future in batch:
+            if future.done():
+                continue
+            result = results.get(item)
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Send everything still queued and wait for it
+
+        Returns
+        -------
+        None"""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
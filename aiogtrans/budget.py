@@ -0,0 +1,219 @@
+"""
+Global budget of bytes held by requests in flight, callers wait while it is used up
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import collections
+import contextlib
+import typing
+
+# A request keeps the text, the form encoded f.req, the raw response, its frames and
+# the parsed JSON trees alive at the same time, several copies of every input byte
+RESPONSE_FACTOR = 8
+REQUEST_OVERHEAD = 2048
+# Raw response, its frames and the parsed trees, once the real response size is known
+PARSED_FACTOR = 3
+
+
+class BudgetExceeded(ValueError):
+    """
+    Raised for a single request larger than the whole byte budget that cannot be split
+    """
+
+
+def estimate(texts: typing.Iterable[str]) -> int:
+    """Bytes a request translating the texts keeps alive until its result is built
+
+    Parameters
+    ----------
+    texts: Iterable[str]
+        Texts sent in one request
+
+    Returns
+    -------
+    int"""
+    return REQUEST_OVERHEAD + sum(
+        len(text.encode("utf-8")) * RESPONSE_FACTOR + 256 for text in texts
+    )
+
+
+class Reservation:
+    """
+    Bytes held by one request, grown once the real response size is known
+    """
+
+    __slots__ = ("budget", "size")
+
+    def __init__(self, budget: "ByteBudget", size: int) -> None:
+        self.budget = budget
+        self.size = size
+
+    def grow_to(self, size: int) -> None:
+        """Account for a response larger than estimated, without waiting
+
+        Parameters
+        ----------
+        size: int
+            The new size of the reservation
+
+        Returns
+        -------
+        None"""
+        if size > self.size:
+            self.budget.in_use += size - self.size
+            self.budget.peak = max(self.budget.peak, self.budget.in_use)
+            self.size = size
+
+
+class ByteBudget:
+    """
+    Caps the bytes held by all requests in flight, shared by every API of one or more Translators.
+
+    Waiters are served first come first served, so a large request is not starved by small ones.
+    """
+
+    def __init__(self, capacity: int = 64 * 1024 * 1024) -> None:
+        """Byte Budget Init
+
+        Parameters
+        ----------
+        capacity: int
+            Bytes all requests in flight may hold together
+            Default 64 MiB
+
+        Returns
+        -------
+        None"""
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self._waiters = collections.deque()
+
+    def fits(self, size: int) -> bool:
+        """Whether a request of this size can ever be admitted
+
+        Parameters
+        ----------
+        size: int
+            Estimated bytes of the request
+
+        Returns
+        -------
+        bool"""
+        return size <= self.capacity
+
+    def stats(self) -> dict:
+        """Current usage of the budget
+
+        Returns
+        -------
+        dict
+            Capacity, bytes in use, the highest usage seen, queued callers and how often callers waited"""
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "peak": self.peak,
+            "waiting": len(self._waiters),
+            "waits": self.waits,
+        }
+
+    def _admit(self, size: int) -> None:
+        self.in_use += size
+        self.peak = max(self.peak, self.in_use)
+
+    async def acquire(self, size: int) -> Reservation:
+        """Wait until the request fits into the budget
+
+        Parameters
+        ----------
+        size: int
+            Estimated bytes of the request
+
+        Returns
+        -------
+        Reservation
+            Hand it back with release
+
+        Raises
+        ------
+        BudgetExceeded
+            The request is larger than the whole budget"""
+        if not self.fits(size):
+            raise BudgetExceeded(
+                f"Request of {size} bytes does not fit into a budget of {self.capacity} bytes"
+            )
+        if not self._waiters and self.in_use + size <= self.capacity:
+            self._admit(size)
+            return Reservation(self, size)
+
+        self.waits += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((size, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove((size, waiter))
+            else:
+                # Admitted while the caller gave up, hand the bytes back
+                self.in_use -= size
+            self._wake()
+            raise
+        return Reservation(self, size)
+
+    def release(self, reservation: Reservation) -> None:
+        """Return the bytes of a finished request
+
+        Parameters
+        ----------
+        reservation: Reservation
+            Value returned by acquire
+
+        Returns
+        -------
+        None"""
+        self.in_use -= reservation.size
+        reservation.size = 0
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            size, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + size > self.capacity and self.in_use > 0:
+                return
+            self._waiters.popleft()
+            self._admit(size)
+            waiter.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, size: int) -> typing.AsyncIterator[Reservation]:
+        """Context manager around acquire and release
+
+        Parameters
+        ----------
+        size: int
+            Estimated bytes of the request"""
+        reservation = await self.acquire(size)
+        try:
+            yield reservation
+        finally:
+            self.release(reservation)
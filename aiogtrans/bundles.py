@@ -0,0 +1,581 @@
+"""
+Bulk translation of i18n resource bundles, gettext PO files and nested JSON or YAML locale files
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import json
+import logging
+import os
+import re
+import typing
+
+from .client import Translator
+from .masking import Masker
+
+logger = logging.getLogger(__name__)
+
+# printf (%s, %d, %1$s, %(name)s, %%), format/ICU style ({name}, {0}, {count, number}) and {{name}}.
+# The space flag of printf is left out, it would turn "50% off" into a "% o" conversion.
+# ICU plural and select messages keep their structure: the selector with the first case key,
+# every "} key {" between cases and the closing braces are masked, the case texts are translated.
+INTERPOLATION_PATTERNS = (
+    r"%(?:\d+\$|\(\w+\))?[-+#0]*\d*(?:\.\d+)?[sdifFeEgGxXoucr%]",
+    r"\{\{\s*[\w.-]+\s*\}\}",
+    r"\{[\w.-]+\s*,\s*(?:plural|selectordinal|select)\s*,(?:\s*offset:\d+)?\s*(?:=\d+|[\w-]+)\s*\{",
+    r"\}\s*(?:=\d+|[\w-]+)\s*\{",
+    r"\}\s*\}",
+    r"\$?\{[\w.-]+(?:\s*,[^{}]*)?\}",
+)
+
+_ESCAPES = {"\\\\": "\\", '\\"': '"', "\\n": "\n", "\\t": "\t", "\\r": "\r"}
+_ESCAPE = re.compile(r"\\[\\\"ntr]")
+_KEYWORD = re.compile(r"^(msgctxt|msgid_plural|msgid|msgstr(?:\[(\d+)\])?)\s+(\".*\")\s*$")
+_NPLURALS = re.compile(r"nplurals\s*=\s*(\d+)")
+
+
+def _unquote(value: str) -> str:
+    return _ESCAPE.sub(lambda match: _ESCAPES[match.group()], value.strip()[1:-1])
+
+
+def _quote(value: str) -> str:
+    return '"%s"' % (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\t", "\\t")
+        .replace("\r", "\\r")
+        .replace("\n", "\\n")
+    )
+
+
+def _field(keyword: str, value: str) -> typing.List[str]:
+    lines = value.splitlines(keepends=True)
+    if len(lines) <= 1:
+        return [f"{keyword} {_quote(value)}"]
+    # Multi line strings are written the way msgmerge writes them
+    return [f'{keyword} ""'] + [_quote(line) for line in lines]
+
+
+class PoEntry:
+    """
+    One message of a PO file
+    """
+
+    __slots__ = ("comments", "msgctxt", "msgid", "msgid_plural", "msgstr")
+
+    def __init__(self) -> None:
+        # Comment lines as written, including the "#," flags line and obsolete "#~" lines
+        self.comments = []
+        self.msgctxt = None
+        self.msgid = None
+        self.msgid_plural = None
+        self.msgstr = []
+
+    @property
+    def flags(self) -> typing.List[str]:
+        for line in self.comments:
+            if line.startswith("#,"):
+                return [flag.strip() for flag in line[2:].split(",") if flag.strip()]
+        return []
+
+    @flags.setter
+    def flags(self, flags: typing.List[str]) -> None:
+        lines = [line for line in self.comments if not line.startswith("#,")]
+        if flags:
+            # Flags go before the "#|" previous msgid lines, as msgmerge orders them
+            index = next(
+                (i for i, line in enumerate(lines) if line.startswith("#|")), len(lines)
+            )
+            lines.insert(index, "#, " + ", ".join(flags))
+        self.comments = lines
+
+    @property
+    def is_header(self) -> bool:
+        return self.msgid == "" and self.msgctxt is None
+
+    def lines(self) -> typing.List[str]:
+        lines = list(self.comments)
+        if self.msgid is None:
+            return lines
+        if self.msgctxt is not None:
+            lines.extend(_field("msgctxt", self.msgctxt))
+        lines.extend(_field("msgid", self.msgid))
+        if self.msgid_plural is not None:
+            lines.extend(_field("msgid_plural", self.msgid_plural))
+            for index, value in enumerate(self.msgstr):
+                lines.extend(_field(f"msgstr[{index}]", value))
+        else:
+            lines.extend(_field("msgstr", self.msgstr[0] if self.msgstr else ""))
+        return lines
+
+
+class PoFile:
+    """
+    A gettext PO (or POT) file, messages without a translation or marked fuzzy are pending
+    """
+
+    def __init__(self, entries: typing.List[PoEntry], path: typing.Optional[str] = None) -> None:
+        """PO File Init
+
+        Parameters
+        ----------
+        entries: List[PoEntry]
+            The messages, the header first
+        path: str, None
+            File written by save when no other path is given
+
+        Returns
+        -------
+        None"""
+        self.entries = entries
+        self.path = path
+        self.nplurals = 2
+        for entry in entries:
+            if entry.is_header and entry.msgstr:
+                match = _NPLURALS.search(entry.msgstr[0])
+                if match:
+                    self.nplurals = int(match.group(1))
+                break
+
+    @classmethod
+    def load(cls, path: typing.Union[str, os.PathLike]) -> "PoFile":
+        """Parse a PO file
+
+        Parameters
+        ----------
+        path: str, PathLike
+            The file to read
+
+        Returns
+        -------
+        PoFile"""
+        with open(path, encoding="utf-8") as f:
+            return cls.parse(f.read(), path=os.fspath(path))
+
+    @classmethod
+    def parse(cls, source: str, path: typing.Optional[str] = None) -> "PoFile":
+        """Parse the content of a PO file
+
+        Parameters
+        ----------
+        source: str
+            The file content
+        path: str, None
+            File written by save when no other path is given
+
+        Returns
+        -------
+        PoFile"""
+        entries = []
+        entry = PoEntry()
+        current = None
+
+        def finish() -> None:
+            nonlocal entry, current
+            if entry.comments or entry.msgid is not None:
+                entries.append(entry)
+            entry = PoEntry()
+            current = None
+
+        for number, line in enumerate(source.splitlines(), 1):
+            line = line.strip()
+            if not line:
+                finish()
+                continue
+            if line.startswith("#"):
+                if entry.msgid is not None:
+                    finish()
+                entry.comments.append(line)
+                continue
+            if line.startswith('"'):
+                if current is None:
+                    raise ValueError(f"Line {number}: string without a keyword")
+                name, index = current
+                if name == "msgstr":
+                    entry.msgstr[index] += _unquote(line)
+                else:
+                    setattr(entry, name, getattr(entry, name) + _unquote(line))
+                continue
+            match = _KEYWORD.match(line)
+            if match is None:
+                raise ValueError(f"Line {number}: cannot parse {line!r}")
+            keyword, index, value = match.groups()
+            value = _unquote(value)
+            if keyword in ("msgctxt", "msgid") and entry.msgid is not None and (
+                keyword == "msgctxt" or entry.msgstr
+            ):
+                # Entries without a blank line between them
+                finish()
+            if keyword.startswith("msgstr"):
+                index = int(index or 0)
+                while len(entry.msgstr) <= index:
+                    entry.msgstr.append("")
+                entry.msgstr[index] = value
+                current = ("msgstr", index)
+            else:
+                setattr(entry, keyword, value)
+                current = (keyword, None)
+        finish()
+        return cls(entries, path=path)
+
+    def pending(self, include_fuzzy: bool = True) -> typing.List[typing.Tuple[tuple, str]]:
+        """Messages that need a translation
+
+        Parameters
+        ----------
+        include_fuzzy: bool
+            Translate fuzzy messages again
+            Default True
+
+        Returns
+        -------
+        List[Tuple[tuple, str]]
+            (slot, source text), slot is passed back to apply"""
+        pending = []
+        for entry in self.entries:
+            if entry.msgid is None or entry.is_header:
+                continue
+            fuzzy = include_fuzzy and "fuzzy" in entry.flags
+            if entry.msgid_plural is None:
+                if fuzzy or not any(entry.msgstr):
+                    pending.append(((entry, 0), entry.msgid))
+                continue
+            while len(entry.msgstr) < self.nplurals:
+                entry.msgstr.append("")
+            for index in range(self.nplurals):
+                if fuzzy or not entry.msgstr[index]:
+                    # Form 0 is the singular unless the language has a single form
+                    text = entry.msgid if index == 0 and self.nplurals > 1 else entry.msgid_plural
+                    pending.append(((entry, index), text))
+        return pending
+
+    def apply(self, slot: tuple, translation: str, fuzzy: bool = False) -> None:
+        """Store the translation of a pending message
+
+        Parameters
+        ----------
+        slot: tuple
+            Slot returned by pending
+        translation: str
+            The translated text
+        fuzzy: bool
+            Mark the message fuzzy so a translator reviews it
+            Default False
+
+        Returns
+        -------
+        None"""
+        entry, index = slot
+        while len(entry.msgstr) <= index:
+            entry.msgstr.append("")
+        entry.msgstr[index] = translation
+        flags = [flag for flag in entry.flags if flag != "fuzzy"]
+        entry.flags = ["fuzzy"] + flags if fuzzy else flags
+
+    def dumps(self) -> str:
+        """The PO file content
+
+        Returns
+        -------
+        str"""
+        return "\n\n".join("\n".join(entry.lines()) for entry in self.entries) + "\n"
+
+    def save(self, path: typing.Union[str, os.PathLike, None] = None) -> None:
+        """Write the PO file
+
+        Parameters
+        ----------
+        path: str, PathLike, None
+            Target file
+            Default None, the file it was loaded from
+
+        Returns
+        -------
+        None"""
+        with open(path or self.path, "w", encoding="utf-8") as f:
+            f.write(self.dumps())
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML bundles need PyYAML, install it with pip install aiogtrans[yaml]")
+    return yaml
+
+
+def _read_tree(path: str) -> typing.Any:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            return _yaml().safe_load(f) or {}
+        return json.load(f)
+
+
+class NestedBundle:
+    """
+    A nested JSON or YAML locale file, filled from the source language file it mirrors.
+
+    Every string leaf of the source that is missing or empty in the target is pending.
+    Keys are written in the order of the source, keys only the target has are kept at the end.
+    """
+
+    def __init__(
+        self,
+        source: typing.Union[str, os.PathLike],
+        target: typing.Union[str, os.PathLike],
+    ) -> None:
+        """Nested Bundle Init
+
+        Parameters
+        ----------
+        source: str, PathLike
+            Locale file of the source language, .json, .yaml or .yml
+        target: str, PathLike
+            Locale file of the target language, created if it does not exist
+
+        Returns
+        -------
+        None"""
+        self.path = os.fspath(target)
+        self.source = _read_tree(os.fspath(source))
+        self.target = _read_tree(self.path) if os.path.exists(self.path) else {}
+
+    @staticmethod
+    def _leaves(tree: typing.Any, path: tuple = ()) -> typing.Iterator[typing.Tuple[tuple, str]]:
+        if isinstance(tree, dict):
+            for key, value in tree.items():
+                yield from NestedBundle._leaves(value, path + (key,))
+        elif isinstance(tree, list):
+            for index, value in enumerate(tree):
+                yield from NestedBundle._leaves(value, path + (index,))
+        elif isinstance(tree, str):
+            yield path, tree
+
+    def _get(self, path: tuple) -> typing.Any:
+        node = self.target
+        for key in path:
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                return None
+        return node
+
+    def pending(self, include_fuzzy: bool = True) -> typing.List[typing.Tuple[tuple, str]]:
+        """Strings of the source missing in the target
+
+        Parameters
+        ----------
+        include_fuzzy: bool
+            Unused, nested bundles have no fuzzy marker
+
+        Returns
+        -------
+        List[Tuple[tuple, str]]
+            (slot, source text), slot is passed back to apply"""
+        return [
+            (path, text)
+            for path, text in self._leaves(self.source)
+            if text.strip() and not self._get(path)
+        ]
+
+    def apply(self, slot: tuple, translation: str, fuzzy: bool = False) -> None:
+        """Store the translation of a pending string
+
+        Parameters
+        ----------
+        slot: tuple
+            Slot returned by pending
+        translation: str
+            The translated text
+        fuzzy: bool
+            Unused, nested bundles have no fuzzy marker
+
+        Returns
+        -------
+        None"""
+        node = self.target
+        source = self.source
+        for key, next_key in zip(slot, slot[1:]):
+            source = source[key]
+            if isinstance(node, dict):
+                child = node.get(key)
+            else:
+                child = node[key] if key < len(node) else None
+            if not isinstance(child, (dict, list)):
+                child = {} if isinstance(source, dict) else [None] * len(source)
+                if isinstance(node, dict):
+                    node[key] = child
+                else:
+                    node.extend([None] * (key + 1 - len(node)))
+                    node[key] = child
+            node = child
+        key = slot[-1]
+        if isinstance(node, list):
+            node.extend([None] * (key + 1 - len(node)))
+        node[key] = translation
+
+    @staticmethod
+    def _ordered(source: typing.Any, target: typing.Any) -> typing.Any:
+        if isinstance(source, dict) and isinstance(target, dict):
+            ordered = {
+                key: NestedBundle._ordered(source[key], target[key])
+                for key in source
+                if key in target
+            }
+            ordered.update((key, value) for key, value in target.items() if key not in source)
+            return ordered
+        return target
+
+    def dumps(self) -> str:
+        """The locale file content
+
+        Returns
+        -------
+        str"""
+        tree = self._ordered(self.source, self.target)
+        if self.path.endswith((".yaml", ".yml")):
+            return _yaml().safe_dump(tree, allow_unicode=True, sort_keys=False)
+        return json.dumps(tree, ensure_ascii=False, indent=2) + "\n"
+
+    def save(self, path: typing.Union[str, os.PathLike, None] = None) -> None:
+        """Write the locale file
+
+        Parameters
+        ----------
+        path: str, PathLike, None
+            Target file
+            Default None, the target file given on init
+
+        Returns
+        -------
+        None"""
+        with open(path or self.path, "w", encoding="utf-8") as f:
+            f.write(self.dumps())
+
+
+Bundle = typing.Union[PoFile, NestedBundle]
+
+
+class BundleTranslator:
+    """
+    Collects pending strings of many bundles and translates every distinct string once per language
+    """
+
+    def __init__(
+        self,
+        translator: Translator,
+        src: str = "auto",
+        masker: typing.Optional[Masker] = None,
+        include_fuzzy: bool = True,
+        mark_fuzzy: bool = False,
+        concurrency: int = 8,
+    ) -> None:
+        """Bundle Translator Init
+
+        Parameters
+        ----------
+        translator: Translator
+            Translator used for every language
+        src: str
+            Language of the source strings
+            Default auto
+        masker: Masker, None
+            Protects interpolation tokens, the translation is skipped when Google loses one
+            Default None, a Masker for INTERPOLATION_PATTERNS
+        include_fuzzy: bool
+            Translate fuzzy PO messages again
+            Default True
+        mark_fuzzy: bool
+            Mark machine translated PO messages fuzzy for review
+            Default False
+        concurrency: int
+            Maximum amount of translations in flight
+            Default 8
+
+        Returns
+        -------
+        None"""
+        self.translator = translator
+        self.src = src
+        self.masker = masker or Masker(
+            numbers=False, urls=False, emails=False, emoji=False, patterns=INTERPOLATION_PATTERNS
+        )
+        self.include_fuzzy = include_fuzzy
+        self.mark_fuzzy = mark_fuzzy
+        self.concurrency = concurrency
+        self.bundles = {}
+
+    def add(self, bundle: Bundle, dest: str) -> None:
+        """Queue a bundle of the given target language
+
+        Parameters
+        ----------
+        bundle: PoFile, NestedBundle
+            The bundle to fill
+        dest: str
+            Its language
+
+        Returns
+        -------
+        None"""
+        self.bundles.setdefault(dest, []).append(bundle)
+
+    async def run(self, save: bool = True, **kwargs) -> dict:
+        """Translate every pending string of the queued bundles
+
+        Parameters
+        ----------
+        save: bool
+            Write every bundle back afterwards
+            Default True
+        **kwargs
+            Passed to Translator.translate_batch (deadline, priority, tenant)
+
+        Returns
+        -------
+        dict
+            Amount of languages, pending strings, distinct strings sent and strings skipped
+            because a protected token was lost"""
+        stats = {"languages": len(self.bundles), "pending": 0, "unique": 0, "failed": 0}
+        for dest, bundles in self.bundles.items():
+            pending = []
+            templates = {}
+            for bundle in bundles:
+                for slot, text in bundle.pending(self.include_fuzzy):
+                    template, originals = self.masker.mask(text)
+                    pending.append((bundle, slot, template, originals))
+                    templates.setdefault(template, None)
+            stats["pending"] += len(pending)
+            stats["unique"] += len(templates)
+            if templates:
+                batch = await self.translator.translate_batch(
+                    list(templates),
+                    dest=dest,
+                    src=self.src,
+                    concurrency=self.concurrency,
+                    **kwargs,
+                )
+                templates = {template: result.text for template, result in zip(templates, batch)}
+
+            for bundle, slot, template, originals in pending:
+                try:
+                    translation = self.masker.unmask(templates[template], originals)
+                except ValueError as e:
+                    logger.debug("Skipping %r for %s: %s", template, dest, e)
+                    stats["failed"] += 1
+                    continue
+                bundle.apply(slot, translation, fuzzy=self.mark_fuzzy)
+            if save:
+                for bundle in bundles:
+                    bundle.save()
+        return stats
@@ -14,15 +14,356 @@ The above copyright notice and this permission notice shall be included in all
 copies or substantial portions of the Software.
 """
 
+import threading
 import typing
 from collections import OrderedDict
 
 from .models import Detected, Translated
 
 
+def make_key(text: str, dest: str, src: str) -> str:
+    """Build the cache key of a translation
+
+    Parameters
+    ----------
+    text: str
+        The text to translate
+    dest: str
+        Normalized destination language
+    src: str
+        Normalized source language or auto
+
+    Returns
+    -------
+    str
+        The key used by Translator for the cache"""
+    return f"{src}\x1f{dest}\x1f{text}"
+
+
+# Typical size of an entry as counted by weigh, to turn a byte bound into an amount of entries
+ENTRY_BYTES = 512
+
+
+def weigh(key: str, value: typing.Union[Translated, Detected]) -> int:
+    """Approximate amount of bytes an entry keeps alive
+
+    Parameters
+    ----------
+    key: str
+        The cache key
+    value: Translated, Detected
+        The cached object
+
+    Returns
+    -------
+    int
+        Size estimate, counting the key, the texts, the raw response body and its parsed tree"""
+    size = 64 + len(key)
+    for name in ("origin", "text", "pronunciation"):
+        text = getattr(value, name, None)
+        if isinstance(text, str):
+            size += len(text)
+    response = getattr(value, "_response", None)
+    if response is not None:
+        try:
+            body = len(response.content)
+        except Exception:
+            body = 0
+        size += body
+        # The parsed payload in extra_data takes at least as much memory as the JSON it came from
+        extra_data = getattr(value, "extra_data", None)
+        if isinstance(extra_data, dict) and extra_data.get("parsed") is not None:
+            size += body
+    return size
+
+
+class CountMinSketch:
+    """
+    Approximate access frequency of keys, counters are halved periodically so old popularity fades
+    """
+
+    def __init__(self, width: int, depth: int = 4) -> None:
+        """Count-Min Sketch Init
+
+        Parameters
+        ----------
+        width: int
+            Counters per row, rounded up to a power of two
+        depth: int
+            Amount of rows
+            Default 4
+
+        Returns
+        -------
+        None"""
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.mask = self.width - 1
+        # All rows live in one flat list, row r starts at r * width
+        self.table = [0] * (self.width * depth)
+        self.offsets = [(row * self.width, 0x9E3779B1 * (row + 1) & 0xFFFFFFFF) for row in range(depth)]
+        self.additions = 0
+        self.sample_size = 10 * self.width
+
+    def increment(self, key: str) -> None:
+        """Count an access of key
+
+        Parameters
+        ----------
+        key: str
+            The accessed key
+
+        Returns
+        -------
+        None"""
+        # str hashes are cached by the interpreter, so this is cheap for repeated keys
+        digest = hash(key) & 0xFFFFFFFF
+        mask = self.mask
+        table = self.table
+        for offset, seed in self.offsets:
+            index = offset + (((digest ^ seed) * 0x01000193 >> 7) & mask)
+            if table[index] < 15:
+                table[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.table = [count >> 1 for count in table]
+            self.additions //= 2
+
+    def frequency(self, key: str) -> int:
+        """Estimated access count of key
+
+        Parameters
+        ----------
+        key: str
+            The key to look up
+
+        Returns
+        -------
+        int"""
+        digest = hash(key) & 0xFFFFFFFF
+        mask = self.mask
+        table = self.table
+        return min(
+            table[offset + (((digest ^ seed) * 0x01000193 >> 7) & mask)]
+            for offset, seed in self.offsets
+        )
+
+
+_MISSING = object()
+
+
+class _Segment:
+    """
+    One shard of the cache, a W-TinyLFU policy guarded by its own lock
+    """
+
+    def __init__(self, capacity: int, weigher: typing.Optional[typing.Callable]) -> None:
+        self.lock = threading.Lock()
+        self.weigher = weigher
+        self.capacity = capacity
+        self.window_capacity = max(1, capacity // 100)
+        main = max(1, capacity - self.window_capacity)
+        self.protected_capacity = main * 4 // 5
+        self.main_capacity = main
+        self.sketch = CountMinSketch(capacity if weigher is None else capacity // ENTRY_BYTES + 16)
+        self.hits = self.misses = 0
+
+        # key -> (value, weight)
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.window_weight = self.probation_weight = self.protected_weight = 0
+
+    def _weight(self, key: str, value) -> int:
+        return 1 if self.weigher is None else self.weigher(key, value)
+
+    def get(self, key: str):
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+            return self.window[key][0]
+        if key in self.protected:
+            self.protected.move_to_end(key)
+            return self.protected[key][0]
+        if key in self.probation:
+            # Second hit, promote to the protected segment
+            entry = self.probation.pop(key)
+            self.probation_weight -= entry[1]
+            self.protected[key] = entry
+            self.protected_weight += entry[1]
+            while self.protected_weight > self.protected_capacity and len(self.protected) > 1:
+                demoted, demoted_entry = self.protected.popitem(last=False)
+                self.protected_weight -= demoted_entry[1]
+                self.probation[demoted] = demoted_entry
+                self.probation_weight += demoted_entry[1]
+            return entry[0]
+        return _MISSING
+
+    def _remove(self, key: str) -> None:
+        for segment, attribute in (
+            (self.window, "window_weight"),
+            (self.probation, "probation_weight"),
+            (self.protected, "protected_weight"),
+        ):
+            if key in segment:
+                setattr(self, attribute, getattr(self, attribute) - segment.pop(key)[1])
+                return
+
+    def add(self, key: str, value) -> None:
+        weight = self._weight(key, value)
+        self._remove(key)
+        self.sketch.increment(key)
+        if weight > self.main_capacity:
+            return
+
+        self.window[key] = (value, weight)
+        self.window_weight += weight
+        while self.window_weight > self.window_capacity and self.window:
+            candidate, entry = self.window.popitem(last=False)
+            self.window_weight -= entry[1]
+            self._admit(candidate, entry)
+
+    def _admit(self, candidate: str, entry: tuple) -> None:
+        """Move a key evicted from the window into the main segment if it is more popular than the victims"""
+        frequency = self.sketch.frequency(candidate)
+        while self.probation_weight + self.protected_weight + entry[1] > self.main_capacity:
+            victims = self.probation or self.protected
+            victim = next(iter(victims))
+            if frequency <= self.sketch.frequency(victim):
+                return
+            victim_entry = victims.pop(victim)
+            if victims is self.probation:
+                self.probation_weight -= victim_entry[1]
+            else:
+                self.protected_weight -= victim_entry[1]
+        self.probation[candidate] = entry
+        self.probation_weight += entry[1]
+
+    def items(self) -> typing.List[tuple]:
+        return [
+            (key, entry[0])
+            for segment in (self.protected, self.probation, self.window)
+            for key, entry in segment.items()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.window) + len(self.probation) + len(self.protected)
+
+
 class Cache:
     """
-    LRU based cache to store api calls, 2 will usually be created, one for translations, and one for detections, respectively
+    Scan resistant cache to store api calls, based on W-TinyLFU
+
+    New keys go through a small LRU window, to stay they must be requested more often than
+    the least valuable key of the main segment. A bulk job full of one-off strings therefore
+    cannot flush the entries interactive traffic keeps hitting.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        max_bytes: typing.Optional[int] = None,
+        shards: typing.Optional[int] = None,
+        weigher: typing.Callable[[str, typing.Any], int] = weigh,
+    ) -> None:
+        """Cache Init
+
+        Parameters
+        ----------
+        capacity: int
+            The amount of items to be stored in the cache, ignored when max_bytes is set
+            Default 1,000
+        max_bytes: int, None
+            Bound the cache by the approximate size of the entries instead of their count
+            Default None
+        shards: int, None
+            Amount of independently locked shards
+            Default None, one shard per 1,000 items (or 1,000 entries worth of max_bytes) up to 16
+        weigher: Callable[[str, Any], int]
+            Size estimate of an entry, used with max_bytes
+            Default weigh
+
+        Returns
+        -------
+        None"""
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        total = max_bytes if max_bytes is not None else capacity
+        if shards is None:
+            entries = total if max_bytes is None else total // ENTRY_BYTES
+            shards = min(16, max(1, entries // 1000))
+        self._segments = [
+            _Segment(max(1, total // shards), weigher if max_bytes is not None else None)
+            for _ in range(shards)
+        ]
+
+    def _segment(self, key: str) -> _Segment:
+        return self._segments[hash(key) % len(self._segments)]
+
+    def get(self, key: str) -> typing.Union[Translated, Detected]:
+        """Retrieve a key
+
+        Parameters
+        ----------
+        key: str
+            The key or translation keyword that will be queried
+
+        Returns
+        -------
+        Translated, Detected
+            The Translated or Detected cached object, -1 if the key is missing"""
+        segment = self._segment(key)
+        with segment.lock:
+            value = segment.get(key)
+            if value is _MISSING:
+                segment.misses += 1
+                return -1
+            segment.hits += 1
+        return value
+
+    @property
+    def hits(self) -> int:
+        return sum(segment.hits for segment in self._segments)
+
+    @property
+    def misses(self) -> int:
+        return sum(segment.misses for segment in self._segments)
+
+    def add(self, key: str, value: typing.Union[Translated, Detected]) -> None:
+        """Add a key and value to the cache
+
+        Parameters
+        ----------
+        key: str
+            Keyword/words whatever
+        value: Translated, Detected
+            The object to store
+
+        Returns
+        -------
+        None"""
+        segment = self._segment(key)
+        with segment.lock:
+            segment.add(key, value)
+
+    def items(self) -> typing.List[typing.Tuple[str, typing.Union[Translated, Detected]]]:
+        """Snapshot of every cached key and value
+
+        Returns
+        -------
+        List[Tuple[str, Translated, Detected]]"""
+        items = []
+        for segment in self._segments:
+            with segment.lock:
+                items.extend(segment.items())
+        return items
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+
+class LRUCache:
+    """
+    Plain LRU cache bounded by item count, the previous Cache implementation, kept for comparison
     """
 
     def __init__(self, capacity: int = 1000) -> None:
@@ -12,15 +12,26 @@ Permission is hereby granted, free of charge, to any person obtaining a copy of
 ...
 """
 import asyncio
-import json
+import contextlib
+import functools
+import logging
 import random
+import time
 import typing
-import os
 
 import httpx
 from httpx import Proxy
 
-from aiogtrans import urls
+from aiogtrans import json_backend, urls
+from aiogtrans.batcher import MicroBatcher
+from aiogtrans.budget import (
+    PARSED_FACTOR,
+    BudgetExceeded,
+    ByteBudget,
+    Reservation,
+    estimate,
+)
+from aiogtrans.cache import Cache, make_key
 from aiogtrans.constants import (
     DEFAULT_CLIENT_SERVICE_URLS,
     DEFAULT_FALLBACK_SERVICE_URLS,
@@ -30,10 +41,76 @@ from aiogtrans.constants import (
     LANGUAGES,
     SPECIAL_CASES,
 )
-from aiogtrans.models import Detected, Translated, TranslatedPart
+from aiogtrans.dictionary import extract_alternatives
+from aiogtrans.dns import SHARED_DNS_CACHE, CachingNetworkBackend, DNSCache
+from aiogtrans.hedging import HedgeBudget, LatencyTracker
+from aiogtrans.markup import DEFAULT_ATTRIBUTES, DEFAULT_SKIP_TAGS, MarkupDocument
+from aiogtrans.masking import Masker
+from aiogtrans.models import (
+    BatchTranslated,
+    Detected,
+    Lookup,
+    Translated,
+    TranslatedPart,
+)
+from aiogtrans.prefilter import Prefilter
+from aiogtrans.ratelimit import RateLimiter
+from aiogtrans.scheduler import Scheduler
+from aiogtrans.segments import split_segments
+from aiogtrans.transport import BACKENDS
+
+logger = logging.getLogger(__name__)
 
 RPC_ID = "MkEWBc"
 
+RPC_PARAMS = {
+    "rpcids": RPC_ID,
+    "bl": "boq_translate-webserver_20201207.13_p0",
+    "soc-app": 1,
+    "soc-platform": 1,
+    "soc-device": 1,
+    "rt": "c",
+}
+
+# Статусы, при которых имеет смысл повторить запрос
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_ssl_context():
+    """
+    Один SSL-контекст на все транспорты: сертификаты загружаются один раз.
+    """
+    return httpx.create_ssl_context()
+
+
+def normalize_language(lang: str) -> typing.Optional[str]:
+    """
+    Привести код или название языка к коду Google ("zh_CN" -> "zh", "english" -> "en").
+
+    Возвращает None, если язык неизвестен; "auto" остаётся как есть.
+    """
+    lang = lang.lower().split("_", 1)[0]
+    if lang == "auto" or lang in LANGUAGES:
+        return lang
+    if lang in SPECIAL_CASES:
+        return SPECIAL_CASES[lang]
+    return LANGCODES.get(lang)
+
+
+def _expires(deadline: typing.Optional[float]) -> typing.Optional[float]:
+    """
+    Момент (time.monotonic), когда истекает дедлайн вызова.
+    """
+    return None if deadline is None else time.monotonic() + deadline
+
+
+def _remaining(expires: typing.Optional[float]) -> typing.Optional[float]:
+    """
+    Сколько секунд осталось до истечения дедлайна (None - без дедлайна).
+    """
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
 
 class Translator:
     """
@@ -51,12 +128,73 @@ class Translator:
         raise_exception: bool = DEFAULT_RAISE_EXCEPTION,
         timeout: typing.Union[int, float] = 10.0,
         use_fallback: bool = False,
+        dns_cache: typing.Optional[DNSCache] = SHARED_DNS_CACHE,
+        keepalive_interval: typing.Optional[float] = None,
+        min_connections: int = 1,
+        retries: int = 0,
+        hedge_percentile: typing.Optional[float] = None,
+        hedge_budget: float = 0.1,
+        scheduler: typing.Optional[Scheduler] = None,
+        cache: typing.Optional[Cache] = None,
+        rate_limiter: typing.Optional[RateLimiter] = None,
+        masker: typing.Optional[Masker] = None,
+        batch_window: typing.Optional[float] = None,
+        batch_size: int = 32,
+        prefilter: typing.Optional[Prefilter] = None,
+        byte_budget: typing.Optional[ByteBudget] = None,
+        backend: str = "httpx",
     ) -> None:
         """
         Инициализация клиента с учётом заданных параметров.
+
+        dns_cache - общий кэш DNS для всех транспортов (None - резолвить каждый раз).
+        keepalive_interval - если задан, после warmup() раз в столько секунд к каждому
+        хосту открывается min_connections запросов, чтобы соединения не остывали.
+        retries - сколько раз повторять запрос при сетевой ошибке или 429/5xx.
+        hedge_percentile - если задан (например, 95), то при отсутствии ответа
+        дольше этого перцентиля задержек тот же запрос отправляется на другой хост.
+        hedge_budget - доля дополнительных (hedged) запросов от числа основных.
+        scheduler - планировщик с классами приоритетов и справедливой очередью по
+        арендаторам; без него все запросы уходят сразу.
+        cache - кэш готовых переводов, ключ строится из текста и языков.
+        rate_limiter - ограничение числа запросов в секунду к сервису.
+        masker - заменяет числа, ссылки и т.п. плейсхолдерами перед переводом,
+        чтобы однотипные строки попадали в один ключ кэша.
+        batch_window - если задан, одиночные переводы, пришедшие в течение этого
+        окна (в секундах, например 0.005), отправляются одним запросом по batch_size штук.
+        prefilter - распознаёт тексты, которым перевод не нужен (числа, ссылки, эмодзи и т.п.),
+        и возвращает их без запроса.
+        byte_budget - общий лимит байт, которые держат запросы в полёте (запрос, ответ,
+        разобранный JSON); при исчерпании вызовы ждут, слишком большие тексты
+        разбиваются на предложения или отклоняются.
+        backend - HTTP-стек: "httpx" или "aiohttp"; лимиты пула, прокси, таймаут,
+        SSL-контекст и кэш DNS настраиваются для обоих одинаково.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}, use one of {BACKENDS}")
         self.loop = loop
         self.raise_exception = raise_exception
+        self.dns_cache = dns_cache
+        self.keepalive_interval = keepalive_interval
+        self.min_connections = min_connections
+        self._keepalive_task = None
+        self.retries = retries
+        self.hedge_percentile = hedge_percentile
+        self._latency = LatencyTracker()
+        self._hedge_budget = HedgeBudget(ratio=hedge_budget)
+        self.scheduler = scheduler
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.masker = masker
+        self.prefilter = prefilter
+        self.byte_budget = byte_budget
+        self._batcher = None
+        # Число POST-запросов, реально ушедших в сеть (включая повторы и hedged)
+        self.requests_sent = 0
+        if batch_window is not None:
+            self._batcher = MicroBatcher(
+                self._send_batch, window=batch_window, max_size=batch_size
+            )
 
         if use_fallback:
             self.service_urls = DEFAULT_FALLBACK_SERVICE_URLS
@@ -71,36 +209,111 @@ class Translator:
                 "Referer": "https://translate.google.com",
             }
 
-            # Получаем настройки прокси из переменных окружения
-            http_proxy = os.getenv("HTTP_PROXY")
-            https_proxy = os.getenv("HTTPS_PROXY")
+            if backend == "aiohttp":
+                from aiogtrans.transport import AiohttpClient
 
-            if http_proxy and https_proxy and http_proxy == https_proxy:
-                # Если для HTTP и HTTPS используется один и тот же прокси
-                self._aclient = httpx.AsyncClient(
-                    headers=headers, timeout=timeout, proxy=http_proxy
+                # Прокси из окружения aiohttp читает сам (trust_env), как и httpx
+                self._aclient = AiohttpClient(
+                    headers=headers,
+                    timeout=timeout,
+                    limits=self._limits(),
+                    verify=_shared_ssl_context(),
+                    dns_cache=self.dns_cache,
                 )
-            elif http_proxy or https_proxy:
-                proxy_mounts = {}
-                # Настройка различных транспортов для HTTP и HTTPS при необходимости
-                if http_proxy:
-                    proxy_mounts["http://"] = httpx.AsyncHTTPTransport(proxy=http_proxy)
-                if https_proxy:
-                    proxy_mounts["https://"] = httpx.AsyncHTTPTransport(
-                        proxy=https_proxy
-                    )
+            else:
+                # Прокси из окружения (http_proxy, HTTPS_PROXY, ALL_PROXY, NO_PROXY)
+                # разбирает сам httpx, мы лишь подменяем network backend его транспортов
                 self._aclient = httpx.AsyncClient(
-                    headers=headers, timeout=timeout, mounts=proxy_mounts
+                    headers=headers,
+                    timeout=timeout,
+                    verify=_shared_ssl_context(),
+                    limits=self._limits(),
                 )
-            else:
-                self._aclient = httpx.AsyncClient(headers=headers, timeout=timeout)
+                for transport in (self._aclient._transport, *self._aclient._mounts.values()):
+                    if transport is not None:
+                        self._cache_dns(transport)
         else:
             self._aclient = _aclient
 
+    def _limits(self) -> httpx.Limits:
+        """
+        Лимиты пула соединений, общие для обоих бэкендов.
+        """
+        return httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            # Соединения должны пережить паузу между keepalive-пингами
+            keepalive_expiry=max(5.0, (self.keepalive_interval or 0) * 2),
+        )
+
+    def _cache_dns(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        """
+        Направить разрешение имён транспорта через общий кэш DNS.
+        """
+        pool = getattr(transport, "_pool", None)
+        if self.dns_cache is not None and hasattr(pool, "_network_backend"):
+            # httpx не даёт передать network backend, подменяем его у пула httpcore
+            pool._network_backend = CachingNetworkBackend(
+                self.dns_cache, pool._network_backend
+            )
+        return transport
+
+    async def warmup(
+        self,
+        hosts: typing.Optional[typing.Iterable[str]] = None,
+        connections: typing.Optional[int] = None,
+    ) -> typing.Dict[str, int]:
+        """
+        Заранее разрешить DNS и открыть соединения (включая TLS) к сервисным хостам.
+
+        connections - сколько соединений держать к каждому хосту (по умолчанию
+        min_connections). Если задан keepalive_interval, запускает фоновые пинги.
+        Возвращает словарь хост -> число успешно открытых соединений.
+        """
+        hosts = list(hosts or self.service_urls)
+        connections = connections or self.min_connections
+
+        async def ping(host: str) -> bool:
+            try:
+                await self._aclient.head(f"https://{host}/")
+            except httpx.HTTPError as e:
+                logger.debug("Прогрев %s не удался: %s", host, e)
+                return False
+            return True
+
+        async def warm(host: str) -> int:
+            if self.dns_cache is not None:
+                try:
+                    await self.dns_cache.resolve(host, 443)
+                except OSError as e:
+                    logger.debug("DNS %s не разрешился: %s", host, e)
+                    return 0
+            # Одновременные запросы заставляют пул открыть отдельные соединения
+            return sum(await asyncio.gather(*(ping(host) for _ in range(connections))))
+
+        warmed = dict(zip(hosts, await asyncio.gather(*(warm(host) for host in hosts))))
+
+        if self.keepalive_interval and self._keepalive_task is None:
+            self._keepalive_task = asyncio.ensure_future(self._keepalive(hosts))
+        return warmed
+
+    async def _keepalive(self, hosts: typing.List[str]) -> None:
+        """
+        Периодически пинговать хосты, чтобы в пуле оставались тёплые соединения.
+        """
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.warmup(hosts)
+
     async def close(self) -> None:
         """
-        Закрыть httpx.AsyncClient
+        Закрыть HTTP-клиент (httpx.AsyncClient или AiohttpClient)
         """
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._batcher is not None:
+            await self._batcher.aclose()
         if self._aclient:
             await self._aclient.aclose()
 
@@ -114,67 +327,192 @@ class Translator:
         """
         Сформировать f.req для RPC запроса.
         """
-        return json.dumps(
+        return json_backend.dumps(
             [
                 [
                     [
                         RPC_ID,
-                        json.dumps(
-                            [[text, src, dest, True], [None]], separators=(",", ":")
-                        ),
+                        json_backend.dumps([[text, src, dest, True], [None]]),
                         None,
                         "generic",
                     ],
                 ]
-            ],
-            separators=(",", ":"),
+            ]
         )
 
-    def _pick_service_url(self) -> str:
+    def _build_batch_rpc_request(
+        self, items: typing.Sequence[typing.Tuple[str, str, str]]
+    ) -> str:
+        """
+        Сформировать f.req с несколькими конвертами (text, dest, src) в одном запросе.
+
+        Идентификатор конверта - его номер с единицы, он же приходит в кадре ответа.
+        """
+        return json_backend.dumps(
+            [
+                [
+                    [
+                        RPC_ID,
+                        json_backend.dumps([[text, src, dest, True], [None]]),
+                        None,
+                        str(index),
+                    ]
+                    for index, (text, dest, src) in enumerate(items, 1)
+                ]
+            ]
+        )
+
+    def _pick_service_url(self, exclude: typing.Optional[str] = None) -> str:
         """
         Выбрать случайный сервисный URL (или первый, если список один).
+
+        exclude - хост, которого по возможности нужно избегать (для hedged запросов).
         """
         if len(self.service_urls) == 1:
             return self.service_urls[0]
-        return random.choice(self.service_urls)
+        candidates = [url for url in self.service_urls if url != exclude]
+        return random.choice(candidates or self.service_urls)
 
-    async def _translate(
-        self, text: str, dest: str, src: str
-    ) -> typing.Tuple[str, httpx.Response]:
+    async def _send(self, host: str, params: dict, data: dict) -> httpx.Response:
         """
-        Вспомогательный метод, отправляющий POST-запрос к Google RPC и возвращающий сырой ответ.
+        Один POST-запрос к указанному хосту с учётом задержки ответа.
         """
-        url = urls.TRANSLATE_RPC.format(host=self._pick_service_url())
-        data = {
-            "f.req": await self._build_rpc_request(text, dest, src),
-        }
-        params = {
-            "rpcids": RPC_ID,
-            "bl": "boq_translate-webserver_20201207.13_p0",
-            "soc-app": 1,
-            "soc-platform": 1,
-            "soc-device": 1,
-            "rt": "c",
-        }
+        url = urls.TRANSLATE_RPC.format(host=host)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
 
-        # Выводим информацию о запросе для отладки
-        print("=== Debug: Отправка запроса ===")
-        print("URL:", url)
-        print("Параметры:", params)
-        print("Данные:", data)
+        logger.debug("Отправка запроса: %s %s %s", url, params, data)
 
+        started = time.monotonic()
+        self.requests_sent += 1
         response = await self._aclient.post(url, params=params, data=data)
+        if response.status_code == 200:
+            self._latency.observe(time.monotonic() - started)
+
+        # Ограничим вывод тела ответа и не декодируем его, если debug выключен
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Получен ответ: %s %s %r",
+                response.status_code,
+                response.http_version,
+                response.content[:500],
+            )
+        return response
 
-        # Выводим статус ответа
-        print("=== Debug: Получен ответ ===")
-        print("Статус-код:", response.status_code)
-        print("HTTP-версия:", response.http_version)
+    async def _send_hedged(self, params: dict, data: dict) -> httpx.Response:
+        """
+        Отправить запрос и, если ответа нет дольше перцентиля задержек, продублировать
+        его на другой хост. Возвращается первый успешный ответ, проигравший отменяется.
+        """
+        host = self._pick_service_url()
+        self._hedge_budget.on_request()
+        delay = None
+        if self.hedge_percentile is not None:
+            delay = self._latency.percentile(self.hedge_percentile)
+        if delay is None:
+            return await self._send(host, params, data)
+
+        tasks = [asyncio.ensure_future(self._send(host, params, data))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._hedge_budget.try_acquire():
+                hedge_host = self._pick_service_url(exclude=host)
+                tasks.append(asyncio.ensure_future(self._send(hedge_host, params, data)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.exception() and task.result().status_code == 200:
+                        return task.result()
+            # Ни один запрос не был успешным - отдаём результат основного
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
 
-        # Ограничим вывод тела ответа, чтобы не засорить консоль большим текстом
-        text_response = response.text
-        print(
-            "Часть тела ответа:", text_response, "...\n"
-        )  # выводим первые 500 символов
+    async def _post(
+        self, data: dict, params: dict, deadline: typing.Optional[float] = None
+    ) -> httpx.Response:
+        """
+        POST-запрос с повторами и общим дедлайном (в секундах) на все попытки.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        attempt = 0
+        while True:
+            remaining = None if expires is None else expires - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError(f"Deadline of {deadline}s exceeded")
+            try:
+                response = await asyncio.wait_for(
+                    self._send_hedged(params, data), remaining
+                )
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+            attempt += 1
+            # Экспоненциальная пауза между попытками, но не дольше дедлайна
+            backoff = min(2.0, 0.1 * 2**attempt) * random.uniform(0.5, 1.0)
+            if expires is not None:
+                backoff = min(backoff, max(0.0, expires - time.monotonic()))
+            await asyncio.sleep(backoff)
+
+    @contextlib.asynccontextmanager
+    async def _slot(
+        self,
+        priority: typing.Optional[str],
+        tenant: typing.Optional[str],
+        expires: typing.Optional[float],
+    ) -> typing.AsyncIterator[None]:
+        """
+        Занять место в планировщике; ожидание в очереди тоже ограничено дедлайном.
+        """
+        if self.scheduler is None:
+            yield
+            return
+        await asyncio.wait_for(self.scheduler.acquire(priority, tenant), _remaining(expires))
+        try:
+            yield
+        finally:
+            self.scheduler.release()
+
+    @contextlib.asynccontextmanager
+    async def _reserve(
+        self, texts: typing.Iterable[str], expires: typing.Optional[float] = None
+    ) -> typing.AsyncIterator[typing.Optional[Reservation]]:
+        """
+        Занять место в byte_budget на время запроса и разбора ответа.
+
+        Вызывается внутри _slot: бюджет отдаёт место строго по очереди (FIFO), и если
+        занимать его до планировщика, запросы из очереди держали бы байты и ломали
+        приоритеты. Ожидание места тоже ограничено дедлайном.
+        """
+        if self.byte_budget is None:
+            yield None
+            return
+        reservation = await asyncio.wait_for(
+            self.byte_budget.acquire(estimate(texts)), _remaining(expires)
+        )
+        try:
+            yield reservation
+        finally:
+            self.byte_budget.release(reservation)
+
+    async def _translate(
+        self, text: str, dest: str, src: str, deadline: typing.Optional[float] = None
+    ) -> typing.Tuple[bytes, httpx.Response]:
+        """
+        Вспомогательный метод, отправляющий POST-запрос к Google RPC и возвращающий сырой ответ.
+        """
+        data = {
+            "f.req": await self._build_rpc_request(text, dest, src),
+        }
+        response = await self._post(data, RPC_PARAMS, deadline)
 
         status = response.status_code
 
@@ -182,7 +520,7 @@ class Translator:
             raise Exception(
                 f"""Unexpected status code "{status}" from {self.service_urls}"""
             )
-        return response.text, response
+        return response.content, response
 
     def _find_translation_list(self, data):
         """
@@ -210,65 +548,368 @@ class Translator:
         return None
 
     async def translate(
-        self, text: str, dest: str = "en", src: str = "auto"
-    ) -> Translated:
+        self,
+        text: typing.Union[str, typing.List[str]],
+        dest: str = "en",
+        src: str = "auto",
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> typing.Union[Translated, typing.List[Translated]]:
         """
         Translate text
+
+        deadline - максимальное время (в секундах) на вызов, включая все повторы.
+        priority, tenant - класс приоритета и ключ арендатора для планировщика.
+        Если передан список строк, он переводится через translate_batch.
         """
-        # Приведение языковых кодов к нужному формату
-        dest = dest.lower().split("_", 1)[0]
-        src = src.lower().split("_", 1)[0]
+        if isinstance(text, (list, tuple)):
+            batch = await self.translate_batch(
+                text,
+                dest=dest,
+                src=src,
+                deadline=deadline,
+                priority=priority,
+                tenant=tenant,
+            )
+            return batch.translated
 
-        if src != "auto" and src not in LANGUAGES:
-            if src in SPECIAL_CASES:
-                src = SPECIAL_CASES[src]
-            elif src in LANGCODES:
-                src = LANGCODES[src]
-            else:
-                raise ValueError(f"Invalid Source Language: {src}")
+        dest, src = self._normalize_languages(dest, src)
+
+        if self.byte_budget is not None and not self.byte_budget.fits(estimate((text,))):
+            # Слишком большой текст переводится кусками из соседних предложений
+            return await self._translate_oversized(
+                text, dest, src, deadline, priority, tenant
+            )
+
+        if self.prefilter is not None:
+            reason = self.prefilter.classify(text, dest)
+            if reason is not None:
+                return self._prefiltered(text, dest, src, reason)
+
+        return await self._translate_masked(text, dest, src, deadline, priority, tenant)
+
+    @staticmethod
+    def _prefiltered(text: str, dest: str, src: str, reason: str) -> Translated:
+        """
+        Ответ без запроса для текста, который перевод не изменил бы.
+        """
+        return Translated(
+            src=dest if reason == "script" else src,
+            dest=dest,
+            origin=text,
+            text=text,
+            pronunciation=None,
+            parts=[TranslatedPart(text, [])],
+            extra_data={"prefilter": reason},
+        )
+
+    async def _translate_masked(
+        self,
+        text: str,
+        dest: str,
+        src: str,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> Translated:
+        """
+        Перевести текст, уже прошедший prefilter, спрятав изменчивые фрагменты за плейсхолдерами.
+        """
+        if self.masker is not None:
+            template, originals = self.masker.mask(text)
+            if originals:
+                result = await self._translate_one(
+                    template, dest, src, deadline, priority, tenant
+                )
+                try:
+                    translated = self.masker.unmask(result.text, originals)
+                except ValueError as e:
+                    # Google потерял или исказил плейсхолдер - переводим исходный текст
+                    logger.debug("Плейсхолдеры не сохранились: %s", e)
+                else:
+                    return Translated(
+                        src=result.src,
+                        dest=result.dest,
+                        origin=text,
+                        text=translated,
+                        pronunciation=result.pronunciation,
+                        parts=result.parts,
+                        extra_data=dict(result.extra_data or {}, template=template),
+                        response=result._response,
+                    )
+
+        return await self._translate_one(text, dest, src, deadline, priority, tenant)
 
-        if dest not in LANGUAGES:
-            if dest in SPECIAL_CASES:
-                dest = SPECIAL_CASES[dest]
-            elif dest in LANGCODES:
-                dest = LANGCODES[dest]
+    async def _translate_oversized(
+        self,
+        text: str,
+        dest: str,
+        src: str,
+        deadline: typing.Optional[float],
+        priority: typing.Optional[str],
+        tenant: typing.Optional[str],
+    ) -> Translated:
+        """
+        Перевести текст больше бюджета байт: соседние предложения собираются в куски,
+        каждый из которых помещается в бюджет, и куски переводятся отдельными запросами.
+        """
+        pieces = split_segments(text)
+        packed = [pieces[0]]
+        for index in range(1, len(pieces), 2):
+            separator, segment = pieces[index], pieces[index + 1]
+            candidate = packed[-1] + separator + segment
+            if packed[-1] and segment and self.byte_budget.fits(estimate((candidate,))):
+                packed[-1] = candidate
             else:
-                raise ValueError(f"Invalid Destination Language: {dest}")
+                packed += [separator, segment]
+
+        chunks = list(dict.fromkeys(chunk for chunk in packed[::2] if chunk))
+        for chunk in chunks:
+            if not self.byte_budget.fits(estimate((chunk,))):
+                raise BudgetExceeded(
+                    f"Sentence of {len(chunk)} characters does not fit into the byte budget"
+                )
 
-        origin = text
-        data, response = await self._translate(text, dest, src)
+        results = await asyncio.gather(
+            *(
+                self.translate(
+                    chunk, dest=dest, src=src, deadline=deadline, priority=priority, tenant=tenant
+                )
+                for chunk in chunks
+            )
+        )
+        return self._join_segments(text, packed, dict(zip(chunks, results)), dest, src)
 
-        token_found = False
-        square_bracket_counts = [0, 0]
-        resp = ""
-        for line in data.split("\n"):
-            token_found = token_found or f'"{RPC_ID}"' in line[:30]
-            if not token_found:
+    @staticmethod
+    def _join_segments(
+        text: str,
+        pieces: typing.List[str],
+        results: typing.Dict[str, Translated],
+        dest: str,
+        src: str,
+    ) -> Translated:
+        """
+        Собрать перевод текста из переводов его предложений (pieces как у split_segments).
+        """
+        segment_results = []
+        parts = []
+        output = []
+        for index, piece in enumerate(pieces):
+            if index % 2 or not piece:
+                # Разделители между предложениями сохраняются как есть
+                output.append(piece)
                 continue
+            result = results[piece]
+            segment_results.append(result)
+            parts.extend(result.parts)
+            output.append(result.text)
 
-            is_in_string = False
-            for index, char in enumerate(line):
-                # Проверка на начало и конец строки внутри кавычек
-                if char == '"' and line[max(0, index - 1)] != "\\":
-                    is_in_string = not is_in_string
-                if not is_in_string:
-                    if char == "[":
-                        square_bracket_counts[0] += 1
-                    elif char == "]":
-                        square_bracket_counts[1] += 1
-
-            resp += line
-            if square_bracket_counts[0] == square_bracket_counts[1]:
-                break
+        first = segment_results[0] if segment_results else None
+        return Translated(
+            src=first.src if first else src,
+            dest=first.dest if first else dest,
+            origin=text,
+            text="".join(output),
+            pronunciation=first.pronunciation if len(segment_results) == 1 else None,
+            parts=parts,
+            extra_data={"segments": segment_results},
+            response=first._response if first else None,
+        )
 
+    def _normalize_languages(self, dest: str, src: str) -> typing.Tuple[str, str]:
+        """
+        Привести языковые коды к виду, который понимает Google.
+        """
+        normalized_src = normalize_language(src)
+        if normalized_src is None:
+            raise ValueError(f"Invalid Source Language: {src.lower().split('_', 1)[0]}")
+        normalized_dest = normalize_language(dest)
+        if normalized_dest is None or normalized_dest == "auto":
+            raise ValueError(
+                f"Invalid Destination Language: {dest.lower().split('_', 1)[0]}"
+            )
+        return normalized_dest, normalized_src
+
+    async def _translate_one(
+        self,
+        text: str,
+        dest: str,
+        src: str,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> Translated:
+        """
+        Перевести один текст с уже нормализованными языками (кэш, планировщик, запрос).
+        """
+        expires = _expires(deadline)
+        if self.cache is not None:
+            key = make_key(text, dest, src)
+            cached = self.cache.get(key)
+            if cached != -1:
+                return cached
+
+        if self._batcher is not None:
+            result = await asyncio.wait_for(
+                self._batcher.submit((text, dest, src), (priority, tenant)), deadline
+            )
+        else:
+            async with self._slot(priority, tenant, expires):
+                async with self._reserve((text,), expires) as reservation:
+                    data, response = await self._translate(
+                        text, dest, src, _remaining(expires)
+                    )
+                    if reservation is not None:
+                        reservation.grow_to(len(data) * PARSED_FACTOR)
+
+                    parsed = self._parse_response(data, response)
+                    result = self._build_translated(parsed, text, dest, src, response)
+        if self.cache is not None:
+            self.cache.add(key, result)
+        return result
+
+    def _parse_response(self, data: bytes, response: httpx.Response) -> list:
+        """
+        Вырезать из ответа batchexecute кадр с нашим RPC и разобрать его JSON.
+        """
         try:
-            data_parsed = json.loads(resp)
-            parsed = json.loads(data_parsed[0][2])
+            frames = self._parse_frames(data)
+            parsed = frames.get("generic") or next(filter(None, frames.values()))
         except Exception as e:
             raise Exception(
                 f"Error occurred while loading data: {e} \n Response : {response}"
             )
+        return parsed
+
+    def _parse_frames(self, data: bytes) -> typing.Dict[str, typing.Optional[list]]:
+        """
+        Разобрать все кадры нашего RPC из ответа batchexecute.
+
+        JSON разбирается прямо из байтов ответа, без промежуточной строки.
+
+        Возвращает словарь идентификатор конверта -> разобранный JSON
+        (None, если Google вернул ошибку для этого конверта).
+        """
+        frames = {}
+        chunk = b""
+        for line in data.split(b"\n"):
+            if not chunk and not line.startswith(b"["):
+                continue
+            chunk += line
+            try:
+                items = json_backend.loads(chunk)
+            except json_backend.DecodeError:
+                # Кадр продолжается на следующей строке
+                continue
+            chunk = b""
+            for item in items:
+                if not isinstance(item, list) or len(item) < 3:
+                    continue
+                if item[0] != "wrb.fr" or item[1] != RPC_ID:
+                    continue
+                envelope = item[6] if len(item) > 6 else "generic"
+                frames[envelope] = json_backend.loads(item[2]) if item[2] else None
+        return frames
+
+    async def _translate_envelopes(
+        self,
+        items: typing.Sequence[typing.Tuple[str, str, str]],
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> typing.List[typing.Union[Translated, Exception]]:
+        """
+        Перевести несколько (text, dest, src) одним POST-запросом.
+
+        Ошибки изолированы: для конверта без ответа на его месте возвращается исключение.
+        """
+        expires = _expires(deadline)
+        texts = [text for text, _, _ in items]
+        if (
+            self.byte_budget is not None
+            and len(items) > 1
+            and not self.byte_budget.fits(estimate(texts))
+        ):
+            # Пачка не помещается в бюджет целиком - делим её пополам
+            middle = len(items) // 2
+            first, second = await asyncio.gather(
+                self._translate_envelopes(items[:middle], deadline, priority, tenant),
+                self._translate_envelopes(items[middle:], deadline, priority, tenant),
+            )
+            return first + second
+
+        try:
+            async with self._slot(priority, tenant, expires):
+                async with self._reserve(texts, expires) as reservation:
+                    return await self._send_envelopes(items, reservation, expires)
+        except BudgetExceeded as e:
+            return [e] * len(items)
+
+    async def _send_envelopes(
+        self,
+        items: typing.Sequence[typing.Tuple[str, str, str]],
+        reservation: typing.Optional[Reservation],
+        expires: typing.Optional[float] = None,
+    ) -> typing.List[typing.Union[Translated, Exception]]:
+        """
+        Отправить конверты одним запросом и разобрать ответ (место в планировщике
+        и в бюджете уже занято).
+
+        expires - момент истечения дедлайна вызова (time.monotonic).
+        """
+        data = {"f.req": self._build_batch_rpc_request(items)}
+        response = await self._post(data, RPC_PARAMS, _remaining(expires))
+        if reservation is not None:
+            reservation.grow_to(len(response.content) * PARSED_FACTOR)
+
+        if response.status_code != 200:
+            error = Exception(
+                f"""Unexpected status code "{response.status_code}" from {self.service_urls}"""
+            )
+            return [error] * len(items)
+
+        try:
+            frames = self._parse_frames(response.content)
+        except Exception as e:
+            error = Exception(
+                f"Error occurred while loading data: {e} \n Response : {response}"
+            )
+            return [error] * len(items)
 
+        results = []
+        for index, (text, dest, src) in enumerate(items, 1):
+            parsed = frames.get(str(index))
+            if parsed is None:
+                results.append(
+                    Exception(f"No translation for envelope {index} in {response}")
+                )
+                continue
+            try:
+                results.append(
+                    self._build_translated(parsed, text, dest, src, response)
+                )
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def _send_batch(
+        self,
+        items: typing.List[typing.Tuple[str, str, str]],
+        key: typing.Tuple[typing.Optional[str], typing.Optional[str]],
+    ) -> typing.List[typing.Union[Translated, Exception]]:
+        """
+        Отправить пачку, собранную MicroBatcher; key - (priority, tenant) её вызовов.
+        """
+        priority, tenant = key
+        return await self._translate_envelopes(items, priority=priority, tenant=tenant)
+
+    def _build_translated(
+        self, parsed: list, origin: str, dest: str, src: str, response: httpx.Response
+    ) -> Translated:
+        """
+        Собрать объект Translated из разобранного ответа.
+        """
         # Извлечение флага spacing и частей перевода
         should_spacing = parsed[1][0][0][3]
         translated_parts = list(
@@ -331,11 +972,358 @@ class Translator:
         )
         return result
 
-    async def detect(self, text: str) -> Detected:
+    async def translate_batch(
+        self,
+        texts: typing.Iterable[str],
+        dest: str = "en",
+        src: str = "auto",
+        concurrency: int = 8,
+        max_envelopes: int = 16,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> BatchTranslated:
+        """
+        Перевести набор текстов, отправляя каждое уникальное предложение один раз.
+
+        Тексты разбиваются на предложения, уникальные предложения без кэша упаковываются
+        по max_envelopes конвертов в один POST-запрос (не больше concurrency запросов
+        одновременно), затем каждый текст собирается обратно. Предложения, которые
+        отсекает prefilter, возвращаются как есть, а предложения с плейсхолдерами masker
+        переводятся по одному.
+        """
+        expires = _expires(deadline)
+        texts = list(texts)
+        dest, src = self._normalize_languages(dest, src)
+        pieces = [split_segments(text) for text in texts]
+
+        segments = chars = 0
+        unique = {}
+        for text_pieces in pieces:
+            for segment in text_pieces[::2]:
+                if not segment:
+                    continue
+                segments += 1
+                chars += len(segment)
+                unique.setdefault(segment, None)
+
+        results = {}
+        masked = []
+        missing = []
+        for segment in unique:
+            cached = -1
+            if self.cache is not None:
+                cached = self.cache.get(make_key(segment, dest, src))
+            if cached != -1:
+                results[segment] = cached
+                continue
+            reason = None if self.prefilter is None else self.prefilter.classify(segment, dest)
+            if reason is not None:
+                results[segment] = self._prefiltered(segment, dest, src, reason)
+            elif self.masker is not None and self.masker.mask(segment)[1]:
+                masked.append(segment)
+            else:
+                missing.append(segment)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        requests = 0
+
+        async def run_masked(segment: str) -> None:
+            nonlocal requests
+            async with semaphore:
+                results[segment] = await self._translate_masked(
+                    segment, dest, src, _remaining(expires), priority, tenant
+                )
+            requests += 1
+
+        async def run_chunk(chunk: typing.List[str]) -> None:
+            nonlocal requests
+            async with semaphore:
+                translated = await self._translate_envelopes(
+                    [(segment, dest, src) for segment in chunk],
+                    _remaining(expires),
+                    priority,
+                    tenant,
+                )
+                requests += 1
+            for segment, result in zip(chunk, translated):
+                if isinstance(result, Exception):
+                    raise result
+                results[segment] = result
+                if self.cache is not None:
+                    self.cache.add(make_key(segment, dest, src), result)
+
+        await asyncio.gather(
+            *(run_masked(segment) for segment in masked),
+            *(
+                run_chunk(missing[index : index + max_envelopes])
+                for index in range(0, len(missing), max_envelopes)
+            ),
+        )
+
+        translated = [
+            self._join_segments(text, text_pieces, results, dest, src)
+            for text, text_pieces in zip(texts, pieces)
+        ]
+
+        return BatchTranslated(
+            translated,
+            segments=segments,
+            unique_segments=len(unique),
+            chars=chars,
+            unique_chars=sum(map(len, unique)),
+            requests=requests,
+        )
+
+    def _build_lookup(self, result: Translated) -> Lookup:
+        """
+        Собрать Lookup из результата перевода одного слова.
+        """
+        parsed = (result.extra_data or {}).get("parsed") or []
+        return Lookup(
+            word=result.origin,
+            src=result.src,
+            dest=result.dest,
+            translation=result.text,
+            alternatives=extract_alternatives(parsed, self._find_translation_list),
+            response=result._response,
+        )
+
+    async def lookup(
+        self,
+        word: str,
+        dest: str = "en",
+        src: str = "auto",
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> Lookup:
+        """
+        Словарный режим: основной перевод слова и его альтернативы с частью речи и родом.
+
+        Данные берутся по фиксированным путям в ответе RPC; рекурсивный поиск
+        _find_translation_list используется, только если структура ответа изменилась.
+        """
+        dest, src = self._normalize_languages(dest, src)
+        result = await self._translate_one(word, dest, src, deadline, priority, tenant)
+        return self._build_lookup(result)
+
+    async def lookup_many(
+        self,
+        words: typing.Iterable[str],
+        dest: str = "en",
+        src: str = "auto",
+        max_envelopes: int = 16,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> typing.List[Lookup]:
+        """
+        Словарный режим для списка слов: слова без кэша отправляются пачками
+        по max_envelopes в одном POST-запросе.
+        """
+        words = list(words)
+        dest, src = self._normalize_languages(dest, src)
+
+        results = {}
+        missing = []
+        for word in dict.fromkeys(words):
+            cached = -1
+            if self.cache is not None:
+                cached = self.cache.get(make_key(word, dest, src))
+            if cached != -1:
+                results[word] = cached
+            else:
+                missing.append(word)
+
+        async def run(chunk: typing.List[str]) -> None:
+            translated = await self._translate_envelopes(
+                [(word, dest, src) for word in chunk], deadline, priority, tenant
+            )
+            for word, result in zip(chunk, translated):
+                if isinstance(result, Exception):
+                    raise result
+                results[word] = result
+                if self.cache is not None:
+                    self.cache.add(make_key(word, dest, src), result)
+
+        await asyncio.gather(
+            *(
+                run(missing[index : index + max_envelopes])
+                for index in range(0, len(missing), max_envelopes)
+            )
+        )
+        return [self._build_lookup(results[word]) for word in words]
+
+    async def translate_to_many(
+        self,
+        text: str,
+        dests: typing.Iterable[str],
+        src: str = "auto",
+        max_envelopes: int = 16,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> typing.Dict[str, Translated]:
+        """
+        Перевести один текст сразу на несколько языков.
+
+        Языки нормализуются один раз, переводы на все языки упаковываются в POST-запросы
+        по max_envelopes конвертов. При src="auto" язык определяется первым запросом и
+        переиспользуется в остальных. Возвращает словарь код языка -> Translated.
+        """
+        src = self._normalize_languages("en", src)[1]
+        dests = list(
+            dict.fromkeys(self._normalize_languages(dest, "auto")[0] for dest in dests)
+        )
+
+        results = {}
+        missing = []
+        for dest in dests:
+            cached = -1
+            if self.cache is not None:
+                cached = self.cache.get(make_key(text, dest, src))
+            if cached != -1:
+                results[dest] = cached
+            else:
+                missing.append(dest)
+
+        async def run(chunk: typing.List[str], chunk_src: str) -> None:
+            translated = await self._translate_envelopes(
+                [(text, dest, chunk_src) for dest in chunk], deadline, priority, tenant
+            )
+            for dest, result in zip(chunk, translated):
+                if isinstance(result, Exception):
+                    raise result
+                results[dest] = result
+                if self.cache is not None:
+                    self.cache.add(make_key(text, dest, src), result)
+
+        chunks = [
+            missing[index : index + max_envelopes]
+            for index in range(0, len(missing), max_envelopes)
+        ]
+        known_src = src
+        if src == "auto" and len(chunks) > 1:
+            # Определяем язык первым запросом, дальше он уже известен
+            await run(chunks.pop(0), src)
+            detected = results[missing[0]].src
+            if normalize_language(detected) not in (None, "auto"):
+                known_src = detected
+        await asyncio.gather(*(run(chunk, known_src) for chunk in chunks))
+
+        return {dest: results[dest] for dest in dests}
+
+    async def _translate_packed(
+        self,
+        texts: typing.Iterable[str],
+        dest: str,
+        src: str,
+        max_chars: int = 4000,
+        concurrency: int = 8,
+        **kwargs,
+    ) -> typing.Tuple[typing.Dict[str, str], typing.List[Translated]]:
+        """
+        Перевести короткие строки пачками: уникальные строки склеиваются через перевод
+        строки в запросы до max_chars символов, ответ разрезается обратно.
+
+        Если Google изменил число строк в пачке, её строки переводятся по одной.
+        Возвращает словарь текст -> перевод и список результатов всех запросов.
+        """
+        packs = []
+        current = []
+        size = 0
+        for text in dict.fromkeys(texts):
+            if "\n" in text or len(text) >= max_chars:
+                packs.append([text])
+                continue
+            if current and size + len(text) + 1 > max_chars:
+                packs.append(current)
+                current, size = [], 0
+            current.append(text)
+            size += len(text) + 1
+        if current:
+            packs.append(current)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        translations = {}
+        results = []
+
+        async def run(text: str) -> Translated:
+            async with semaphore:
+                result = await self.translate(text, dest=dest, src=src, **kwargs)
+            results.append(result)
+            return result
+
+        async def run_pack(pack: typing.List[str]) -> None:
+            result = await run("\n".join(pack))
+            lines = result.text.split("\n")
+            if len(lines) == len(pack):
+                translations.update(zip(pack, (line.strip() for line in lines)))
+                return
+            singles = await asyncio.gather(*(run(text) for text in pack))
+            translations.update(zip(pack, (single.text for single in singles)))
+
+        await asyncio.gather(*(run_pack(pack) for pack in packs))
+        return translations, results
+
+    async def translate_html(
+        self,
+        markup: str,
+        dest: str = "en",
+        src: str = "auto",
+        attributes: typing.Iterable[str] = DEFAULT_ATTRIBUTES,
+        skip_tags: typing.Iterable[str] = DEFAULT_SKIP_TAGS,
+        max_chars: int = 4000,
+        concurrency: int = 8,
+        **kwargs,
+    ) -> Translated:
+        """
+        Перевести HTML или XML документ, не отправляя разметку в Google.
+
+        Документ разбирается один раз, текстовые узлы и атрибуты attributes (кроме
+        содержимого skip_tags и элементов с translate="no") дедуплицируются,
+        переводятся пачками и записываются обратно в документ за один проход.
+        """
+        document = MarkupDocument(markup, attributes=attributes, skip_tags=skip_tags)
+        texts = document.texts()
+        translations, results = await self._translate_packed(
+            texts, dest, src, max_chars=max_chars, concurrency=concurrency, **kwargs
+        )
+        first = results[0] if results else None
+        return Translated(
+            src=first.src if first else src,
+            dest=first.dest if first else dest,
+            origin=markup,
+            text=document.render(translations),
+            pronunciation=None,
+            parts=[],
+            extra_data={
+                "nodes": len(texts),
+                "unique_nodes": len(translations),
+                "requests": len(results),
+            },
+            response=first._response if first else None,
+        )
+
+    async def detect(
+        self,
+        text: str,
+        deadline: typing.Optional[float] = None,
+        priority: typing.Optional[str] = None,
+        tenant: typing.Optional[str] = None,
+    ) -> Detected:
         """
         Определить язык текста.
         """
-        translated = await self.translate(text, src="auto", dest="en")
+        translated = await self.translate(
+            text,
+            src="auto",
+            dest="en",
+            deadline=deadline,
+            priority=priority,
+            tenant=tenant,
+        )
         return Detected(
             lang=translated.src,
             confidence=translated.extra_data.get("confidence", None),
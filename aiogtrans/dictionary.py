@@ -0,0 +1,140 @@
+"""
+Extraction of dictionary data (alternatives, parts of speech, gendered forms) from RPC responses
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import typing
+
+from .models import Alternative
+
+# Known positions inside the parsed MkEWBc payload
+TRANSLATIONS_PATH = (1, 0)
+ALL_TRANSLATIONS_PATH = (3, 5, 0)
+
+# Gendered entries carry a label such as "(feminine)" at this index
+GENDER_INDEX = 2
+
+
+def get_path(data: typing.Any, path: typing.Sequence[int]) -> typing.Any:
+    """Follow a fixed path of list indexes
+
+    Parameters
+    ----------
+    data: Any
+        The parsed payload
+    path: Sequence[int]
+        Indexes to follow
+
+    Returns
+    -------
+    Any
+        The node at path, None if the payload does not have that shape"""
+    for index in path:
+        if not isinstance(data, list) or len(data) <= index:
+            return None
+        data = data[index]
+    return data
+
+
+def _is_all_translations(node: typing.Any) -> bool:
+    """[[pos, [[word, _, [reverse translations], frequency], ...]], ...]"""
+    return (
+        isinstance(node, list)
+        and bool(node)
+        and all(
+            isinstance(group, list)
+            and len(group) >= 2
+            and isinstance(group[0], str)
+            and isinstance(group[1], list)
+            and all(
+                isinstance(entry, list) and entry and isinstance(entry[0], str)
+                for entry in group[1]
+            )
+            for group in node
+        )
+    )
+
+
+def _paths_missing(parsed: typing.Any) -> bool:
+    """The payload no longer has the shape the fixed paths point into
+
+    A missing or empty node along the dictionary path is a normal answer without alternatives,
+    most payloads end before it. Only a node of the wrong type or a payload without the
+    translations counts."""
+    if not isinstance(parsed, list):
+        return True
+    if not isinstance(get_path(parsed, TRANSLATIONS_PATH), list):
+        return True
+    node = parsed
+    for index in ALL_TRANSLATIONS_PATH[:-1]:
+        node = node[index] if len(node) > index else None
+        if node is None:
+            return False
+        if not isinstance(node, list):
+            return True
+    return False
+
+
+def _gender(entry: list) -> typing.Optional[str]:
+    label = entry[GENDER_INDEX] if len(entry) > GENDER_INDEX else None
+    if isinstance(label, str):
+        return label.strip("() ") or None
+    return None
+
+
+def extract_alternatives(
+    parsed: list, fallback: typing.Callable[[list], typing.Optional[list]]
+) -> typing.List[Alternative]:
+    """Structured alternatives of a single word translation
+
+    Parameters
+    ----------
+    parsed: list
+        The parsed MkEWBc payload
+    fallback: Callable
+        Recursive search used when the payload lacks the fixed paths, returns a list of [text, ...] entries
+
+    Returns
+    -------
+    List[Alternative]
+        Gendered translations first, then dictionary entries grouped by part of speech"""
+    alternatives = []
+
+    # Gendered translations come as several entries next to each other
+    translations = get_path(parsed, TRANSLATIONS_PATH)
+    if isinstance(translations, list) and len(translations) > 1:
+        for entry in translations:
+            text = get_path(entry, (5, 0, 0))
+            if isinstance(text, str):
+                alternatives.append(Alternative(text, gender=_gender(entry)))
+
+    groups = get_path(parsed, ALL_TRANSLATIONS_PATH)
+    if _is_all_translations(groups):
+        for group in groups:
+            for entry in group[1]:
+                synonyms = entry[2] if len(entry) > 2 and isinstance(entry[2], list) else []
+                frequency = entry[3] if len(entry) > 3 and isinstance(entry[3], int) else None
+                alternatives.append(
+                    Alternative(
+                        entry[0], pos=group[0], synonyms=synonyms, frequency=frequency
+                    )
+                )
+        return alternatives
+
+    if alternatives or not _paths_missing(parsed):
+        return alternatives
+
+    # The schema changed, search the whole tree for something that looks like candidates
+    found = fallback(parsed) or []
+    return [Alternative(entry[0]) for entry in found]
@@ -0,0 +1,185 @@
+"""
+TTL based async DNS cache shared by the HTTP transports
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import time
+import typing
+
+import httpcore
+
+
+class DNSCache:
+    """
+    Caches getaddrinfo results for ttl seconds, concurrent lookups of one host share a single query
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 5.0) -> None:
+        """DNS Cache Init
+
+        Parameters
+        ----------
+        ttl: float
+            Seconds a successful lookup is reused
+            Default 300
+        negative_ttl: float
+            Seconds a failed lookup is remembered
+            Default 5
+
+        Returns
+        -------
+        None"""
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # (host, port) -> (expires, addresses or exception)
+        self._entries = {}
+        self._pending = {}
+
+    async def resolve(self, host: str, port: int) -> typing.List[str]:
+        """Addresses of host, from the cache when possible
+
+        Parameters
+        ----------
+        host: str
+            Host name or IP address
+        port: int
+            Port the connection will use
+
+        Returns
+        -------
+        List[str]
+            IP addresses in the order returned by the resolver
+
+        Raises
+        ------
+        OSError
+            The host could not be resolved"""
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            if isinstance(entry[1], Exception):
+                raise entry[1]
+            return entry[1]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._lookup(host, port))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, host: str, port: int) -> typing.List[str]:
+        key = (host, port)
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except OSError as e:
+            self._entries[key] = (time.monotonic() + self.negative_ttl, e)
+            raise
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._entries[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: typing.Optional[str] = None) -> None:
+        """Forget cached lookups
+
+        Parameters
+        ----------
+        host: str, None
+            Only forget this host
+            Default None, forget everything
+
+        Returns
+        -------
+        None"""
+        if host is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == host]:
+            del self._entries[key]
+
+
+SHARED_DNS_CACHE = DNSCache()
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that resolves host names through a DNSCache
+
+    TLS still uses the original host name for SNI and certificate checks, only the TCP connect goes to the cached address.
+    """
+
+    def __init__(
+        self, dns_cache: DNSCache, backend: httpcore.AsyncNetworkBackend
+    ) -> None:
+        """Caching Network Backend Init
+
+        Parameters
+        ----------
+        dns_cache: DNSCache
+            The cache to resolve through
+        backend: httpcore.AsyncNetworkBackend
+            The backend opening the actual connections
+
+        Returns
+        -------
+        None"""
+        self.dns_cache = dns_cache
+        self._backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: typing.Optional[float] = None,
+        local_address: typing.Optional[str] = None,
+        socket_options: typing.Optional[typing.Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self.dns_cache.resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # Every cached address failed, the host may have moved
+        self.dns_cache.invalidate(host)
+        raise error
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: typing.Optional[float] = None,
+        socket_options: typing.Optional[typing.Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
@@ -0,0 +1,182 @@
+"""
+Incremental re-translation of documents that are edited and translated again
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import hashlib
+import typing
+
+from .models import Translated
+from .segments import split_segments
+
+if typing.TYPE_CHECKING:
+    from .client import Translator
+
+
+def segment_hash(segment: str) -> str:
+    """Content hash identifying a segment
+
+    Parameters
+    ----------
+    segment: str
+        Segment text
+
+    Returns
+    -------
+    str"""
+    return hashlib.blake2b(segment.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DocumentSession:
+    """
+    Translation state of one document, a re-translation only sends segments that are new or changed.
+
+    The session keeps the content hash of every segment with its translation. On each call the new
+    source is split into segments again, segments with a known hash reuse their stored translation
+    and everything else is translated and spliced in, so the cost follows the size of the edit.
+    """
+
+    def __init__(
+        self,
+        translator: "Translator",
+        dest: str = "en",
+        src: str = "auto",
+        concurrency: int = 8,
+    ) -> None:
+        """Document Session Init
+
+        Parameters
+        ----------
+        translator: Translator
+            Translator used for new and changed segments
+        dest: str
+            Destination language
+            Default en
+        src: str
+            Source language
+            Default auto
+        concurrency: int
+            Maximum amount of requests in flight
+            Default 8
+
+        Returns
+        -------
+        None"""
+        self.translator = translator
+        self.dest = dest
+        self.src = src
+        self.concurrency = concurrency
+        # segment hash -> (translation, detected source language)
+        self.segments = {}
+
+    async def translate(self, text: str, **kwargs) -> Translated:
+        """Translate the current version of the document
+
+        Parameters
+        ----------
+        text: str
+            Full source of the document
+        **kwargs
+            Passed to Translator.translate_batch (deadline, priority, tenant)
+
+        Returns
+        -------
+        Translated
+            extra_data holds the amount of segments, translated and reused ones"""
+        pieces = split_segments(text)
+        hashes = [
+            segment_hash(piece) if index % 2 == 0 and piece else None
+            for index, piece in enumerate(pieces)
+        ]
+
+        changed = {}
+        for piece, digest in zip(pieces, hashes):
+            if digest is not None and digest not in self.segments:
+                changed.setdefault(digest, piece)
+
+        results = []
+        if changed:
+            # Changed segments are packed into shared requests like any other batch
+            results = await self.translator.translate_batch(
+                list(changed.values()),
+                dest=self.dest,
+                src=self.src,
+                concurrency=self.concurrency,
+                **kwargs,
+            )
+
+        segments = {}
+        for digest, result in zip(changed, results):
+            segments[digest] = (result.text, result.src)
+        output = []
+        reused = 0
+        for piece, digest in zip(pieces, hashes):
+            if digest is None:
+                output.append(piece)
+                continue
+            if digest not in segments:
+                segments[digest] = self.segments[digest]
+                reused += 1
+            output.append(segments[digest][0])
+        # Segments removed from the document are dropped, the state never outgrows it
+        self.segments = segments
+
+        sources = [source for _, source in segments.values()]
+        return Translated(
+            src=max(set(sources), key=sources.count) if sources else self.src,
+            dest=self.dest,
+            origin=text,
+            text="".join(output),
+            pronunciation=None,
+            parts=[],
+            extra_data={
+                "segments": sum(digest is not None for digest in hashes),
+                "translated": len(changed),
+                "reused": reused,
+            },
+        )
+
+    def to_dict(self) -> dict:
+        """State of the session that can be stored as JSON next to the document
+
+        Returns
+        -------
+        dict"""
+        return {
+            "dest": self.dest,
+            "src": self.src,
+            "segments": {digest: list(value) for digest, value in self.segments.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, translator: "Translator", state: dict, **kwargs) -> "DocumentSession":
+        """Restore a session stored with to_dict
+
+        Parameters
+        ----------
+        translator: Translator
+            Translator used for new and changed segments
+        state: dict
+            Value returned by to_dict
+        **kwargs
+            Passed to DocumentSession
+
+        Returns
+        -------
+        DocumentSession"""
+        session = cls(translator, dest=state["dest"], src=state["src"], **kwargs)
+        session.segments = {
+            digest: tuple(value) for digest, value in state["segments"].items()
+        }
+        return session
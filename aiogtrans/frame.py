@@ -0,0 +1,119 @@
+"""
+Translation of whole columns (pandas Series, pyarrow arrays or plain sequences)
+
+pandas and pyarrow are optional, they are only imported when a column of their type is passed.
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import sys
+import typing
+
+from .client import Translator
+
+
+def _is_pandas(column: typing.Any) -> bool:
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(column, pandas.Series)
+
+
+def _is_arrow(column: typing.Any) -> bool:
+    pyarrow = sys.modules.get("pyarrow")
+    return pyarrow is not None and isinstance(column, (pyarrow.Array, pyarrow.ChunkedArray))
+
+
+async def _translate_unique(
+    values: typing.Iterable[str],
+    translator: typing.Optional[Translator],
+    dest: str,
+    src: str,
+    concurrency: int,
+    **kwargs,
+) -> typing.Dict[str, str]:
+    values = list(values)
+    if not values:
+        return {}
+    owned = translator is None
+    if owned:
+        translator = Translator()
+    try:
+        batch = await translator.translate_batch(
+            values, dest=dest, src=src, concurrency=concurrency, **kwargs
+        )
+    finally:
+        if owned:
+            await translator.close()
+    return {value: result.text for value, result in zip(values, batch)}
+
+
+async def translate_column(
+    column: typing.Any,
+    dest: str = "en",
+    src: str = "auto",
+    translator: typing.Optional[Translator] = None,
+    concurrency: int = 8,
+    **kwargs,
+) -> typing.Any:
+    """Translate every string of a column, each distinct value only once
+
+    Parameters
+    ----------
+    column: pandas.Series, pyarrow.Array, pyarrow.ChunkedArray, Sequence
+        The column to translate
+    dest: str
+        Destination language
+        Default en
+    src: str
+        Source language
+        Default auto
+    translator: Translator, None
+        Translator to use, a temporary one is created and closed when None
+    concurrency: int
+        Maximum amount of requests in flight
+        Default 8
+    **kwargs
+        Passed to Translator.translate_batch
+
+    Returns
+    -------
+    pandas.Series, pyarrow.Array, list
+        A new column of the same kind and length, nulls and non string values are passed through untouched"""
+    if _is_arrow(column):
+        import pyarrow
+        import pyarrow.compute
+
+        if isinstance(column, pyarrow.ChunkedArray):
+            column = column.combine_chunks()
+        if not (pyarrow.types.is_string(column.type) or pyarrow.types.is_large_string(column.type)):
+            return column
+        # Dictionary encoding is the factorization, only the dictionary gets translated
+        encoded = pyarrow.compute.dictionary_encode(column)
+        uniques = encoded.dictionary.to_pylist()
+        mapping = await _translate_unique(uniques, translator, dest, src, concurrency, **kwargs)
+        dictionary = pyarrow.array([mapping[value] for value in uniques], type=column.type)
+        return pyarrow.DictionaryArray.from_arrays(encoded.indices, dictionary).cast(column.type)
+
+    values = list(column)
+    uniques = dict.fromkeys(value for value in values if isinstance(value, str) and value)
+    mapping = await _translate_unique(uniques, translator, dest, src, concurrency, **kwargs)
+    translated = [
+        mapping.get(value, value) if isinstance(value, str) else value for value in values
+    ]
+
+    if _is_pandas(column):
+        import pandas
+
+        # Translated values are new categories, a categorical column comes back as plain values
+        dtype = None if isinstance(column.dtype, pandas.CategoricalDtype) else column.dtype
+        return pandas.Series(translated, index=column.index, name=column.name, dtype=dtype)
+    return translated
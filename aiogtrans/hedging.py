@@ -0,0 +1,120 @@
+"""
+Tail latency helpers used for hedged requests
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import typing
+from collections import deque
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent request latencies, used to derive the hedge delay
+    """
+
+    def __init__(self, window: int = 256, min_samples: int = 20) -> None:
+        """Latency Tracker Init
+
+        Parameters
+        ----------
+        window: int
+            How many recent samples are kept
+            Default 256
+        min_samples: int
+            Percentiles are not reported until this many samples were observed
+            Default 20
+
+        Returns
+        -------
+        None"""
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        """Record the latency of a finished request
+
+        Parameters
+        ----------
+        seconds: float
+            Wall time of the request
+
+        Returns
+        -------
+        None"""
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> typing.Optional[float]:
+        """Latency at the given percentile
+
+        Parameters
+        ----------
+        q: float
+            Percentile between 0 and 100
+
+        Returns
+        -------
+        float, None
+            The latency in seconds, or None while there are too few samples"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Token bucket that caps hedged requests to a fraction of primary requests
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: int = 10) -> None:
+        """Hedge Budget Init
+
+        Parameters
+        ----------
+        ratio: float
+            Hedges earned per primary request, 0.1 allows at most 10% extra load
+            Default 0.1
+        burst: int
+            Maximum amount of hedges that can be saved up
+            Default 10
+
+        Returns
+        -------
+        None"""
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+        self.hedges = 0
+
+    def on_request(self) -> None:
+        """Credit the budget for a primary request
+
+        Returns
+        -------
+        None"""
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Spend one hedge if the budget allows it
+
+        Returns
+        -------
+        bool
+            Whether a hedge may be sent"""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.hedges += 1
+        return True
@@ -0,0 +1,106 @@
+"""
+JSON encoding and decoding through the fastest installed library
+
+orjson, msgspec and ujson are used when available, the standard library otherwise.
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import importlib
+import json
+import os
+import typing
+
+BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+
+def _load(name: str) -> typing.Tuple[typing.Callable, typing.Callable]:
+    """Import a backend and return its (dumps, loads) pair, raises ImportError if missing"""
+    if name == "orjson":
+        orjson = importlib.import_module("orjson")
+        return (lambda obj: orjson.dumps(obj).decode("utf-8")), orjson.loads
+    if name == "msgspec":
+        msgspec_json = importlib.import_module("msgspec.json")
+        encode, decode = msgspec_json.encode, msgspec_json.decode
+        return (lambda obj: encode(obj).decode("utf-8")), decode
+    if name == "ujson":
+        ujson = importlib.import_module("ujson")
+        return (lambda obj: ujson.dumps(obj, ensure_ascii=False)), ujson.loads
+    if name == "json":
+        return (
+            lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        ), json.loads
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+def _decode_errors() -> typing.Tuple[typing.Type[Exception], ...]:
+    """Exceptions raised by the installed backends for malformed or incomplete JSON
+
+    The standard library, orjson and ujson raise ValueError subclasses, msgspec does not"""
+    errors = [ValueError]
+    try:
+        errors.append(importlib.import_module("msgspec").DecodeError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def available() -> typing.List[str]:
+    """Names of the backends that can be imported
+
+    Returns
+    -------
+    List[str]"""
+    names = []
+    for name in BACKENDS:
+        try:
+            _load(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def use(name: typing.Optional[str] = None) -> str:
+    """Switch the backend used by dumps and loads
+
+    Parameters
+    ----------
+    name: str, None
+        One of BACKENDS, None picks the first installed one
+        The AIOGTRANS_JSON environment variable is used at import time
+
+    Returns
+    -------
+    str
+        The name of the selected backend"""
+    global dumps, loads, BACKEND
+    for candidate in [name] if name else BACKENDS:
+        try:
+            dumps, loads = _load(candidate)
+        except ImportError:
+            if name:
+                raise
+            continue
+        BACKEND = candidate
+        return candidate
+
+
+BACKEND = "json"
+DecodeError = _decode_errors()
+"""Catch this tuple around loads, it covers every backend"""
+dumps: typing.Callable[[typing.Any], str]
+"""Serialize to compact JSON text"""
+loads: typing.Callable[[typing.Union[bytes, str]], typing.Any]
+"""Parse JSON from bytes or text, bytes are decoded by the backend without an intermediate str"""
+use(os.getenv("AIOGTRANS_JSON") or None)
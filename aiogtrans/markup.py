@@ -0,0 +1,220 @@
+"""
+Extraction of translatable text from HTML and XML documents
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import html
+import re
+import typing
+from html.parser import HTMLParser
+
+DEFAULT_ATTRIBUTES = ("alt", "title", "placeholder", "aria-label")
+
+DEFAULT_SKIP_TAGS = ("script", "style", "code", "noscript")
+
+VOID_TAGS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+
+_SURROUNDING_SPACE = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+
+
+class _Piece:
+    __slots__ = ("start", "kind", "data")
+
+    def __init__(self, start: int, kind: str, data=None) -> None:
+        self.start = start
+        # "raw" is copied as is, "text" holds a text node, "tag" a start tag with translatable attributes
+        self.kind = kind
+        self.data = data
+
+
+class _Collector(HTMLParser):
+    def __init__(
+        self,
+        source: str,
+        attributes: typing.Iterable[str],
+        skip_tags: typing.Iterable[str],
+    ) -> None:
+        super().__init__(convert_charrefs=True)
+        self.attributes = frozenset(name.lower() for name in attributes)
+        self.skip_tags = frozenset(tag.lower() for tag in skip_tags)
+        self.pieces = []
+        # Tag names that opened a skipped region, a translate="no" element counts as one too
+        self.skipping = []
+        self._line_starts = [0]
+        for match in re.finditer("\n", source):
+            self._line_starts.append(match.end())
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def _raw(self) -> None:
+        self.pieces.append(_Piece(self._offset(), "raw"))
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in VOID_TAGS:
+            self._add_tag(attrs)
+            return
+        if self.skipping or tag in self.skip_tags or dict(attrs).get("translate") == "no":
+            self.skipping.append(tag)
+            self._raw()
+            return
+        self._add_tag(attrs)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self._add_tag(attrs)
+
+    def _add_tag(self, attrs: list) -> None:
+        values = {}
+        if not self.skipping:
+            values = {
+                name: value
+                for name, value in attrs
+                if name in self.attributes and value and value.strip()
+            }
+        self.pieces.append(_Piece(self._offset(), "tag" if values else "raw", values))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.skipping:
+            # Drop everything opened after the matching start tag as well
+            del self.skipping[len(self.skipping) - 1 - self.skipping[::-1].index(tag) :]
+        self._raw()
+
+    def handle_data(self, data: str) -> None:
+        if self.skipping or not data.strip():
+            self._raw()
+            return
+        previous = self.pieces[-1] if self.pieces else None
+        if previous is not None and previous.kind == "text":
+            # A stray "<" splits a text node, keep it in one piece
+            previous.data += data
+            return
+        self.pieces.append(_Piece(self._offset(), "text", data))
+
+    def handle_comment(self, data: str) -> None:
+        self._raw()
+
+    def handle_decl(self, decl: str) -> None:
+        self._raw()
+
+    def handle_pi(self, data: str) -> None:
+        self._raw()
+
+    def unknown_decl(self, data: str) -> None:
+        self._raw()
+
+
+class MarkupDocument:
+    """
+    A parsed document, the text nodes and attributes to translate plus everything needed to write them back
+    """
+
+    def __init__(
+        self,
+        source: str,
+        attributes: typing.Iterable[str] = DEFAULT_ATTRIBUTES,
+        skip_tags: typing.Iterable[str] = DEFAULT_SKIP_TAGS,
+    ) -> None:
+        """Markup Document Init
+
+        Parameters
+        ----------
+        source: str
+            HTML or XML markup
+        attributes: Iterable[str]
+            Attribute names whose values are translated
+        skip_tags: Iterable[str]
+            Elements whose content is never translated
+
+        Returns
+        -------
+        None"""
+        self.source = source
+        collector = _Collector(source, attributes, skip_tags)
+        collector.feed(source)
+        collector.close()
+
+        self._pieces = []
+        pieces = collector.pieces
+        for index, piece in enumerate(pieces):
+            end = pieces[index + 1].start if index + 1 < len(pieces) else len(source)
+            self._pieces.append((piece.kind, source[piece.start : end], piece.data))
+
+    def texts(self) -> typing.List[str]:
+        """Every translatable string in document order, without surrounding whitespace
+
+        Returns
+        -------
+        List[str]"""
+        texts = []
+        for kind, _, data in self._pieces:
+            if kind == "text":
+                texts.append(data.strip())
+            elif kind == "tag":
+                texts.extend(value.strip() for value in data.values())
+        return texts
+
+    def render(self, translations: typing.Mapping[str, str]) -> str:
+        """Write translations back into the document in a single pass
+
+        Parameters
+        ----------
+        translations: Mapping[str, str]
+            Translation of every string returned by texts, missing ones are left untouched
+
+        Returns
+        -------
+        str
+            The translated markup"""
+        output = []
+        for kind, raw, data in self._pieces:
+            if kind == "text":
+                lead, core, trail = _SURROUNDING_SPACE.match(data).groups()
+                if core in translations:
+                    output.append(lead + html.escape(translations[core], quote=False) + trail)
+                else:
+                    output.append(raw)
+            elif kind == "tag":
+                for name, value in data.items():
+                    translated = translations.get(value.strip())
+                    if translated is None:
+                        continue
+                    raw = re.sub(
+                        r"(\s%s\s*=\s*)(\"[^\"]*\"|'[^']*'|[^\s>]+)" % re.escape(name),
+                        lambda match: match.group(1) + '"%s"' % html.escape(translated),
+                        raw,
+                        count=1,
+                        flags=re.IGNORECASE,
+                    )
+                output.append(raw)
+            else:
+                output.append(raw)
+        return "".join(output)
@@ -0,0 +1,132 @@
+"""
+Placeholder masking, so templated strings share one cache entry
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import re
+import typing
+
+URL_PATTERN = r"(?:https?://|www\.)[^\s<>\"']+[^\s<>\"'.,;:!?)\]]"
+EMAIL_PATTERN = r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+NUMBER_PATTERN = r"\d+(?:[.,:/-]\d+)*"
+EMOJI_PATTERN = (
+    r"[\U0001F000-\U0001FAFF\U0001F1E6-\U0001F1FF☀-➿⬀-⯿]"
+    r"[\U0001F000-\U0001FAFF\U0001F3FB-\U0001F3FF☀-➿⬀-⯿️‍]*"
+)
+
+# Placeholders look like {0}, Google sometimes adds spaces inside the braces
+_PLACEHOLDER = r"\{\s*(\d+)\s*\}"
+
+
+class Masker:
+    """
+    Replaces volatile spans (numbers, urls, emails, emoji, custom regexes) with numbered placeholders
+    """
+
+    def __init__(
+        self,
+        numbers: bool = True,
+        urls: bool = True,
+        emails: bool = True,
+        emoji: bool = True,
+        patterns: typing.Iterable[typing.Union[str, typing.Pattern]] = (),
+    ) -> None:
+        """Masker Init
+
+        Parameters
+        ----------
+        numbers: bool
+            Mask numbers such as 48213 or 3.14
+        urls: bool
+            Mask http(s) and www urls
+        emails: bool
+            Mask email addresses
+        emoji: bool
+            Mask emoji sequences
+        patterns: Iterable[str, Pattern]
+            Extra regexes to mask, checked before the builtin ones
+
+        Returns
+        -------
+        None"""
+        # Text that already looks like a placeholder is masked too, so it survives unmasking untouched
+        alternatives = [_PLACEHOLDER.replace("(\\d+)", "\\d+")]
+        alternatives.extend(
+            pattern.pattern if isinstance(pattern, typing.Pattern) else pattern
+            for pattern in patterns
+        )
+        if urls:
+            alternatives.append(URL_PATTERN)
+        if emails:
+            alternatives.append(EMAIL_PATTERN)
+        if numbers:
+            alternatives.append(NUMBER_PATTERN)
+        if emoji:
+            alternatives.append(EMOJI_PATTERN)
+        self._pattern = re.compile("|".join(f"(?:{alt})" for alt in alternatives))
+        self._placeholder = re.compile(_PLACEHOLDER)
+
+    def mask(self, text: str) -> typing.Tuple[str, typing.List[str]]:
+        """Replace every masked span with a placeholder
+
+        Parameters
+        ----------
+        text: str
+            The text to mask
+
+        Returns
+        -------
+        Tuple[str, List[str]]
+            The template and the original values, placeholder {i} stands for originals[i]"""
+        originals = []
+
+        def replace(match: typing.Match) -> str:
+            originals.append(match.group())
+            return "{%d}" % (len(originals) - 1)
+
+        return self._pattern.sub(replace, text), originals
+
+    def unmask(self, text: str, originals: typing.List[str]) -> str:
+        """Put the original values back into a translated template
+
+        Parameters
+        ----------
+        text: str
+            The translated template
+        originals: List[str]
+            Values returned by mask
+
+        Returns
+        -------
+        str
+            The text with every placeholder substituted
+
+        Raises
+        ------
+        ValueError
+            A placeholder is missing, duplicated or unknown"""
+        seen = set()
+
+        def replace(match: typing.Match) -> str:
+            index = int(match.group(1))
+            if index >= len(originals) or index in seen:
+                raise ValueError(f"Unexpected placeholder {match.group()}")
+            seen.add(index)
+            return originals[index]
+
+        result = self._placeholder.sub(replace, text)
+        if len(seen) != len(originals):
+            missing = sorted(set(range(len(originals))) - seen)
+            raise ValueError(f"Placeholders lost in translation: {missing}")
+        return result
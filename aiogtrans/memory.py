@@ -0,0 +1,330 @@
+"""
+Streaming import and export of translation memories (TMX, JSONL, CSV) to seed and dump the cache
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import contextlib
+import csv
+import json
+import os
+import typing
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from .cache import Cache, make_key
+from .client import normalize_language
+from .models import Translated, TranslatedPart
+
+FORMATS = ("tmx", "jsonl", "csv")
+
+FIELDS = ("src", "dest", "text", "translation")
+
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# (src, dest, text, translation)
+Entry = typing.Tuple[str, str, str, str]
+
+PathOrFile = typing.Union[str, os.PathLike, typing.IO]
+
+
+def _format(target: PathOrFile, format: typing.Optional[str]) -> str:
+    if format is None:
+        name = target if isinstance(target, (str, os.PathLike)) else getattr(target, "name", "")
+        format = os.path.splitext(os.fspath(name))[1].lstrip(".").lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unknown translation memory format: {format or None}, use one of {FORMATS}")
+    return format
+
+
+@contextlib.contextmanager
+def _open(target: PathOrFile, mode: str, **kwargs) -> typing.Iterator[typing.IO]:
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode, **kwargs) as f:
+            yield f
+    else:
+        yield target
+
+
+def language(code: str) -> typing.Optional[str]:
+    """Normalize a language code of a translation memory ("en-US" -> "en", "zh_CN" -> "zh-cn")
+
+    Parameters
+    ----------
+    code: str
+        Language code or name
+
+    Returns
+    -------
+    str, None
+        The Google language code, None if the language is unknown"""
+    # normalize_language drops everything after "_", which would turn zh_CN into the unknown "zh"
+    code = code.strip().replace("_", "-")
+    normalized = normalize_language(code)
+    if normalized is None and "-" in code:
+        normalized = normalize_language(code.split("-", 1)[0])
+    return normalized if normalized != "auto" else None
+
+
+def iter_tmx(source: PathOrFile) -> typing.Iterator[Entry]:
+    """Stream the entries of a TMX file, every translation unit is freed once read
+
+    A unit yields one entry per target variant, from the srclang of the unit or the header.
+    With srclang "*all*" every ordered pair of variants is yielded.
+
+    Parameters
+    ----------
+    source: str, PathLike, IO
+        Path or binary file object
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, str, str]]
+        (src, dest, text, translation) with the language codes as written in the file"""
+    header_src = None
+    body = None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if element.tag == "body":
+                body = element
+            continue
+        if element.tag == "header":
+            header_src = element.get("srclang")
+        elif element.tag == "tu":
+            variants = []
+            for tuv in element.iter("tuv"):
+                lang = tuv.get(_XML_LANG) or tuv.get("lang")
+                seg = tuv.find("seg")
+                if lang and seg is not None:
+                    variants.append((lang, "".join(seg.itertext())))
+            src = element.get("srclang") or header_src
+            for src_lang, text in variants:
+                if src and src != "*all*" and src_lang.lower() != src.lower():
+                    continue
+                for dest_lang, translation in variants:
+                    if dest_lang.lower() != src_lang.lower():
+                        yield src_lang, dest_lang, text, translation
+            # Keep memory flat on files of millions of units, the parser keeps
+            # every unit attached to <body> until it is removed from there
+            element.clear()
+            if body is not None:
+                body.remove(element)
+
+
+def iter_jsonl(source: PathOrFile) -> typing.Iterator[Entry]:
+    """Stream the entries of a JSONL file with src, dest, text and translation fields
+
+    Parameters
+    ----------
+    source: str, PathLike, IO
+        Path or text file object
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, str, str]]"""
+    with _open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield tuple(record[field] for field in FIELDS)
+
+
+def iter_csv(source: PathOrFile) -> typing.Iterator[Entry]:
+    """Stream the entries of a CSV file with a src, dest, text, translation header
+
+    Parameters
+    ----------
+    source: str, PathLike, IO
+        Path or text file object
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, str, str]]"""
+    with _open(source, "r", encoding="utf-8", newline="") as f:
+        for record in csv.DictReader(f):
+            yield tuple(record[field] for field in FIELDS)
+
+
+def write_tmx(entries: typing.Iterable[Entry], target: PathOrFile) -> int:
+    """Write entries as a TMX 1.4 file, one translation unit per entry
+
+    Parameters
+    ----------
+    entries: Iterable[Tuple[str, str, str, str]]
+        (src, dest, text, translation)
+    target: str, PathLike, IO
+        Path or text file object
+
+    Returns
+    -------
+    int
+        Amount of entries written"""
+    count = 0
+    with _open(target, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n')
+        f.write(
+            '<header creationtool="aiogtrans" creationtoolversion="1" segtype="sentence" '
+            'o-tmf="aiogtrans" adminlang="en" srclang="*all*" datatype="plaintext"/>\n<body>\n'
+        )
+        for src, dest, text, translation in entries:
+            f.write(
+                f"<tu srclang={quoteattr(src)}>"
+                f"<tuv xml:lang={quoteattr(src)}><seg>{escape(text)}</seg></tuv>"
+                f"<tuv xml:lang={quoteattr(dest)}><seg>{escape(translation)}</seg></tuv>"
+                "</tu>\n"
+            )
+            count += 1
+        f.write("</body>\n</tmx>\n")
+    return count
+
+
+def write_jsonl(entries: typing.Iterable[Entry], target: PathOrFile) -> int:
+    """Write entries as JSONL with src, dest, text and translation fields
+
+    Parameters
+    ----------
+    entries: Iterable[Tuple[str, str, str, str]]
+        (src, dest, text, translation)
+    target: str, PathLike, IO
+        Path or text file object
+
+    Returns
+    -------
+    int
+        Amount of entries written"""
+    count = 0
+    with _open(target, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(dict(zip(FIELDS, entry)), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def write_csv(entries: typing.Iterable[Entry], target: PathOrFile) -> int:
+    """Write entries as CSV with a src, dest, text, translation header
+
+    Parameters
+    ----------
+    entries: Iterable[Tuple[str, str, str, str]]
+        (src, dest, text, translation)
+    target: str, PathLike, IO
+        Path or text file object
+
+    Returns
+    -------
+    int
+        Amount of entries written"""
+    count = 0
+    with _open(target, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for entry in entries:
+            writer.writerow(entry)
+            count += 1
+    return count
+
+
+READERS = {"tmx": iter_tmx, "jsonl": iter_jsonl, "csv": iter_csv}
+
+WRITERS = {"tmx": write_tmx, "jsonl": write_jsonl, "csv": write_csv}
+
+
+def load(
+    cache: Cache,
+    source: PathOrFile,
+    format: typing.Optional[str] = None,
+    auto_source: bool = True,
+) -> int:
+    """Seed a cache from a translation memory, entries are streamed so memory stays flat
+
+    Parameters
+    ----------
+    cache: Cache
+        The cache passed to Translator
+    source: str, PathLike, IO
+        Path or file object, TMX needs a binary one
+    format: str, None
+        tmx, jsonl or csv
+        Default None, guessed from the file extension
+    auto_source: bool
+        Also store every entry under src="auto", so calls without a source language hit
+        Default True
+
+    Returns
+    -------
+    int
+        Amount of entries loaded, entries with unknown languages or empty texts are skipped"""
+    count = 0
+    for src, dest, text, translation in READERS[_format(source, format)](source):
+        src, dest = language(src), language(dest)
+        if src is None or dest is None or not text or not translation:
+            continue
+        result = Translated(
+            src=src,
+            dest=dest,
+            origin=text,
+            text=translation,
+            pronunciation=None,
+            parts=[TranslatedPart(translation, [])],
+            extra_data={"memory": True},
+        )
+        cache.add(make_key(text, dest, src), result)
+        if auto_source:
+            cache.add(make_key(text, dest, "auto"), result)
+        count += 1
+    return count
+
+
+def entries(cache: Cache) -> typing.Iterator[Entry]:
+    """Entries of the live cache, once per text and language pair
+
+    Parameters
+    ----------
+    cache: Cache
+        The cache to read
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, str, str]]"""
+    seen = set()
+    for key, value in cache.items():
+        if not isinstance(value, Translated):
+            continue
+        src, dest, text = key.split("\x1f", 2)
+        if src == "auto":
+            # The detected language of a cached auto translation
+            src = value.src
+        if (src, dest, text) in seen or src == "auto":
+            continue
+        seen.add((src, dest, text))
+        yield src, dest, text, value.text
+
+
+def dump(cache: Cache, target: PathOrFile, format: typing.Optional[str] = None) -> int:
+    """Write the live cache as a translation memory
+
+    Parameters
+    ----------
+    cache: Cache
+        The cache to dump
+    target: str, PathLike, IO
+        Path or text file object
+    format: str, None
+        tmx, jsonl or csv
+        Default None, guessed from the file extension
+
+    Returns
+    -------
+    int
+        Amount of entries written"""
+    return WRITERS[_format(target, format)](entries(cache), target)
@@ -14,9 +14,11 @@ copies or substantial portions of the Software.
 
 import typing
 
-from aiohttp import ClientResponse
 from httpx import Response
 
+if typing.TYPE_CHECKING:
+    from aiohttp import ClientResponse
+
 
 class Base:
     """
@@ -25,7 +27,7 @@ class Base:
 
     __slots__ = "_response"
 
-    def __init__(self, response: typing.Union[Response, ClientResponse] = None) -> None:
+    def __init__(self, response: typing.Union[Response, "ClientResponse"] = None) -> None:
         """
         Base class for basically all objects
         """
@@ -141,3 +143,159 @@ class Detected(Base):
 
     def __unicode__(self) -> str:
         return f"Detected(lang={self.lang}, confidence={self.confidence})"
+
+
+class Alternative:
+    """
+    One alternative translation of a word
+
+    :param text: the alternative translation
+    :param pos: part of speech, such as noun or verb
+    :param gender: grammatical gender for gendered translations
+    :param synonyms: source language words this alternative translates back to
+    :param frequency: how common the alternative is, 1 being the most common
+    """
+
+    __slots__ = ("text", "pos", "gender", "synonyms", "frequency")
+
+    def __init__(
+        self,
+        text: str,
+        pos: typing.Optional[str] = None,
+        gender: typing.Optional[str] = None,
+        synonyms: typing.Optional[typing.List[str]] = None,
+        frequency: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Init for alternative object
+        """
+        self.text = text
+        self.pos = pos
+        self.gender = gender
+        self.synonyms = synonyms or []
+        self.frequency = frequency
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __dict__(self) -> dict:
+        return {
+            "text": self.text,
+            "pos": self.pos,
+            "gender": self.gender,
+            "synonyms": self.synonyms,
+            "frequency": self.frequency,
+        }
+
+
+class Lookup(Base):
+    """
+    Dictionary lookup result object
+
+    :param word: the looked up word
+    :param src: source language
+    :param dest: destination language
+    :param translation: the main translation
+    :param alternatives: other translations with part of speech and gender
+    """
+
+    __slots__ = ("word", "src", "dest", "translation", "alternatives")
+
+    def __init__(
+        self,
+        word: str,
+        src: str,
+        dest: str,
+        translation: str,
+        alternatives: typing.List[Alternative],
+        **kwargs,
+    ) -> None:
+        """
+        Init for lookup object
+        """
+        super().__init__(**kwargs)
+        self.word = word
+        self.src = src
+        self.dest = dest
+        self.translation = translation
+        self.alternatives = alternatives
+
+    def __str__(self) -> str:
+        return self.__unicode__()
+
+    def __unicode__(self) -> str:
+        return f"Lookup(word={self.word}, src={self.src}, dest={self.dest}, translation={self.translation}, alternatives={len(self.alternatives)})"
+
+    def __dict__(self) -> dict:
+        return {
+            "word": self.word,
+            "src": self.src,
+            "dest": self.dest,
+            "translation": self.translation,
+            "alternatives": list(map(lambda alt: alt.__dict__(), self.alternatives)),
+        }
+
+
+class BatchTranslated:
+    """
+    Result of a batch translation, iterates over the Translated objects in input order
+
+    :param translated: translated objects, one per input text
+    :param segments: amount of sentence segments in the input
+    :param unique_segments: amount of segments that were actually translated
+    :param chars: characters in all segments
+    :param unique_chars: characters in the unique segments
+    :param requests: requests sent for the batch, several segments share one request
+    """
+
+    __slots__ = ("translated", "segments", "unique_segments", "chars", "unique_chars", "requests")
+
+    def __init__(
+        self,
+        translated: typing.List[Translated],
+        segments: int,
+        unique_segments: int,
+        chars: int,
+        unique_chars: int,
+        requests: int = 0,
+    ) -> None:
+        """
+        Init for batch translated object
+        """
+        self.translated = translated
+        self.segments = segments
+        self.unique_segments = unique_segments
+        self.chars = chars
+        self.unique_chars = unique_chars
+        self.requests = requests
+
+    @property
+    def dedup_ratio(self) -> float:
+        """
+        Share of characters that did not have to be sent thanks to deduplication
+        """
+        if not self.chars:
+            return 0.0
+        return 1 - self.unique_chars / self.chars
+
+    @property
+    def requests_saved(self) -> int:
+        """
+        Requests saved against sending every segment on its own
+        """
+        return max(0, self.segments - self.requests)
+
+    def __iter__(self) -> typing.Iterator[Translated]:
+        return iter(self.translated)
+
+    def __len__(self) -> int:
+        return len(self.translated)
+
+    def __getitem__(self, index: int) -> Translated:
+        return self.translated[index]
+
+    def __str__(self) -> str:
+        return self.__unicode__()
+
+    def __unicode__(self) -> str:
+        return f"BatchTranslated(texts={len(self.translated)}, segments={self.segments}, unique_segments={self.unique_segments}, dedup_ratio={self.dedup_ratio:.2f}, requests={self.requests})"
@@ -0,0 +1,203 @@
+"""
+Cheap checks that recognise texts which need no translation, so no request is sent for them
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import bisect
+import collections
+import re
+import typing
+import unicodedata
+
+from .masking import EMAIL_PATTERN, EMOJI_PATTERN, NUMBER_PATTERN, URL_PATTERN
+
+# Product codes such as AB-1234, X200 or 9780-XL, upper case only so words like "3rd" still go out
+SKU_PATTERN = (
+    r"(?<!\w)(?=[A-Z0-9_/.#-]*\d)(?=[0-9_/.#-]*[A-Z])[A-Z0-9]+(?:[-_/.#][A-Z0-9]+)*(?!\w)"
+)
+
+# Scripts used by exactly one language Google supports, text written fully in the script of the
+# destination language is already in it. Shared scripts (Latin, Cyrillic, Arabic, Han, Hebrew,
+# Devanagari, ...) are left out on purpose.
+SCRIPT_RANGES = {
+    "el": ((0x0370, 0x03FF), (0x1F00, 0x1FFF)),
+    "hy": ((0x0530, 0x058F), (0xFB13, 0xFB17)),
+    "ka": ((0x10A0, 0x10FF), (0x1C90, 0x1CBF), (0x2D00, 0x2D2F)),
+    "ko": (
+        (0x1100, 0x11FF),
+        (0x3130, 0x318F),
+        (0xA960, 0xA97F),
+        (0xAC00, 0xD7AF),
+        (0xD7B0, 0xD7FF),
+    ),
+    "th": ((0x0E00, 0x0E7F),),
+    "lo": ((0x0E80, 0x0EFF),),
+    "km": ((0x1780, 0x17FF), (0x19E0, 0x19FF)),
+    "my": ((0x1000, 0x109F), (0xA9E0, 0xA9FF), (0xAA60, 0xAA7F)),
+    "si": ((0x0D80, 0x0DFF),),
+    "gu": ((0x0A80, 0x0AFF),),
+    "pa": ((0x0A00, 0x0A7F),),
+    "or": ((0x0B00, 0x0B7F),),
+    "ta": ((0x0B80, 0x0BFF),),
+    "te": ((0x0C00, 0x0C7F),),
+    "kn": ((0x0C80, 0x0CFF),),
+    "ml": ((0x0D00, 0x0D7F),),
+}
+
+# Sorted range starts for a bisect lookup of the language owning a character
+_RANGES = sorted(
+    (start, end, lang) for lang, ranges in SCRIPT_RANGES.items() for start, end in ranges
+)
+_STARTS = [start for start, _, _ in _RANGES]
+
+
+def script_language(char: str) -> typing.Optional[str]:
+    """Language whose unambiguous script contains the character
+
+    Parameters
+    ----------
+    char: str
+        A single character
+
+    Returns
+    -------
+    str, None
+        The language code, None for characters of shared or unknown scripts"""
+    code = ord(char)
+    index = bisect.bisect_right(_STARTS, code) - 1
+    if index >= 0 and code <= _RANGES[index][1]:
+        return _RANGES[index][2]
+    return None
+
+
+class Prefilter:
+    """
+    Classifies texts that would come back unchanged, Translator answers them without a request
+    """
+
+    def __init__(
+        self,
+        numbers: bool = True,
+        urls: bool = True,
+        emails: bool = True,
+        emoji: bool = True,
+        skus: bool = True,
+        same_script: bool = False,
+        patterns: typing.Iterable[typing.Union[str, typing.Pattern]] = (),
+    ) -> None:
+        """Prefilter Init
+
+        Parameters
+        ----------
+        numbers: bool
+            Skip texts made of numbers such as 48213, 3.14 or 12/05/2022
+        urls: bool
+            Skip texts made of urls
+        emails: bool
+            Skip texts made of email addresses
+        emoji: bool
+            Skip texts made of emoji
+        skus: bool
+            Skip texts made of upper case product codes such as AB-1234
+        same_script: bool
+            Skip texts written fully in the script of the destination language, only for scripts
+            a single language uses, see SCRIPT_RANGES
+            Default False
+        patterns: Iterable[str, Pattern]
+            Extra regexes of tokens that never need translation
+
+        Texts made only of whitespace and punctuation are always skipped.
+
+        Returns
+        -------
+        None"""
+        alternatives = [
+            (f"pattern{index}", pattern.pattern if isinstance(pattern, typing.Pattern) else pattern)
+            for index, pattern in enumerate(patterns)
+        ]
+        for name, enabled, pattern in (
+            ("url", urls, URL_PATTERN),
+            ("email", emails, EMAIL_PATTERN),
+            ("sku", skus, SKU_PATTERN),
+            ("number", numbers, NUMBER_PATTERN),
+            ("emoji", emoji, EMOJI_PATTERN),
+        ):
+            if enabled:
+                alternatives.append((name, pattern))
+        self._pattern = (
+            re.compile("|".join(f"(?P<{name}>{alt})" for name, alt in alternatives))
+            if alternatives
+            else None
+        )
+        self.same_script = same_script
+        self.checked = 0
+        self.skipped = collections.Counter()
+
+    def classify(self, text: str, dest: str) -> typing.Optional[str]:
+        """Why the text needs no translation
+
+        Parameters
+        ----------
+        text: str
+            The text to check
+        dest: str
+            Normalized destination language
+
+        Returns
+        -------
+        str, None
+            The reason (whitespace, punctuation, url, email, sku, number, emoji, mixed, script),
+            None when the text has to be translated"""
+        self.checked += 1
+        reason = self._classify(text, dest)
+        if reason is not None:
+            self.skipped[reason] += 1
+        return reason
+
+    def _classify(self, text: str, dest: str) -> typing.Optional[str]:
+        if not text or text.isspace():
+            return "whitespace"
+
+        kinds = set()
+        remainder = text
+        if self._pattern is not None:
+
+            def replace(match: typing.Match) -> str:
+                kinds.add(match.lastgroup)
+                return " "
+
+            remainder = self._pattern.sub(replace, text)
+        if all(char.isspace() or unicodedata.category(char)[0] in "PZ" for char in remainder):
+            if not kinds:
+                return "punctuation"
+            return kinds.pop() if len(kinds) == 1 else "mixed"
+
+        if self.same_script and dest in SCRIPT_RANGES:
+            letters = [char for char in text if char.isalpha()]
+            if letters and all(script_language(char) == dest for char in letters):
+                return "script"
+        return None
+
+    def stats(self) -> dict:
+        """How many texts were checked and skipped
+
+        Returns
+        -------
+        dict
+            Checked count, skipped count and skipped count of every reason"""
+        return {
+            "checked": self.checked,
+            "skipped": sum(self.skipped.values()),
+            "reasons": dict(self.skipped),
+        }
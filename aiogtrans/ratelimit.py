@@ -0,0 +1,65 @@
+"""
+Client side rate limiting
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import time
+import typing
+
+
+class RateLimiter:
+    """
+    Async token bucket, every request sent over the wire takes one token
+    """
+
+    def __init__(self, rate: float, burst: typing.Optional[int] = None) -> None:
+        """Rate Limiter Init
+
+        Parameters
+        ----------
+        rate: float
+            Requests per second
+        burst: int, None
+            Maximum amount of requests sent back to back
+            Default None, the same as rate rounded up
+
+        Returns
+        -------
+        None"""
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate + 0.999))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent
+
+        Returns
+        -------
+        None"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
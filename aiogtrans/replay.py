@@ -0,0 +1,240 @@
+"""
+httpx transports recording batchexecute exchanges to an archive and replaying them without network
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import os
+import time
+import typing
+from urllib.parse import parse_qs
+
+import httpx
+
+from .cache import make_key
+
+if typing.TYPE_CHECKING:
+    from .client import Translator
+
+
+class ReplayMiss(httpx.TransportError):
+    """
+    Raised by ReplayTransport for a request that is not in the archive
+    """
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """Key matching a request to its recorded response
+
+    For batchexecute calls the key is the f.req payload with every nested JSON string decoded
+    and dumped again in one canonical form, so host, query string, JSON backend and whitespace
+    do not matter. Other requests are keyed by method and path.
+
+    Parameters
+    ----------
+    method: str
+        HTTP method
+    path: str
+        Request path without the query string
+    body: bytes
+        Form encoded request body
+
+    Returns
+    -------
+    str"""
+    freq = parse_qs(body.decode("utf-8", "replace")).get("f.req") if body else None
+    if not freq:
+        return f"{method} {path}"
+    envelopes = []
+    for rpc_id, payload, _, envelope_id in json.loads(freq[0])[0]:
+        envelopes.append([rpc_id, json.loads(payload), envelope_id])
+    return json.dumps(envelopes, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def _request_key(request: httpx.Request) -> str:
+    return request_key(request.method, request.url.path, request.content)
+
+
+def read_archive(path: typing.Union[str, os.PathLike]) -> typing.Iterator[dict]:
+    """Stream the records of an archive
+
+    Parameters
+    ----------
+    path: str, PathLike
+        Gzip compressed JSONL archive written by RecordingTransport
+
+    Returns
+    -------
+    Iterator[dict]
+        Records with key, status, content_type, body and latency"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if "body_base64" in record:
+                    record["body"] = base64.b64decode(record.pop("body_base64"))
+                else:
+                    record["body"] = record["body"].encode("utf-8")
+                yield record
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests to a real transport and appends every exchange to an archive
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike],
+        transport: typing.Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Recording Transport Init
+
+        Parameters
+        ----------
+        path: str, PathLike
+            Gzip compressed JSONL archive, appended to if it exists
+        transport: httpx.AsyncBaseTransport, None
+            Transport sending the requests
+            Default None, a plain httpx.AsyncHTTPTransport
+
+        Returns
+        -------
+        None"""
+        self.path = path
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        latency = time.monotonic() - started
+
+        record = {
+            "key": _request_key(request),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type"),
+            "latency": round(latency, 4),
+        }
+        try:
+            record["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            record["body_base64"] = base64.b64encode(body).decode("ascii")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+        headers = {"content-type": record["content_type"]} if record["content_type"] else {}
+        return httpx.Response(response.status_code, headers=headers, content=body)
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Answers requests from an archive written by RecordingTransport, no network is used
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike],
+        latency: typing.Union[None, float, str] = None,
+    ) -> None:
+        """Replay Transport Init
+
+        Parameters
+        ----------
+        path: str, PathLike
+            Gzip compressed JSONL archive
+        latency: float, str, None
+            Seconds every response is delayed, "recorded" to replay the measured latency
+            Default None, answer immediately
+
+        Returns
+        -------
+        None"""
+        if isinstance(latency, str) and latency != "recorded":
+            raise ValueError(f"latency must be a number, None or 'recorded', not {latency!r}")
+        self.latency = latency
+        # key -> recorded responses, the same request recorded several times is answered in turn
+        self.records = {}
+        for record in read_archive(path):
+            self.records.setdefault(record["key"], []).append(record)
+        self._turns = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = _request_key(request)
+        records = self.records.get(key)
+        if not records:
+            self.misses += 1
+            raise ReplayMiss(
+                f"No recorded response for {request.method} {request.url.path}", request=request
+            )
+        self.hits += 1
+        turn = self._turns.get(key, 0)
+        self._turns[key] = turn + 1
+        record = records[turn % len(records)]
+
+        delay = record["latency"] if self.latency == "recorded" else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        headers = {"content-type": record["content_type"]} if record["content_type"] else {}
+        return httpx.Response(
+            record["status"], headers=headers, content=record["body"], request=request
+        )
+
+
+def prime_cache(translator: "Translator", path: typing.Union[str, os.PathLike]) -> int:
+    """Fill the cache of a translator with every successful translation in an archive
+
+    Parameters
+    ----------
+    translator: Translator
+        A translator with a cache, its keys are built the way translate builds them
+    path: str, PathLike
+        Gzip compressed JSONL archive written by RecordingTransport
+
+    Returns
+    -------
+    int
+        Amount of translations added"""
+    if translator.cache is None:
+        raise ValueError("The translator has no cache to prime")
+    count = 0
+    for record in read_archive(path):
+        if record["status"] != 200 or not record["key"].startswith("["):
+            continue
+        frames = translator._parse_frames(record["body"])
+        for rpc_id, payload, envelope_id in json.loads(record["key"]):
+            parsed = frames.get(envelope_id)
+            if not parsed:
+                continue
+            text, src, dest = payload[0][:3]
+            try:
+                result = translator._build_translated(parsed, text, dest, src, None)
+            except (IndexError, TypeError):
+                continue
+            translator.cache.add(make_key(text, dest, src), result)
+            count += 1
+    return count
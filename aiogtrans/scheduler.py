@@ -0,0 +1,243 @@
+"""
+Request scheduling with priority classes and per-tenant fair queueing
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+import typing
+
+
+class RequestShed(Exception):
+    """
+    Raised when a request is dropped because its priority class queue is full or it waited too long
+    """
+
+
+class PriorityClass:
+    """
+    A priority class, classes listed first are always served before the ones after them
+    """
+
+    __slots__ = ("name", "max_depth", "max_wait")
+
+    def __init__(
+        self, name: str, max_depth: int = 1000, max_wait: typing.Optional[float] = None
+    ) -> None:
+        """Priority Class Init
+
+        Parameters
+        ----------
+        name: str
+            Name used to pick the class when translating
+        max_depth: int
+            Requests queued above this amount are shed
+            Default 1,000
+        max_wait: float, None
+            Requests queued for longer than this amount of seconds are shed
+            Default None, wait forever
+
+        Returns
+        -------
+        None"""
+        self.name = name
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+
+
+DEFAULT_PRIORITY_CLASSES = (
+    PriorityClass("interactive", max_depth=100, max_wait=2.0),
+    PriorityClass("bulk", max_depth=100000, max_wait=None),
+)
+
+
+class _Waiter:
+    __slots__ = ("future", "cancelled")
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.cancelled = False
+
+
+class _ClassQueue:
+    __slots__ = ("spec", "heap", "depth", "vtime", "finish", "shed")
+
+    def __init__(self, spec: PriorityClass) -> None:
+        self.spec = spec
+        self.heap = []
+        self.depth = 0
+        # Virtual time of the class and the last finish tag of every tenant
+        self.vtime = 0.0
+        self.finish = {}
+        self.shed = 0
+
+
+class Scheduler:
+    """
+    Limits concurrent requests and decides which queued request goes next.
+
+    Classes are served in strict priority order, so bulk traffic only gets the capacity
+    interactive traffic leaves over. Inside a class tenants are weighted fair queued,
+    a tenant with weight 2 gets twice the share of a tenant with weight 1.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        classes: typing.Sequence[PriorityClass] = DEFAULT_PRIORITY_CLASSES,
+        tenant_weights: typing.Optional[typing.Dict[str, float]] = None,
+        default: typing.Optional[str] = None,
+    ) -> None:
+        """Scheduler Init
+
+        Parameters
+        ----------
+        concurrency: int
+            Maximum amount of requests in flight
+            Default 10
+        classes: Sequence[PriorityClass]
+            Priority classes from highest to lowest
+        tenant_weights: dict, None
+            Weight of each tenant key, unknown tenants get a weight of 1
+        default: str, None
+            Class of requests without a priority, untagged callers should not be shed by surprise
+            Default None, the last class ("bulk" with the default classes)
+
+        Returns
+        -------
+        None"""
+        self.concurrency = concurrency
+        self.active = 0
+        self.tenant_weights = tenant_weights or {}
+        self._queues = {spec.name: _ClassQueue(spec) for spec in classes}
+        self.default = default if default is not None else classes[-1].name
+        if self.default not in self._queues:
+            raise ValueError(f"Unknown default priority class: {self.default}")
+        self._order = [self._queues[spec.name] for spec in classes]
+        self._seq = itertools.count()
+
+    def stats(self) -> dict:
+        """Current load of the scheduler
+
+        Returns
+        -------
+        dict
+            Active requests plus queue depth and shed count of every class"""
+        return {
+            "active": self.active,
+            "classes": {
+                queue.spec.name: {"queued": queue.depth, "shed": queue.shed}
+                for queue in self._order
+            },
+        }
+
+    def _queued(self) -> bool:
+        return any(queue.depth for queue in self._order)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the next waiters"""
+        for queue in self._order:
+            while self.active < self.concurrency and queue.heap:
+                finish, _, waiter = heapq.heappop(queue.heap)
+                if waiter.cancelled:
+                    continue
+                queue.depth -= 1
+                queue.vtime = finish
+                self.active += 1
+                waiter.future.set_result(None)
+            if self.active >= self.concurrency:
+                return
+
+    async def acquire(
+        self, priority: typing.Optional[str] = None, tenant: typing.Optional[str] = None
+    ) -> None:
+        """Wait for a free slot, the caller must call release afterwards
+
+        Parameters
+        ----------
+        priority: str, None
+            Name of the priority class, None for the default class
+        tenant: str, None
+            Key used for fair queueing inside the class
+
+        Raises
+        ------
+        RequestShed
+            The class queue is full or the request waited longer than max_wait"""
+        queue = self._queues.get(priority or self.default)
+        if queue is None:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        if self.active < self.concurrency and not self._queued():
+            self.active += 1
+            return
+
+        if queue.depth >= queue.spec.max_depth:
+            queue.shed += 1
+            raise RequestShed(f"Queue of priority class {queue.spec.name} is full")
+
+        weight = self.tenant_weights.get(tenant, 1.0)
+        finish = max(queue.vtime, queue.finish.get(tenant, 0.0)) + 1.0 / weight
+        queue.finish[tenant] = finish
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future())
+        heapq.heappush(queue.heap, (finish, next(self._seq), waiter))
+        queue.depth += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), queue.spec.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done():
+                # The slot was granted while the caller gave up, hand it back
+                self.release()
+            else:
+                waiter.cancelled = True
+                waiter.future.cancel()
+                queue.depth -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                queue.shed += 1
+                raise RequestShed(
+                    f"Request waited {time.monotonic() - started:.2f}s in priority class {queue.spec.name}"
+                )
+            raise
+
+    def release(self) -> None:
+        """Free a slot obtained through acquire
+
+        Returns
+        -------
+        None"""
+        self.active -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, priority: typing.Optional[str] = None, tenant: typing.Optional[str] = None
+    ) -> typing.AsyncIterator[None]:
+        """Context manager around acquire and release
+
+        Parameters
+        ----------
+        priority: str, None
+            Name of the priority class
+        tenant: str, None
+            Key used for fair queueing inside the class"""
+        await self.acquire(priority, tenant)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,51 @@
+"""
+Sentence segmentation used to share translations between texts
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import re
+import typing
+
+# Sentence end followed by whitespace (unless the next word starts in lowercase, e.g. "approx. five"),
+# a full width sentence end, or a line break
+_BOUNDARY = re.compile(
+    r"((?<=[.!?…])\s+(?![a-zа-яё])|(?<=[。！？])\s*|\s*\n\s*)"
+)
+_LEADING = re.compile(r"^\s*")
+_TRAILING = re.compile(r"\s*$")
+
+
+def split_segments(text: str) -> typing.List[str]:
+    """Split a text into sentences and the separators between them
+
+    Parameters
+    ----------
+    text: str
+        The text to split
+
+    Returns
+    -------
+    List[str]
+        Segments at even indexes and separators at odd indexes, so "".join(...) gives back the text.
+        Segments are never padded with whitespace and may be empty at the edges."""
+    leading = _LEADING.match(text).group()
+    trailing = _TRAILING.search(text[len(leading):]).group()
+    body = text[len(leading) : len(text) - len(trailing)]
+    pieces = _BOUNDARY.split(body) if body else [""]
+    if leading:
+        pieces = ["", leading] + pieces
+    if trailing:
+        pieces = pieces + [trailing, ""]
+    return pieces
+
@@ -0,0 +1,261 @@
+"""
+Translation gateway, one shared Translator behind a small JSON over HTTP API
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import collections
+import time
+import typing
+
+from aiohttp import web
+
+from .cache import Cache
+from .client import Translator
+from .models import Translated
+from .scheduler import RequestShed
+
+TRANSLATOR_KEY = web.AppKey("translator", Translator)
+
+
+class Gateway:
+    """
+    Request handlers plus coalescing of identical in-flight requests
+    """
+
+    def __init__(self, translator: Translator) -> None:
+        """Gateway Init
+
+        Parameters
+        ----------
+        translator: Translator
+            The translator shared by every client
+
+        Returns
+        -------
+        None"""
+        self.translator = translator
+        self.started = time.monotonic()
+        self.metrics = collections.Counter()
+        self._inflight = {}
+
+    async def _coalesced(self, key: tuple, factory: typing.Callable) -> typing.Any:
+        """Run factory once for every group of concurrent callers with the same key"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.metrics["coalesced"] += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _translate(self, text: str, dest: str, src: str, options: dict) -> Translated:
+        return await self._coalesced(
+            ("translate", text, dest, src, options.get("priority"), options.get("tenant")),
+            lambda: self.translator.translate(text, dest=dest, src=src, **options),
+        )
+
+    @staticmethod
+    def _serialize(result: Translated) -> dict:
+        return {
+            "text": result.text,
+            "src": result.src,
+            "dest": result.dest,
+            "origin": result.origin,
+            "pronunciation": result.pronunciation,
+        }
+
+    @staticmethod
+    def _options(body: dict) -> dict:
+        options = {key: body[key] for key in ("priority", "tenant") if body.get(key)}
+        if body.get("deadline") is not None:
+            options["deadline"] = float(body["deadline"])
+        return options
+
+    async def _read(self, request: web.Request) -> dict:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Request body must be a JSON object")
+        return body
+
+    async def handle_translate(self, request: web.Request) -> web.Response:
+        body = await self._read(request)
+        if not isinstance(body.get("text"), str):
+            raise web.HTTPBadRequest(text="text must be a string")
+        result = await self._translate(
+            body["text"], body.get("dest", "en"), body.get("src", "auto"), self._options(body)
+        )
+        return web.json_response(self._serialize(result))
+
+    async def handle_detect(self, request: web.Request) -> web.Response:
+        body = await self._read(request)
+        if not isinstance(body.get("text"), str):
+            raise web.HTTPBadRequest(text="text must be a string")
+        options = self._options(body)
+        result = await self._coalesced(
+            ("detect", body["text"], options.get("priority"), options.get("tenant")),
+            lambda: self.translator.detect(body["text"], **options),
+        )
+        return web.json_response({"lang": result.lang, "confidence": result.confidence})
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        body = await self._read(request)
+        texts = body.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise web.HTTPBadRequest(text="texts must be a list of strings")
+        batch = await self.translator.translate_batch(
+            texts,
+            dest=body.get("dest", "en"),
+            src=body.get("src", "auto"),
+            **self._options(body),
+        )
+        return web.json_response(
+            {
+                "results": [self._serialize(result) for result in batch],
+                "dedup_ratio": batch.dedup_ratio,
+                "requests": batch.requests,
+            }
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "uptime": time.monotonic() - self.started})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Prometheus text exposition format"""
+        translator = self.translator
+        lines = [
+            f'aiogtrans_requests_total{{endpoint="{endpoint}"}} {count}'
+            for endpoint, count in sorted(self.metrics.items())
+            if endpoint not in ("coalesced", "errors")
+        ]
+        lines.append(f"aiogtrans_coalesced_total {self.metrics['coalesced']}")
+        lines.append(f"aiogtrans_errors_total {self.metrics['errors']}")
+        lines.append(f"aiogtrans_upstream_requests_total {translator.requests_sent}")
+        lines.append(f"aiogtrans_inflight {len(self._inflight)}")
+        if translator.cache is not None:
+            lines.append(f"aiogtrans_cache_hits_total {translator.cache.hits}")
+            lines.append(f"aiogtrans_cache_misses_total {translator.cache.misses}")
+            lines.append(f"aiogtrans_cache_entries {len(translator.cache)}")
+        if translator.byte_budget is not None:
+            budget = translator.byte_budget.stats()
+            lines.append(f"aiogtrans_inflight_bytes {budget['in_use']}")
+            lines.append(f"aiogtrans_inflight_bytes_capacity {budget['capacity']}")
+            lines.append(f"aiogtrans_inflight_bytes_waiting {budget['waiting']}")
+        if translator._batcher is not None:
+            lines.append(f"aiogtrans_batches_total {translator._batcher.batches}")
+            lines.append(f"aiogtrans_batched_items_total {translator._batcher.items}")
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain")
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler: typing.Callable) -> web.StreamResponse:
+        # Only the routes of the gateway are labels, unknown paths would grow the metrics without bound
+        resource = request.match_info.route.resource
+        endpoint = (resource.canonical.strip("/") or "root") if resource is not None else "other"
+        self.metrics[endpoint] += 1
+        try:
+            return await handler(request)
+        except web.HTTPException:
+            raise
+        except ValueError as e:
+            self.metrics["errors"] += 1
+            return web.json_response({"error": str(e)}, status=400)
+        except (RequestShed, asyncio.TimeoutError) as e:
+            self.metrics["errors"] += 1
+            return web.json_response({"error": str(e) or type(e).__name__}, status=503)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            return web.json_response({"error": str(e)}, status=502)
+
+
+GATEWAY_KEY = web.AppKey("gateway", Gateway)
+
+
+def create_app(translator: Translator) -> web.Application:
+    """Build the gateway application around a translator
+
+    Parameters
+    ----------
+    translator: Translator
+        Shared by all clients, closed when the application shuts down
+
+    Returns
+    -------
+    aiohttp.web.Application"""
+    gateway = Gateway(translator)
+    app = web.Application(middlewares=[gateway.middleware])
+    app[TRANSLATOR_KEY] = translator
+    app[GATEWAY_KEY] = gateway
+    app.router.add_post("/translate", gateway.handle_translate)
+    app.router.add_post("/detect", gateway.handle_detect)
+    app.router.add_post("/batch", gateway.handle_batch)
+    app.router.add_get("/health", gateway.handle_health)
+    app.router.add_get("/metrics", gateway.handle_metrics)
+
+    async def close_translator(app: web.Application) -> None:
+        await app[TRANSLATOR_KEY].close()
+
+    app.on_cleanup.append(close_translator)
+    return app
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    cache_bytes: int = 256 * 1024 * 1024,
+    batch_window: typing.Optional[float] = 0.005,
+    batch_size: int = 32,
+    **kwargs,
+) -> None:
+    """Run the gateway until interrupted
+
+    Parameters
+    ----------
+    host: str
+        Address to listen on
+        Default 127.0.0.1
+    port: int
+        Port to listen on
+        Default 8080
+    cache_bytes: int
+        Approximate bytes the shared cache keeps alive, 0 disables it
+        Entries hold the raw response and its parsed tree, so the cache is bounded by weight, not count
+        Default 256 MiB
+    batch_window: float, None
+        Seconds to collect requests of different clients into one upstream request
+        Default 0.005
+    batch_size: int
+        Maximum texts per upstream request
+        Default 32
+    **kwargs
+        Passed to Translator
+
+    Returns
+    -------
+    None"""
+
+    async def make_app() -> web.Application:
+        # The translator must be created inside the running loop of the server
+        translator = Translator(
+            cache=Cache(max_bytes=cache_bytes) if cache_bytes > 0 else None,
+            batch_window=batch_window,
+            batch_size=batch_size,
+            **kwargs,
+        )
+        return create_app(translator)
+
+    web.run_app(make_app(), host=host, port=port)
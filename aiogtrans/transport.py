@@ -0,0 +1,246 @@
+"""
+aiohttp backend exposing the part of httpx.AsyncClient that Translator uses
+
+Copyright (c) 2022 Ben Z
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+"""
+
+import asyncio
+import functools
+import json
+import socket
+import ssl
+import typing
+
+import httpx
+
+from .dns import DNSCache
+
+if typing.TYPE_CHECKING:
+    import aiohttp
+
+BACKENDS = ("httpx", "aiohttp")
+
+
+def _import_aiohttp():
+    # aiohttp is optional, it is only needed once the backend is used
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError(
+            "The aiohttp backend needs aiohttp, install it with pip install aiogtrans[aiohttp]"
+        ) from None
+    return aiohttp
+
+
+class AiohttpResponse:
+    """
+    Response read in full, with the attributes of httpx.Response that Translator reads
+    """
+
+    __slots__ = ("status_code", "headers", "content", "url", "http_version")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: typing.Mapping[str, str],
+        content: bytes,
+        url: str,
+        http_version: str = "HTTP/1.1",
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.http_version = http_version
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self) -> typing.Any:
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status_code}]>"
+
+
+@functools.lru_cache(maxsize=None)
+def _resolver_class() -> type:
+    """aiohttp resolver answering from the shared DNSCache, built once aiohttp is imported"""
+    from aiohttp.abc import AbstractResolver
+
+    class CachedResolver(AbstractResolver):
+        def __init__(self, dns_cache: DNSCache) -> None:
+            self.dns_cache = dns_cache
+
+        async def resolve(
+            self, host: str, port: int = 0, family: int = socket.AF_INET
+        ) -> typing.List[dict]:
+            addresses = await self.dns_cache.resolve(host, port)
+            return [
+                {
+                    "hostname": host,
+                    "host": address,
+                    "port": port,
+                    "family": socket.AF_INET6 if ":" in address else socket.AF_INET,
+                    "proto": 0,
+                    "flags": socket.AI_NUMERICHOST,
+                }
+                for address in addresses
+            ]
+
+        async def close(self) -> None:
+            pass
+
+    return CachedResolver
+
+
+class AiohttpClient:
+    """
+    The subset of httpx.AsyncClient used by Translator (post, head, aclose) on top of aiohttp.
+
+    It takes the same headers, timeout, httpx.Limits, SSL context and DNS cache as the httpx client
+    Translator builds, and like httpx it reads proxies from the environment (http_proxy, HTTPS_PROXY,
+    NO_PROXY, in either case), so both backends behave the same. aiohttp errors are raised as
+    their httpx counterparts, retries and hedging work unchanged. aiohttp has no separate limit of
+    idle connections, max_keepalive_connections is not used.
+    """
+
+    def __init__(
+        self,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        timeout: typing.Union[int, float] = 10.0,
+        proxies: typing.Optional[typing.Mapping[str, typing.Optional[str]]] = None,
+        limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        verify: typing.Union[bool, ssl.SSLContext] = True,
+        dns_cache: typing.Optional[DNSCache] = None,
+    ) -> None:
+        """Aiohttp Client Init
+
+        Parameters
+        ----------
+        headers: Mapping[str, str], None
+            Sent with every request
+        timeout: int, float
+            Seconds a whole request may take
+            Default 10
+        proxies: Mapping[str, str], None
+            Proxy url of the "http" and "https" schemes, overrides the environment
+            Default None, proxies from the environment
+        limits: httpx.Limits
+            max_connections and keepalive_expiry are applied to the connector
+        verify: bool, ssl.SSLContext
+            SSL context shared with the other transports, or whether to verify certificates
+        dns_cache: DNSCache, None
+            Resolve hosts through the shared cache instead of aiohttp's own
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ImportError
+            aiohttp is not installed"""
+        self._aiohttp = _import_aiohttp()
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.proxies = {scheme: url for scheme, url in (proxies or {}).items() if url}
+        self.limits = limits
+        self.verify = verify
+        self.dns_cache = dns_cache
+        # The session needs a running loop, Translator is often built outside of one
+        self._session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        aiohttp = self._aiohttp
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limits.max_connections or 0,
+                keepalive_timeout=self.limits.keepalive_expiry,
+                ssl=self.verify,
+                resolver=_resolver_class()(self.dns_cache) if self.dns_cache is not None else None,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                # Proxy variables of the environment, resolved by aiohttp with NO_PROXY applied
+                trust_env=True,
+            )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: typing.Optional[typing.Mapping[str, str]] = None,
+        data: typing.Optional[typing.Mapping[str, str]] = None,
+    ) -> AiohttpResponse:
+        """Send a request and read the whole body
+
+        Parameters
+        ----------
+        method: str
+            HTTP method
+        url: str
+            Absolute url
+        params: Mapping[str, str], None
+            Query string
+        data: Mapping[str, str], None
+            Form encoded body
+
+        Returns
+        -------
+        AiohttpResponse
+
+        Raises
+        ------
+        httpx.ConnectError, httpx.TimeoutException, httpx.TransportError
+            The aiohttp error in the form Translator handles"""
+        aiohttp = self._aiohttp
+        proxy = self.proxies.get("https" if url.startswith("https:") else "http")
+        try:
+            async with self._get_session().request(
+                method, url, params=params, data=data, proxy=proxy
+            ) as response:
+                content = await response.read()
+                return AiohttpResponse(
+                    response.status,
+                    response.headers,
+                    content,
+                    str(response.url),
+                    f"HTTP/{response.version.major}.{response.version.minor}",
+                )
+        except asyncio.TimeoutError as e:
+            raise httpx.ReadTimeout(f"Request to {url} timed out") from e
+        except aiohttp.ClientConnectionError as e:
+            raise httpx.ConnectError(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise httpx.TransportError(str(e)) from e
+
+    async def post(
+        self,
+        url: str,
+        params: typing.Optional[typing.Mapping[str, str]] = None,
+        data: typing.Optional[typing.Mapping[str, str]] = None,
+    ) -> AiohttpResponse:
+        return await self.request("POST", url, params=params, data=data)
+
+    async def head(self, url: str) -> AiohttpResponse:
+        return await self.request("HEAD", url)
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the W-TinyLFU Cache with the plain LRUCache on an access trace.
+
+A trace is a text file with one cache key (or source text) per line, in request order, for
+example collected from the logs of a service. Without --trace a synthetic workload is used:
+zipf distributed interactive traffic interleaved with bulk scans of one-off strings.
+
+    python benchmarks/cache_bench.py --capacity 5000
+    python benchmarks/cache_bench.py --trace keys.txt --capacity 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aiogtrans.cache import Cache, LRUCache
+
+
+def synthetic_trace(length: int, hot_keys: int, scan_share: float, seed: int = 0):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(hot_keys)]
+    hot = rng.choices(range(hot_keys), weights=weights, k=length)
+    scan = 0
+    trace = []
+    for index in range(length):
+        if rng.random() < scan_share:
+            # Bulk job, every string is seen exactly once
+            trace.append(f"bulk product description number {scan}")
+            scan += 1
+        else:
+            trace.append(f"interactive label {hot[index]}")
+    return trace
+
+
+def replay(cache, trace) -> tuple:
+    hits = 0
+    started = time.perf_counter()
+    for key in trace:
+        if cache.get(key) != -1:
+            hits += 1
+        else:
+            cache.add(key, key)
+    return hits / len(trace), len(trace) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trace", help="File with one key per line")
+    parser.add_argument("--capacity", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=500000)
+    parser.add_argument("--hot-keys", type=int, default=50000)
+    parser.add_argument("--scan-share", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.trace:
+        with open(args.trace, encoding="utf-8") as f:
+            trace = [line.rstrip("\n") for line in f]
+    else:
+        trace = synthetic_trace(args.length, args.hot_keys, args.scan_share)
+
+    print(f"{len(trace)} accesses, {len(set(trace))} unique keys, capacity {args.capacity}")
+    for name, cache in (
+        ("LRUCache", LRUCache(args.capacity)),
+        ("Cache (W-TinyLFU)", Cache(args.capacity)),
+    ):
+        hit_ratio, ops = replay(cache, trace)
+        print(f"{name:20} hit ratio {hit_ratio:6.2%}  {ops:10.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
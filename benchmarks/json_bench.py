@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the installed JSON backends on batchexecute request and response payloads.
+
+By default a response is built in the shape Google returns for a multi-sentence text. Pass
+--response with a raw batchexecute body saved from a real run to measure on that instead.
+
+    python benchmarks/json_bench.py
+    python benchmarks/json_bench.py --response body.txt --rounds 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aiogtrans import Translator, json_backend
+
+SAMPLE_TEXT = (
+    "После внесения изменений в код создайте и запустите тесты снова. "
+    "Если были правильно настроены параметры прокси, ошибка должна устраниться. "
+) * 20
+
+
+def sample_response(text: str) -> bytes:
+    sentences = [sentence + "." for sentence in text.split(".") if sentence.strip()]
+    parts = [
+        [f"Translated sentence {index}.", None, None, None, [[f"Alternative {index}", [5], []]]]
+        for index, _ in enumerate(sentences)
+    ]
+    parsed = [
+        [None, None, "ru", [[[0, [[[None, len(text)]], [True]]]], len(text)]],
+        [[[None, "pronunciation", None, True, None, parts]], "en", 1, "auto", [text, "auto", "en", True]],
+        "ru",
+    ]
+    frame = json.dumps([["wrb.fr", "MkEWBc", json.dumps(parsed), None, None, None, "generic"], ["di", 53]])
+    return f")]}}'\n\n{len(frame)}\n{frame}\n25\n[[\"e\",4,null,null,{len(frame)}]]\n".encode()
+
+
+def measure(function, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--response", help="File with a raw batchexecute response body")
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.response:
+        with open(args.response, "rb") as f:
+            body = f.read()
+    else:
+        body = sample_response(SAMPLE_TEXT)
+
+    translator = Translator()
+    print(f"response {len(body)} bytes, {args.rounds} rounds, microseconds per call")
+    print(f"{'backend':10} {'encode':>10} {'decode':>10}")
+    for name in json_backend.available():
+        json_backend.use(name)
+        encode = measure(
+            lambda: translator._build_batch_rpc_request([(SAMPLE_TEXT, "en", "auto")]),
+            args.rounds,
+        )
+        decode = measure(lambda: translator._parse_frames(body), args.rounds)
+        print(f"{name:10} {encode:10.1f} {decode:10.1f}")
+    json_backend.use()
+
+
+if __name__ == "__main__":
+    main()
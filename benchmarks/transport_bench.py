@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the httpx and aiohttp backends of Translator against a local stand-in server.
+
+The stand-in answers every batchexecute request with a response in the shape Google returns,
+so the numbers show the client side cost of each HTTP stack, not the network. The stand-in runs
+in the same process, its share of the CPU time is the same for both backends.
+
+    python benchmarks/transport_bench.py
+    python benchmarks/transport_bench.py --requests 20000 --concurrency 500 --delay 0.005
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aiogtrans import Translator, urls
+from aiogtrans.transport import BACKENDS
+
+
+def frame(payload: str, envelope: str) -> str:
+    text, src, dest = json.loads(payload)[0][:3]
+    translated = f"[{dest}] {text}"
+    parsed = [
+        [None, None, "en", [[[0, [[[None, len(text)]], [True]]]], len(text)]],
+        [[[None, None, None, True, None, [[translated, None, None, None, [[translated, [5], []]]]]]], dest, 1, src, [text, src, dest, True]],
+        "en",
+    ]
+    body = json.dumps([["wrb.fr", "MkEWBc", json.dumps(parsed), None, None, None, envelope], ["di", 53]])
+    return f"{len(body)}\n{body}\n"
+
+
+def stand_in(delay: float) -> web.Application:
+    async def batchexecute(request: web.Request) -> web.Response:
+        form = parse_qs((await request.read()).decode())
+        if delay:
+            await asyncio.sleep(delay)
+        frames = "".join(frame(envelope[1], envelope[3]) for envelope in json.loads(form["f.req"][0])[0])
+        return web.Response(text=")]}'\n\n" + frames)
+
+    app = web.Application()
+    app.router.add_post("/_/TranslateWebserverUi/data/batchexecute", batchexecute)
+    return app
+
+
+async def run(backend: str, host: str, requests: int, concurrency: int) -> float:
+    translator = Translator(service_urls=[host], backend=backend, dns_cache=None)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            await translator.translate(f"Sentence number {index}", dest="de", src="en")
+
+    try:
+        # The first round opens the connections
+        await asyncio.gather(*(one(index) for index in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        return time.perf_counter() - started
+    finally:
+        await translator.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.0, help="Server side delay in seconds")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    runner = web.AppRunner(stand_in(args.delay), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    # The stand-in speaks plain HTTP
+    urls.TRANSLATE_RPC = "http://{host}/_/TranslateWebserverUi/data/batchexecute"
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, best of {args.rounds}")
+    print(f"{'backend':10} {'seconds':>10} {'req/s':>10} {'cpu ms/req':>12}")
+    try:
+        for backend in BACKENDS:
+            best = None
+            for _ in range(args.rounds):
+                cpu = time.process_time()
+                elapsed = await run(backend, f"127.0.0.1:{port}", args.requests, args.concurrency)
+                cpu = time.process_time() - cpu
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, cpu)
+            elapsed, cpu = best
+            print(
+                f"{backend:10} {elapsed:10.2f} {args.requests / elapsed:10.0f} "
+                f"{cpu / args.requests * 1000:12.3f}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -57,8 +57,17 @@ def install():
             "Programming Language :: Python :: 3.9",
         ],
         packages=find_packages(exclude=["docs", "tests"]),
+        scripts=["translate"],
         keywords="google translate translator async",
         install_requires=get_requirements(),
+        entry_points={"console_scripts": ["aiogtrans=aiogtrans.__main__:main"]},
+        extras_require={
+            "fast": ["orjson"],
+            "frame": ["pandas", "pyarrow"],
+            "aiohttp": ["aiohttp>=3.9"],
+            "server": ["aiohttp>=3.9"],
+            "yaml": ["pyyaml"],
+        },
         python_requires=">=3.9",
     )
 
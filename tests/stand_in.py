@@ -0,0 +1,79 @@
+"""
+Offline stand-in for the batchexecute endpoint, served through httpx.MockTransport
+"""
+import asyncio
+import json
+import typing
+from urllib.parse import parse_qs
+
+import httpx
+
+from aiogtrans import Translator
+
+
+def translation(text: str, dest: str) -> str:
+    """What the stand-in answers for a text, every line is prefixed with the target language"""
+    return "\n".join(f"[{dest}] {line}" for line in text.split("\n"))
+
+
+def frame(payload: typing.Optional[str], envelope: str) -> str:
+    """One length prefixed frame for an envelope, payload None is an error frame"""
+    if payload is None:
+        body = json.dumps([["wrb.fr", "MkEWBc", None, None, None, [3], envelope], ["di", 53]])
+        return f"{len(body)}\n{body}\n"
+    text, src, dest = json.loads(payload)[0][:3]
+    translated = translation(text, dest)
+    detected = "en" if src == "auto" else src
+    parsed = [
+        [None, None, detected, [[[0, [[[None, len(text)]], [True]]]], len(text)]],
+        [[[None, None, None, True, None, [[translated, None, None, None, [[translated, [5], []]]]]]], dest, 1, src, [text, src, dest, True]],
+        detected,
+    ]
+    body = json.dumps([["wrb.fr", "MkEWBc", json.dumps(parsed), None, None, None, envelope], ["di", 53]])
+    return f"{len(body)}\n{body}\n"
+
+
+class StandIn:
+    """
+    Answers batchexecute requests like Google does and records what was sent
+
+    Texts listed in fail get an error frame, the other envelopes of the request still succeed.
+    Requests to a host listed in delays are answered after that many seconds, and the status
+    codes in statuses are answered, in turn, before the stand-in starts to succeed.
+    """
+
+    def __init__(
+        self,
+        fail: typing.Iterable[str] = (),
+        delays: typing.Optional[typing.Dict[str, float]] = None,
+        statuses: typing.Iterable[int] = (),
+    ) -> None:
+        self.fail = set(fail)
+        self.delays = delays or {}
+        self.statuses = list(statuses)
+        # The texts of every request, one list per POST
+        self.requests = []
+        self.hosts = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.hosts.append(request.url.host)
+        delay = self.delays.get(request.url.host)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0), text="")
+        form = parse_qs(request.content.decode("utf-8"))
+        envelopes = json.loads(form["f.req"][0])[0]
+        texts = []
+        frames = []
+        for _, payload, _, envelope in envelopes:
+            text = json.loads(payload)[0][0]
+            texts.append(text)
+            frames.append(frame(None if text in self.fail else payload, envelope))
+        self.requests.append(texts)
+        return httpx.Response(200, text=")]}'\n\n" + "".join(frames))
+
+    def translator(self, **kwargs) -> Translator:
+        """A Translator sending through this stand-in"""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self))
+        return Translator(_aclient=client, **kwargs)
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from aiogtrans.batcher import MicroBatcher
+
+from .stand_in import StandIn
+
+
+class Recorder:
+    """send function answering item.upper(), items starting with "!" fail on their own"""
+
+    def __init__(self, error: Exception = None) -> None:
+        self.error = error
+        self.batches = []
+
+    async def __call__(self, items, key):
+        self.batches.append((key, list(items)))
+        if self.error is not None:
+            raise self.error
+        return [ValueError(item) if item.startswith("!") else item.upper() for item in items]
+
+
+def test_one_failing_item_does_not_fail_the_batch():
+    send = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(send, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("a"), batcher.submit("!b"), batcher.submit("c"), return_exceptions=True
+        )
+
+    a, b, c = asyncio.run(run())
+
+    assert send.batches == [(None, ["a", "!b", "c"])]
+    assert (a, c) == ("A", "C")
+    assert isinstance(b, ValueError)
+
+
+def test_failing_send_fails_every_caller():
+    send = Recorder(error=ConnectionError("down"))
+
+    async def run():
+        batcher = MicroBatcher(send, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_duplicates_are_sent_once_and_keys_are_separate():
+    send = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(send, window=0.01)
+        return await asyncio.gather(
+            batcher.submit("a", "x"), batcher.submit("a", "x"), batcher.submit("a", "y")
+        )
+
+    assert asyncio.run(run()) == ["A", "A", "A"]
+    assert sorted(send.batches) == [("x", ["a"]), ("y", ["a"])]
+
+
+def test_full_batch_is_sent_without_waiting():
+    send = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(send, window=60, max_size=2)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b")), 1
+        )
+
+    assert asyncio.run(run()) == ["A", "B"]
+
+
+def test_cancelled_caller_is_not_sent():
+    send = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(send, window=0.01)
+        gone = asyncio.ensure_future(batcher.submit("gone"))
+        kept = asyncio.ensure_future(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        gone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        return await kept
+
+    assert asyncio.run(run()) == "KEPT"
+    assert send.batches == [(None, ["kept"])]
+
+
+def test_micro_batcher_isolates_errors():
+    stand_in = StandIn(fail={"Broken"})
+
+    async def run():
+        translator = stand_in.translator(batch_window=0.01)
+        return await asyncio.gather(
+            translator.translate("Good", dest="de"),
+            translator.translate("Broken", dest="de"),
+            translator.translate("Fine", dest="de"),
+            return_exceptions=True,
+        )
+
+    good, broken, fine = asyncio.run(run())
+
+    assert stand_in.requests == [["Good", "Broken", "Fine"]]
+    assert good.text == "[de] Good"
+    assert fine.text == "[de] Fine"
+    assert isinstance(broken, Exception)
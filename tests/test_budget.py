@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+
+from aiogtrans.budget import BudgetExceeded, ByteBudget, estimate
+from aiogtrans.scheduler import Scheduler
+
+from .stand_in import StandIn
+
+
+def test_estimate_grows_with_text():
+    assert estimate(["a" * 1000]) > estimate(["a"]) > estimate([])
+    assert estimate(["ä"]) > estimate(["a"])
+
+
+def test_oversized_request_raises():
+    budget = ByteBudget(100)
+
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(budget.acquire(101))
+    assert budget.in_use == 0
+
+
+def test_waiters_are_served_in_order():
+    budget = ByteBudget(100)
+    order = []
+
+    async def run():
+        held = await budget.acquire(100)
+
+        async def wait(name, size):
+            reservation = await budget.acquire(size)
+            order.append(name)
+            return reservation
+
+        large = asyncio.ensure_future(wait("large", 90))
+        await asyncio.sleep(0)
+        small = asyncio.ensure_future(wait("small", 10))
+        await asyncio.sleep(0)
+        assert budget.stats()["waiting"] == 2
+
+        budget.release(held)
+        for reservation in await asyncio.gather(large, small):
+            budget.release(reservation)
+
+    asyncio.run(run())
+
+    # The small request would have fit first, it still waits for the large one ahead of it
+    assert order == ["large", "small"]
+    assert budget.in_use == 0
+    assert budget.peak == 100
+    assert budget.waits == 2
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    budget = ByteBudget(100)
+
+    async def run():
+        held = await budget.acquire(100)
+        waiter = asyncio.ensure_future(budget.acquire(50))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert budget.stats()["waiting"] == 0
+        budget.release(held)
+
+    asyncio.run(run())
+
+    assert budget.in_use == 0
+
+
+def test_cancel_after_admission_returns_the_bytes():
+    budget = ByteBudget(100)
+
+    async def run():
+        held = await budget.acquire(100)
+        waiter = asyncio.ensure_future(budget.acquire(60))
+        behind = asyncio.ensure_future(budget.acquire(40))
+        await asyncio.sleep(0)
+
+        # The release admits the first waiter, which is cancelled before it resumes
+        budget.release(held)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        budget.release(await behind)
+
+    asyncio.run(run())
+
+    assert budget.in_use == 0
+    assert budget.stats()["waiting"] == 0
+
+
+def test_reservation_grows_with_the_response():
+    budget = ByteBudget(100)
+
+    async def run():
+        async with budget.reserve(10) as reservation:
+            reservation.grow_to(150)
+            assert budget.in_use == 150
+            reservation.grow_to(20)
+            assert budget.in_use == 150
+
+    asyncio.run(run())
+
+    assert budget.in_use == 0
+    assert budget.peak == 150
+
+
+def test_oversized_text_is_packed_into_chunks():
+    stand_in = StandIn()
+    text = " ".join(f"Sentence number {i} is here." for i in range(200))
+
+    result = asyncio.run(
+        stand_in.translator(byte_budget=ByteBudget(40_000)).translate(text, dest="de")
+    )
+
+    assert 1 < len(stand_in.requests) < 10
+    assert result.origin == text
+    assert result.text.replace("[de] ", "") == text
+
+
+def test_oversized_sentence_raises():
+    translator = StandIn().translator(byte_budget=ByteBudget(4096))
+
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(translator.translate("x" * 1000, dest="de"))
+
+
+def test_budget_keeps_scheduler_priorities():
+    stand_in = StandIn()
+    scheduler = Scheduler(concurrency=1)
+    # Room for two requests, the rest used to queue in the budget ahead of the scheduler
+    budget = ByteBudget(2 * estimate(["bulk0"]))
+    translator = stand_in.translator(scheduler=scheduler, byte_budget=budget)
+
+    async def run():
+        await scheduler.acquire()
+        tasks = [
+            asyncio.ensure_future(translator.translate(f"bulk{index}", dest="de", priority="bulk"))
+            for index in range(6)
+        ]
+        await asyncio.sleep(0.01)
+        tasks.append(
+            asyncio.ensure_future(translator.translate("urgent", dest="de", priority="interactive"))
+        )
+        await asyncio.sleep(0.01)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert [texts[0] for texts in stand_in.requests] == ["urgent"] + [
+        f"bulk{index}" for index in range(6)
+    ]
+    assert budget.in_use == 0
+
+
+def test_deadline_covers_the_budget_wait():
+    budget = ByteBudget(10_000)
+    translator = StandIn().translator(byte_budget=budget)
+
+    async def run():
+        held = await budget.acquire(10_000)
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await translator.translate("Hello", dest="de", deadline=0.1)
+        waited = time.monotonic() - started
+        budget.release(held)
+        return waited
+
+    assert asyncio.run(run()) < 0.5
+    assert budget.in_use == 0
+    assert budget.stats()["waiting"] == 0
@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+import pytest
+
+from aiogtrans.bundles import INTERPOLATION_PATTERNS, BundleTranslator, NestedBundle, PoFile
+from aiogtrans.masking import Masker
+
+from .stand_in import StandIn
+
+PO = '''# German translations
+msgid ""
+msgstr ""
+"Language: de\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+
+#: app.py:10
+msgid "Hello %(name)s"
+msgstr ""
+
+#, fuzzy
+msgid "Old message"
+msgstr "Alte Nachricht"
+
+msgctxt "menu"
+msgid "Open"
+msgstr "Öffnen"
+
+msgid "One file"
+msgid_plural "{count} files"
+msgstr[0] ""
+msgstr[1] ""
+
+msgid ""
+"A long message "
+"on two lines"
+msgstr ""
+'''
+
+
+def test_po_round_trip():
+    po = PoFile.parse(PO)
+
+    assert PoFile.parse(po.dumps()).dumps() == po.dumps()
+    assert [text for _, text in po.pending()] == [
+        "Hello %(name)s",
+        "Old message",
+        "One file",
+        "{count} files",
+        "A long message on two lines",
+    ]
+    assert [text for _, text in po.pending(include_fuzzy=False)][1] == "One file"
+
+
+def test_po_bundle_is_filled(tmp_path):
+    path = tmp_path / "de.po"
+    path.write_text(PO, encoding="utf-8")
+    stand_in = StandIn()
+
+    async def run():
+        bundles = BundleTranslator(stand_in.translator(), src="en")
+        bundles.add(PoFile.load(path), "de")
+        return await bundles.run()
+
+    stats = asyncio.run(run())
+    po = PoFile.load(path)
+
+    assert stats == {"languages": 1, "pending": 5, "unique": 5, "failed": 0}
+    assert po.pending(include_fuzzy=False) == []
+    messages = {entry.msgid: entry for entry in po.entries}
+    assert messages["Hello %(name)s"].msgstr == ["[de] Hello %(name)s"]
+    assert messages["One file"].msgstr == ["[de] One file", "[de] {count} files"]
+    assert messages["Open"].msgstr == ["Öffnen"]
+    assert "fuzzy" not in messages["Old message"].flags
+    # Interpolation tokens are masked before they are sent
+    assert any("Hello {0}" in request for request in stand_in.requests)
+
+
+def test_json_bundle_is_filled_in_source_order(tmp_path):
+    source = tmp_path / "en.json"
+    target = tmp_path / "de.json"
+    source.write_text(
+        json.dumps({"title": "Welcome", "menu": {"open": "Open", "items": ["First", "Second"]}}),
+        encoding="utf-8",
+    )
+    target.write_text(json.dumps({"extra": "Bleibt", "menu": {"open": "Öffnen"}}), encoding="utf-8")
+    stand_in = StandIn()
+
+    async def run():
+        bundles = BundleTranslator(stand_in.translator(), src="en")
+        bundles.add(NestedBundle(source, target), "de")
+        return await bundles.run()
+
+    stats = asyncio.run(run())
+
+    assert stats["pending"] == 3
+    assert json.loads(target.read_text(encoding="utf-8")) == {
+        "title": "[de] Welcome",
+        "menu": {"open": "Öffnen", "items": ["[de] First", "[de] Second"]},
+        "extra": "Bleibt",
+    }
+    assert list(json.loads(target.read_text(encoding="utf-8"))) == ["title", "menu", "extra"]
+    assert NestedBundle(source, target).pending() == []
+
+
+@pytest.fixture
+def masker():
+    return Masker(numbers=False, urls=False, emails=False, emoji=False, patterns=INTERPOLATION_PATTERNS)
+
+
+@pytest.mark.parametrize("text", ["Save 50% off today", "100% sure", "A 5 % discount"])
+def test_percent_signs_in_prose_are_not_masked(masker, text):
+    assert masker.mask(text) == (text, [])
+
+
+def test_printf_tokens_are_masked(masker):
+    assert masker.mask("%d files, %-5s and 10%% off") == (
+        "{0} files, {1} and 10{2} off",
+        ["%d", "%-5s", "%%"],
+    )
+
+
+def test_icu_plural_keeps_its_structure(masker):
+    message = "{count, plural, =0 {No {kind}} one {# item} other {# items}}"
+
+    template, originals = masker.mask(message)
+
+    assert template == "{0}No {1}{2}# item{3}# items{4}"
+    translated = template.replace("No", "Keine").replace("item", "Artikel")
+    assert masker.unmask(translated, originals) == (
+        "{count, plural, =0 {Keine {kind}} one {# Artikel} other {# Artikels}}"
+    )
+
+
+def test_icu_select_cases_are_translated(tmp_path):
+    source = tmp_path / "en.json"
+    target = tmp_path / "de.json"
+    source.write_text(
+        json.dumps({"sent": "{gender, select, female {She wrote} other {They wrote}}"}),
+        encoding="utf-8",
+    )
+    stand_in = StandIn()
+
+    async def run():
+        bundles = BundleTranslator(stand_in.translator(), src="en")
+        bundles.add(NestedBundle(source, target), "de")
+        return await bundles.run()
+
+    asyncio.run(run())
+
+    assert json.loads(target.read_text(encoding="utf-8")) == {
+        "sent": "[de] {gender, select, female {She wrote} other {They wrote}}"
+    }
+    assert stand_in.requests == [["{0}She wrote{1}They wrote{2}"]]
@@ -0,0 +1,88 @@
+import asyncio
+
+from aiogtrans.cache import ENTRY_BYTES, Cache, LRUCache, make_key
+
+from .stand_in import StandIn
+
+
+def test_get_and_add():
+    cache = Cache(100)
+
+    assert cache.get("a") == -1
+    cache.add("a", "A")
+
+    assert cache.get("a") == "A"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+
+
+def test_capacity_is_respected():
+    cache = Cache(100)
+    for index in range(1000):
+        cache.add(str(index), index)
+
+    assert len(cache) <= 100
+
+
+def test_hot_keys_survive_a_scan():
+    cache = Cache(100)
+    lru = LRUCache(100)
+    hot = [f"hot{index}" for index in range(50)]
+    for _ in range(5):
+        for key in hot:
+            for store in (cache, lru):
+                if store.get(key) == -1:
+                    store.add(key, key)
+
+    # A bulk job of one-off keys flushes the LRU but not the frequency filtered cache
+    for index in range(1000):
+        for store in (cache, lru):
+            store.add(f"scan{index}", index)
+
+    assert sum(cache.get(key) != -1 for key in hot) >= 45
+    assert sum(lru.get(key) != -1 for key in hot) == 0
+
+
+def test_shards_follow_the_bound_in_use():
+    assert len(Cache(500)._segments) == 1
+    assert len(Cache(50_000)._segments) == 16
+    assert len(Cache(max_bytes=8 * 1000 * ENTRY_BYTES)._segments) == 8
+
+
+def test_hits_are_summed_over_shards():
+    cache = Cache(50_000)
+    for index in range(100):
+        cache.add(str(index), index)
+    for index in range(200):
+        cache.get(str(index))
+
+    assert (cache.hits, cache.misses) == (100, 100)
+
+
+def test_max_bytes_evicts_by_weight():
+    cache = Cache(max_bytes=4096, weigher=lambda key, value: len(value))
+    for index in range(100):
+        cache.add(str(index), "x" * 100)
+
+    assert 0 < len(cache) <= 4096 // 100
+
+
+def test_make_key_separates_languages():
+    assert make_key("Hello", "de", "en") != make_key("Hello", "fr", "en")
+    assert make_key("Hello", "de", "en") != make_key("Hello", "de", "auto")
+
+
+def test_translate_uses_cache():
+    stand_in = StandIn()
+
+    async def run():
+        translator = stand_in.translator(cache=Cache(100))
+        first = await translator.translate("Hello", dest="de")
+        second = await translator.translate("Hello", dest="de")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.text == "[de] Hello"
+    assert second is first
+    assert stand_in.requests == [["Hello"]]
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import runpy
+import sys
+
+import pytest
+
+from .stand_in import StandIn
+
+CLI = runpy.run_path(os.path.join(os.path.dirname(__file__), "..", "translate"))
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def bulk(monkeypatch, argv: list, translator) -> None:
+    monkeypatch.setattr(sys, "argv", ["translate"] + argv)
+    asyncio.run(CLI["bulk"](CLI["parse_args"](), translator))
+
+
+def interrupt_after(translator, calls: int):
+    """Make the translator stop the run like Ctrl-C once it was called this many times"""
+    translate = translator.translate
+    count = 0
+
+    async def interrupted(*args, **kwargs):
+        nonlocal count
+        count += 1
+        if count > calls:
+            raise Interrupted()
+        return await translate(*args, **kwargs)
+
+    translator.translate = interrupted
+    return translator
+
+
+@pytest.fixture
+def lines(tmp_path):
+    source = tmp_path / "in.txt"
+    source.write_text("".join(f"line {index}\n" for index in range(250)), encoding="utf-8")
+    return source
+
+
+def read_output(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_written_in_order(monkeypatch, lines, tmp_path):
+    output = tmp_path / "out.jsonl"
+
+    bulk(monkeypatch, ["-i", str(lines), "-d", "de", "-o", str(output)], StandIn().translator())
+
+    records = read_output(output)
+    assert [record["text"] for record in records] == [f"line {index}" for index in range(250)]
+    assert records[0]["translation"] == "[de] line 0"
+    assert json.loads((tmp_path / "out.jsonl.ckpt").read_text())["records"] == 250
+
+
+def test_resume_after_interruption_writes_every_record_once(monkeypatch, lines, tmp_path):
+    output = tmp_path / "out.jsonl"
+    argv = ["-i", str(lines), "-d", "de", "-o", str(output), "--flush-every", "50", "--concurrency", "4"]
+
+    with pytest.raises(Interrupted):
+        bulk(monkeypatch, argv, interrupt_after(StandIn().translator(), 176))
+    written = len(read_output(output))
+    assert json.loads((tmp_path / "out.jsonl.ckpt").read_text())["records"] == written
+
+    bulk(monkeypatch, argv + ["--resume"], StandIn().translator())
+
+    assert [record["text"] for record in read_output(output)] == [
+        f"line {index}" for index in range(250)
+    ]
+
+
+def test_resume_drops_records_after_the_checkpoint(monkeypatch, lines, tmp_path):
+    output = tmp_path / "out.jsonl"
+    kept = "".join(json.dumps({"text": f"line {index}"}) + "\n" for index in range(2))
+    # The process was killed after writing a third record but before checkpointing it
+    output.write_text(kept + '{"text": "line 2"}\n', encoding="utf-8")
+    checkpoint = tmp_path / "out.jsonl.ckpt"
+    checkpoint.write_text(json.dumps({"records": 2, "offset": len(kept.encode())}))
+
+    bulk(monkeypatch, ["-i", str(lines), "-d", "de", "-o", str(output), "--resume"], StandIn().translator())
+
+    assert [record["text"] for record in read_output(output)] == [
+        f"line {index}" for index in range(250)
+    ]
+
+
+def test_batch_options_are_parsed(monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["translate", "--batch-window", "5", "--batch-size", "16", "--flush-every", "7"]
+    )
+    args = CLI["parse_args"]()
+
+    assert (args.batch_window, args.batch_size, args.flush_every) == (5.0, 16, 7)
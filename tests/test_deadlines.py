@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from aiogtrans import client
+
+from .stand_in import StandIn
+
+
+def test_deadline_bounds_a_slow_request():
+    stand_in = StandIn(delays={"translate.google.com": 1.0})
+    translator = stand_in.translator(service_urls=["translate.google.com"])
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(translator.translate("Hello", dest="de", deadline=0.05))
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_retryable_statuses_are_retried():
+    stand_in = StandIn(statuses=[503, 429])
+    translator = stand_in.translator(retries=2)
+
+    result = asyncio.run(translator.translate("Hello", dest="de"))
+
+    assert result.text == "[de] Hello"
+    assert translator.requests_sent == 3
+
+
+def test_retries_stop_at_the_deadline():
+    stand_in = StandIn(statuses=[503] * 100)
+    translator = stand_in.translator(retries=100)
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(translator.translate("Hello", dest="de", deadline=0.3))
+
+    assert time.monotonic() - started < 0.8
+
+
+def test_transport_errors_are_raised_after_the_last_retry():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    translator = client.Translator(
+        _aclient=httpx.AsyncClient(transport=httpx.MockTransport(handler)), retries=1
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(translator.translate("Hello", dest="de"))
+    assert len(attempts) == 2
+
+
+def test_slow_host_is_hedged(monkeypatch):
+    # The primary request always goes to the first host, the hedge to the other one
+    monkeypatch.setattr(client.random, "choice", lambda candidates: candidates[0])
+    stand_in = StandIn(delays={"slow.test": 1.0})
+    translator = stand_in.translator(
+        service_urls=["slow.test", "fast.test"], hedge_percentile=50, hedge_budget=1.0
+    )
+    for _ in range(20):
+        translator._latency.observe(0.01)
+
+    started = time.monotonic()
+    result = asyncio.run(translator.translate("Hello", dest="de"))
+
+    assert result.text == "[de] Hello"
+    assert time.monotonic() - started < 0.5
+    assert stand_in.hosts == ["slow.test", "fast.test"]
+    assert translator._hedge_budget.hedges == 1
+
+
+def test_hedges_stay_within_the_budget(monkeypatch):
+    monkeypatch.setattr(client.random, "choice", lambda candidates: candidates[0])
+    stand_in = StandIn(delays={"slow.test": 0.05})
+    translator = stand_in.translator(
+        service_urls=["slow.test", "fast.test"], hedge_percentile=50, hedge_budget=0.0
+    )
+    for _ in range(20):
+        translator._latency.observe(0.001)
+
+    asyncio.run(translator.translate("Hello", dest="de"))
+
+    assert stand_in.hosts == ["slow.test"]
+    assert translator._hedge_budget.hedges == 0
@@ -0,0 +1,83 @@
+import asyncio
+
+from aiogtrans.dictionary import extract_alternatives
+
+from .stand_in import StandIn
+
+
+def entry(text: str, gender: str = None) -> list:
+    return [None, None, gender, None, None, [[text, None, None, None, [[text, [5], []]]]]]
+
+
+def parsed(translations: list, dictionary: list = None) -> list:
+    payload = [None, [translations, "de", 1, "en"], "en"]
+    if dictionary is not None:
+        payload.append([None, None, None, None, None, dictionary])
+    return payload
+
+
+def no_fallback(parsed):
+    raise AssertionError("the recursive search must not run")
+
+
+def test_payload_without_dictionary_has_no_alternatives():
+    assert extract_alternatives(parsed([entry("Haus")]), no_fallback) == []
+
+
+def test_dictionary_entries_are_grouped_by_part_of_speech():
+    dictionary = [
+        ["noun", [["Haus", None, ["house", "home"], 1], ["Gebäude", None, ["building"], 2]]],
+        ["verb", [["unterbringen", None, ["house"], 3]]],
+    ]
+
+    alternatives = extract_alternatives(parsed([entry("Haus")], [dictionary]), no_fallback)
+
+    assert [(a.text, a.pos, a.frequency) for a in alternatives] == [
+        ("Haus", "noun", 1),
+        ("Gebäude", "noun", 2),
+        ("unterbringen", "verb", 3),
+    ]
+    assert alternatives[0].synonyms == ["house", "home"]
+
+
+def test_gendered_translations_come_first():
+    translations = [entry("profesora", "(feminine)"), entry("profesor", "(masculine)")]
+
+    alternatives = extract_alternatives(parsed(translations), no_fallback)
+
+    assert [(a.text, a.gender) for a in alternatives] == [
+        ("profesora", "feminine"),
+        ("profesor", "masculine"),
+    ]
+
+
+def test_changed_schema_falls_back_to_the_search():
+    changed = [None, "not a list", "en"]
+
+    alternatives = extract_alternatives(changed, lambda parsed: [["Haus"], ["Heim"]])
+
+    assert [a.text for a in alternatives] == ["Haus", "Heim"]
+
+
+def test_lookup_returns_the_translation():
+    lookup = asyncio.run(StandIn().translator().lookup("house", dest="de", src="en"))
+
+    assert (lookup.word, lookup.translation, lookup.src, lookup.dest) == (
+        "house",
+        "[de] house",
+        "en",
+        "de",
+    )
+    # The answer has no dictionary block, the main translation is not an alternative
+    assert lookup.alternatives == []
+
+
+def test_lookup_many_sends_one_request():
+    stand_in = StandIn()
+    words = ["house", "tree", "house", "cat"]
+
+    lookups = asyncio.run(stand_in.translator().lookup_many(words, dest="de", src="en"))
+
+    assert [lookup.translation for lookup in lookups] == [f"[de] {word}" for word in words]
+    assert stand_in.requests == [["house", "tree", "cat"]]
+    assert all(lookup.alternatives == [] for lookup in lookups)
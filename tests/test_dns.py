@@ -0,0 +1,145 @@
+import asyncio
+import socket
+
+import httpcore
+import httpx
+import pytest
+
+from aiogtrans import Translator
+from aiogtrans.dns import CachingNetworkBackend, DNSCache
+
+
+class Resolver:
+    """getaddrinfo replacement counting lookups, hosts listed in addresses resolve"""
+
+    def __init__(self, addresses: dict) -> None:
+        self.addresses = addresses
+        self.lookups = []
+
+    async def __call__(self, host, port, type=0):
+        self.lookups.append(host)
+        await asyncio.sleep(0.01)
+        if host not in self.addresses:
+            raise socket.gaierror(f"unknown host {host}")
+        return [(socket.AF_INET, type, 6, "", (address, port)) for address in self.addresses[host]]
+
+
+def resolve_with(monkeypatch, resolver: Resolver, coroutine):
+    async def run():
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", resolver)
+        return await coroutine()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_lookups_share_one_query(monkeypatch):
+    cache = DNSCache()
+    resolver = Resolver({"example.com": ["10.0.0.1", "10.0.0.2", "10.0.0.1"]})
+
+    async def run():
+        results = await asyncio.gather(*(cache.resolve("example.com", 443) for _ in range(5)))
+        return results + [await cache.resolve("example.com", 443)]
+
+    results = resolve_with(monkeypatch, resolver, run)
+
+    assert results == [["10.0.0.1", "10.0.0.2"]] * 6
+    assert resolver.lookups == ["example.com"]
+
+
+def test_failed_lookup_is_remembered_until_invalidated(monkeypatch):
+    cache = DNSCache()
+    resolver = Resolver({})
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await cache.resolve("missing.example", 443)
+        cache.invalidate("missing.example")
+        with pytest.raises(OSError):
+            await cache.resolve("missing.example", 443)
+
+    resolve_with(monkeypatch, resolver, run)
+
+    assert resolver.lookups == ["missing.example", "missing.example"]
+
+
+def test_ip_addresses_are_not_looked_up(monkeypatch):
+    resolver = Resolver({})
+
+    async def run():
+        return await DNSCache().resolve("127.0.0.1", 80)
+
+    assert resolve_with(monkeypatch, resolver, run) == ["127.0.0.1"]
+    assert resolver.lookups == []
+
+
+class Backend(httpcore.AsyncNetworkBackend):
+    """Network backend recording connects, addresses listed in down refuse them"""
+
+    def __init__(self, down=()) -> None:
+        self.down = set(down)
+        self.connects = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connects.append(host)
+        if host in self.down:
+            raise httpcore.ConnectError(f"{host} refused")
+        return object()
+
+
+def test_next_address_is_tried_when_one_is_down():
+    cache = DNSCache()
+    cache._entries[("example.com", 443)] = (float("inf"), ["10.0.0.1", "10.0.0.2"])
+    backend = Backend(down={"10.0.0.1"})
+
+    asyncio.run(CachingNetworkBackend(cache, backend).connect_tcp("example.com", 443))
+
+    assert backend.connects == ["10.0.0.1", "10.0.0.2"]
+    assert ("example.com", 443) in cache._entries
+
+
+def test_cache_is_dropped_when_every_address_is_down():
+    cache = DNSCache()
+    cache._entries[("example.com", 443)] = (float("inf"), ["10.0.0.1"])
+
+    with pytest.raises(httpcore.ConnectError):
+        asyncio.run(
+            CachingNetworkBackend(cache, Backend(down={"10.0.0.1"})).connect_tcp("example.com", 443)
+        )
+    assert cache._entries == {}
+
+
+def test_transports_resolve_through_the_cache(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    cache = DNSCache()
+
+    translator = Translator(dns_cache=cache)
+
+    transports = [translator._aclient._transport, *translator._aclient._mounts.values()]
+    # The proxy from the environment is mounted by httpx and resolves through the cache as well
+    assert len(transports) == 2
+    for transport in transports:
+        assert isinstance(transport._pool._network_backend, CachingNetworkBackend)
+        assert transport._pool._network_backend.dns_cache is cache
+
+
+def test_warmup_opens_connections_to_every_host():
+    pings = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        pings.append((request.method, request.url.host))
+        if request.url.host == "down.example":
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200)
+
+    translator = Translator(
+        _aclient=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        service_urls=["127.0.0.1", "down.example"],
+        dns_cache=None,
+        min_connections=3,
+    )
+
+    warmed = asyncio.run(translator.warmup())
+
+    assert warmed == {"127.0.0.1": 3, "down.example": 0}
+    assert pings.count(("HEAD", "127.0.0.1")) == 3
@@ -0,0 +1,55 @@
+import asyncio
+
+from aiogtrans.document import DocumentSession
+
+from .stand_in import StandIn
+
+
+def test_only_changed_segments_are_sent():
+    stand_in = StandIn()
+    session = DocumentSession(stand_in.translator(), dest="de", src="en")
+
+    async def run():
+        first = await session.translate("One. Two. Three.")
+        second = await session.translate("One. Deux. Three. Four.")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.text == "[de] One. [de] Two. [de] Three."
+    assert second.text == "[de] One. [de] Deux. [de] Three. [de] Four."
+    assert second.extra_data == {"segments": 4, "translated": 2, "reused": 2}
+    # Each version is one request, the second only carries the edited segments
+    assert stand_in.requests == [["One.", "Two.", "Three."], ["Deux.", "Four."]]
+
+
+def test_unchanged_document_sends_nothing():
+    stand_in = StandIn()
+    session = DocumentSession(stand_in.translator(), dest="de", src="en")
+
+    async def run():
+        await session.translate("One. Two.")
+        return await session.translate("One. Two.")
+
+    result = asyncio.run(run())
+
+    assert result.text == "[de] One. [de] Two."
+    assert result.extra_data["translated"] == 0
+    assert len(stand_in.requests) == 1
+
+
+def test_state_survives_a_round_trip():
+    stand_in = StandIn()
+    translator = stand_in.translator()
+    session = DocumentSession(translator, dest="de")
+    asyncio.run(session.translate("One. Two."))
+
+    restored = DocumentSession.from_dict(translator, session.to_dict())
+    result = asyncio.run(restored.translate("One. Two. Three."))
+
+    assert result.src == "en"
+    assert result.text == "[de] One. [de] Two. [de] Three."
+    assert stand_in.requests[-1] == ["Three."]
+    # Removed segments are dropped from the state
+    asyncio.run(restored.translate("Three."))
+    assert len(restored.segments) == 1
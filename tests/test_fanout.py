@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from aiogtrans.cache import Cache
+
+from .stand_in import StandIn
+
+
+def test_one_request_for_many_languages():
+    stand_in = StandIn()
+
+    results = asyncio.run(
+        stand_in.translator().translate_to_many("Hello", ["de", "French", "es", "de"], src="en")
+    )
+
+    assert list(results) == ["de", "fr", "es"]
+    assert results["fr"].text == "[fr] Hello"
+    assert stand_in.requests == [["Hello", "Hello", "Hello"]]
+
+
+def test_auto_source_is_detected_once():
+    stand_in = StandIn()
+    dests = ["de", "fr", "es", "it", "pt"]
+
+    results = asyncio.run(
+        stand_in.translator().translate_to_many("Hello", dests, max_envelopes=2)
+    )
+
+    assert [results[dest].text for dest in dests] == [f"[{dest}] Hello" for dest in dests]
+    assert len(stand_in.requests) == 3
+
+
+def test_cached_languages_are_not_sent():
+    stand_in = StandIn()
+    translator = stand_in.translator(cache=Cache(100))
+
+    async def run():
+        await translator.translate("Hello", dest="de", src="en")
+        return await translator.translate_to_many("Hello", ["de", "fr"], src="en")
+
+    results = asyncio.run(run())
+
+    assert results["de"].text == "[de] Hello"
+    assert stand_in.requests == [["Hello"], ["Hello"]]
+
+
+def test_failed_envelope_raises():
+    translator = StandIn(fail={"Hello"}).translator()
+
+    with pytest.raises(Exception):
+        asyncio.run(translator.translate_to_many("Hello", ["de", "fr"], src="en"))
+
+
+def test_unknown_language_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(StandIn().translator().translate_to_many("Hello", ["de", "xx"]))
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from aiogtrans.frame import translate_column
+
+from .stand_in import StandIn
+
+
+def test_list_values_are_translated_once():
+    stand_in = StandIn()
+    column = ["Hello", None, "World", "Hello", 3, ""]
+
+    translated = asyncio.run(
+        translate_column(column, dest="de", src="en", translator=stand_in.translator())
+    )
+
+    assert translated == ["[de] Hello", None, "[de] World", "[de] Hello", 3, ""]
+    assert stand_in.requests == [["Hello", "World"]]
+
+
+def test_pandas_series_keeps_index_and_name():
+    pandas = pytest.importorskip("pandas")
+    column = pandas.Series(["Hello", None, "Hello"], index=[10, 20, 30], name="greeting")
+
+    translated = asyncio.run(
+        translate_column(column, dest="de", src="en", translator=StandIn().translator())
+    )
+
+    assert translated[[10, 30]].tolist() == ["[de] Hello", "[de] Hello"]
+    assert translated.isna().tolist() == [False, True, False]
+    assert translated.dtype == column.dtype
+    assert list(translated.index) == [10, 20, 30]
+    assert translated.name == "greeting"
+
+
+def test_pandas_categorical_comes_back_as_values():
+    pandas = pytest.importorskip("pandas")
+    column = pandas.Series(["Cat", "Dog", "Cat"], dtype="category")
+
+    translated = asyncio.run(
+        translate_column(column, dest="de", src="en", translator=StandIn().translator())
+    )
+
+    assert translated.tolist() == ["[de] Cat", "[de] Dog", "[de] Cat"]
+    assert not isinstance(translated.dtype, pandas.CategoricalDtype)
+
+
+def test_arrow_column_translates_the_dictionary():
+    pyarrow = pytest.importorskip("pyarrow")
+    stand_in = StandIn()
+    column = pyarrow.chunked_array([["Cat", None], ["Dog", "Cat"]])
+
+    translated = asyncio.run(
+        translate_column(column, dest="de", src="en", translator=stand_in.translator())
+    )
+
+    assert translated.type == pyarrow.string()
+    assert translated.to_pylist() == ["[de] Cat", None, "[de] Dog", "[de] Cat"]
+    assert stand_in.requests == [["Cat", "Dog"]]
+
+
+def test_arrow_column_of_other_types_is_untouched():
+    pyarrow = pytest.importorskip("pyarrow")
+    stand_in = StandIn()
+    column = pyarrow.array([1, 2, 3])
+
+    translated = asyncio.run(translate_column(column, translator=stand_in.translator()))
+
+    assert translated is column
+    assert stand_in.requests == []
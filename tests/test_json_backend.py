@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from aiogtrans import json_backend
+
+from .stand_in import StandIn, frame
+
+
+@pytest.fixture(params=json_backend.available())
+def backend(request):
+    previous = json_backend.BACKEND
+    json_backend.use(request.param)
+    yield request.param
+    json_backend.use(previous)
+
+
+def payload(text: str, dest: str = "de") -> str:
+    return json.dumps([[text, "en", dest, True], [None]])
+
+
+def test_parse_frames_by_envelope(backend):
+    translator = StandIn().translator()
+    data = (")]}'\n\n" + frame(payload("One"), "1") + frame(None, "2") + frame(payload("Two"), "3")).encode()
+
+    frames = translator._parse_frames(data)
+
+    assert set(frames) == {"1", "2", "3"}
+    assert frames["2"] is None
+    assert frames["1"][1][0][0][5][0][0] == "[de] One"
+    assert frames["3"][1][0][0][5][0][0] == "[de] Two"
+
+
+def test_parse_frames_spanning_lines(backend):
+    translator = StandIn().translator()
+    body = frame(payload("Hello"), "generic").split("\n", 1)[1]
+    # A frame broken over several lines is read once it is complete
+    broken = body.replace('"wrb.fr", ', '"wrb.fr",\n')
+    data = (")]}'\n\n123\n" + broken + '25\n[["e",4,null,null,100]]\n').encode()
+
+    frames = translator._parse_frames(data)
+
+    assert list(frames) == ["generic"]
+    assert frames["generic"][1][0][0][5][0][0] == "[de] Hello"
+
+
+def test_parse_frames_skips_other_rpcs(backend):
+    translator = StandIn().translator()
+    other = json.dumps([["wrb.fr", "OtherRpc", "[1]", None, None, None, "1"]])
+    data = f")]}}'\n\n{len(other)}\n{other}\n".encode()
+
+    assert translator._parse_frames(data) == {}
+
+
+def test_round_trip(backend):
+    value = {"text": "Grüße", "list": [1, 2.5, None, True]}
+
+    assert json_backend.loads(json_backend.dumps(value)) == value
+    assert json_backend.loads(json_backend.dumps(value).encode()) == value
+
+
+def test_incomplete_json_raises_decode_error(backend):
+    with pytest.raises(json_backend.DecodeError):
+        json_backend.loads(b'[["wrb.fr",')
@@ -0,0 +1,41 @@
+import asyncio
+
+from .stand_in import StandIn
+
+HTML = (
+    "<html><head><title>Hello</title><script>var x = \"Hi\";</script></head>"
+    "<body><p title=\"Tip\">Hello</p><p translate=\"no\">Brand</p><img alt=\"Cat\">"
+    "<p>Good <b>day</b> &amp; night</p></body></html>"
+)
+
+
+def test_text_and_attributes_are_translated_in_place():
+    stand_in = StandIn()
+
+    result = asyncio.run(stand_in.translator().translate_html(HTML, dest="de"))
+
+    assert result.text == (
+        "<html><head><title>[de] Hello</title><script>var x = \"Hi\";</script></head>"
+        "<body><p title=\"[de] Tip\">[de] Hello</p><p translate=\"no\">Brand</p>"
+        "<img alt=\"[de] Cat\"><p>[de] Good <b>[de] day</b> [de] &amp; night</p></body></html>"
+    )
+    assert result.origin == HTML
+
+
+def test_nodes_are_deduplicated_and_packed():
+    stand_in = StandIn()
+
+    result = asyncio.run(stand_in.translator().translate_html(HTML, dest="de"))
+
+    assert result.extra_data == {"nodes": 7, "unique_nodes": 6, "requests": 1}
+    # Markup never reaches the service, only the text of the nodes
+    assert stand_in.requests == [["Hello\nTip\nCat\nGood\nday\n& night"]]
+
+
+def test_small_packs_split_the_nodes():
+    stand_in = StandIn()
+
+    result = asyncio.run(stand_in.translator().translate_html(HTML, dest="de", max_chars=10))
+
+    assert result.extra_data["requests"] == len(stand_in.requests) > 1
+    assert "<b>[de] day</b>" in result.text
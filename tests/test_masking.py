@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from aiogtrans.masking import Masker
+
+from .stand_in import StandIn
+
+
+def test_masking_round_trip():
+    masker = Masker()
+    text = "Order 48213 at https://example.com/a?b=1 costs 3.14, mail me@example.com"
+
+    template, originals = masker.mask(text)
+
+    assert originals == ["48213", "https://example.com/a?b=1", "3.14", "me@example.com"]
+    assert template == "Order {0} at {1} costs {2}, mail {3}"
+    assert masker.unmask(template, originals) == text
+
+
+def test_masking_rejects_lost_placeholders():
+    masker = Masker()
+    template, originals = masker.mask("Call 555 or 777")
+
+    with pytest.raises(ValueError):
+        masker.unmask("Call {0}", originals)
+    with pytest.raises(ValueError):
+        masker.unmask("Call {0} {0} {1}", originals)
+
+
+def test_translate_masks_volatile_spans():
+    stand_in = StandIn()
+
+    result = asyncio.run(
+        stand_in.translator(masker=Masker()).translate("Order 48213 shipped", dest="de")
+    )
+
+    assert stand_in.requests == [["Order {0} shipped"]]
+    assert result.text == "[de] Order 48213 shipped"
+    assert result.origin == "Order 48213 shipped"
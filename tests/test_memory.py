@@ -0,0 +1,71 @@
+import asyncio
+import io
+
+import pytest
+
+from aiogtrans import memory
+from aiogtrans.cache import Cache, make_key
+
+from .stand_in import StandIn
+
+TMX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<tmx version="1.4">
+<header srclang="en-US" segtype="sentence"/>
+<body>
+<tu><tuv xml:lang="en-US"><seg>Hello</seg></tuv><tuv xml:lang="de-DE"><seg>Hallo</seg></tuv><tuv xml:lang="fr"><seg>Bonjour</seg></tuv></tu>
+<tu srclang="*all*"><tuv xml:lang="en"><seg>Cat &amp; dog</seg></tuv><tuv xml:lang="de"><seg>Katze &amp; Hund</seg></tuv></tu>
+</body>
+</tmx>
+"""
+
+
+def test_iter_tmx_yields_every_pair():
+    assert list(memory.iter_tmx(io.BytesIO(TMX))) == [
+        ("en-US", "de-DE", "Hello", "Hallo"),
+        ("en-US", "fr", "Hello", "Bonjour"),
+        ("en", "de", "Cat & dog", "Katze & Hund"),
+        ("de", "en", "Katze & Hund", "Cat & dog"),
+    ]
+
+
+def test_language_codes_are_normalized():
+    assert memory.language("en-US") == "en"
+    assert memory.language("zh_CN") == "zh-cn"
+    assert memory.language("klingon") is None
+
+
+def test_load_seeds_the_cache():
+    cache = Cache(100)
+
+    assert memory.load(cache, io.BytesIO(TMX), format="tmx") == 4
+    assert cache.get(make_key("Hello", "de", "en")).text == "Hallo"
+    assert cache.get(make_key("Hello", "fr", "auto")).text == "Bonjour"
+
+
+def test_loaded_entries_answer_without_a_request():
+    stand_in = StandIn()
+    cache = Cache(100)
+    memory.load(cache, io.BytesIO(TMX), format="tmx")
+
+    result = asyncio.run(stand_in.translator(cache=cache).translate("Hello", dest="de"))
+
+    assert result.text == "Hallo"
+    assert stand_in.requests == []
+
+
+@pytest.mark.parametrize("suffix", memory.FORMATS)
+def test_dump_and_load_round_trip(tmp_path, suffix):
+    cache = Cache(100)
+    memory.load(cache, io.BytesIO(TMX), format="tmx")
+    path = tmp_path / f"memory.{suffix}"
+
+    assert memory.dump(cache, path) == 4
+
+    restored = Cache(100)
+    assert memory.load(restored, path, auto_source=False) == 4
+    assert sorted(memory.entries(restored)) == sorted(memory.entries(cache))
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        memory.dump(Cache(100), tmp_path / "memory.xlsx")
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from aiogtrans.prefilter import Prefilter, script_language
+
+from .stand_in import StandIn
+
+
+@pytest.mark.parametrize(
+    "text, reason",
+    [
+        ("", "whitespace"),
+        ("  \n", "whitespace"),
+        ("--- !!", "punctuation"),
+        ("48213", "number"),
+        ("3.14", "number"),
+        ("12/05/2022", "number"),
+        ("https://example.com/a?b=1", "url"),
+        ("someone@example.com", "email"),
+        ("AB-1234", "sku"),
+        ("👍🎉", "emoji"),
+        ("AB-1234, 250", "mixed"),
+        ("Hello", None),
+        ("3rd place", None),
+        ("Call 555", None),
+    ],
+)
+def test_classify(text, reason):
+    assert Prefilter().classify(text, "de") == reason
+
+
+def test_disabled_kinds_are_translated():
+    prefilter = Prefilter(numbers=False, skus=False)
+
+    assert prefilter.classify("48213", "de") is None
+    assert prefilter.classify("AB-1234", "de") is None
+
+
+def test_extra_patterns():
+    prefilter = Prefilter(patterns=[r"\{\w+\}"])
+
+    assert prefilter.classify("{name}", "de") == "pattern0"
+    assert prefilter.classify("Hi {name}", "de") is None
+
+
+def test_same_script_is_opt_in():
+    assert script_language("한") == "ko"
+    assert script_language("a") is None
+    assert Prefilter().classify("안녕하세요", "ko") is None
+    assert Prefilter(same_script=True).classify("안녕하세요", "ko") == "script"
+    assert Prefilter(same_script=True).classify("안녕하세요", "ja") is None
+    # Shared scripts never count, Cyrillic text may be Russian or Ukrainian
+    assert Prefilter(same_script=True).classify("Привет", "ru") is None
+
+
+def test_stats_count_reasons():
+    prefilter = Prefilter()
+    for text in ("1", "2", "Hello", "a@b.co"):
+        prefilter.classify(text, "de")
+
+    assert prefilter.stats() == {"checked": 4, "skipped": 3, "reasons": {"number": 2, "email": 1}}
+
+
+def test_translate_answers_skipped_texts_without_a_request():
+    stand_in = StandIn()
+    translator = stand_in.translator(prefilter=Prefilter())
+
+    async def run():
+        return await asyncio.gather(
+            translator.translate("48213", dest="de", src="en"),
+            translator.translate("Hello", dest="de", src="en"),
+        )
+
+    number, hello = asyncio.run(run())
+
+    assert (number.text, number.origin, number.dest) == ("48213", "48213", "de")
+    assert number.extra_data["prefilter"] == "number"
+    assert hello.text == "[de] Hello"
+    assert stand_in.requests == [["Hello"]]
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from urllib.parse import urlencode
+
+import httpx
+import pytest
+
+from aiogtrans import Translator
+from aiogtrans.cache import Cache, make_key
+from aiogtrans.replay import RecordingTransport, ReplayMiss, ReplayTransport, prime_cache, request_key
+
+from .stand_in import StandIn
+
+
+def form(envelopes: list, **dumps) -> bytes:
+    freq = [[[rpc, json.dumps(payload, **dumps), None, envelope] for rpc, payload, envelope in envelopes]]
+    return urlencode({"f.req": json.dumps(freq, **dumps)}).encode()
+
+
+def test_request_key_ignores_encoding_details():
+    envelopes = [("MkEWBc", [["Hello", "en", "de", True], [None]], "generic")]
+
+    compact = request_key("POST", "/batchexecute", form(envelopes, separators=(",", ":")))
+    spaced = request_key("POST", "/batchexecute", form(envelopes, indent=2))
+
+    assert compact == spaced
+
+
+def test_request_key_tells_payloads_apart():
+    hello = form([("MkEWBc", [["Hello", "en", "de", True], [None]], "generic")])
+    french = form([("MkEWBc", [["Hello", "en", "fr", True], [None]], "generic")])
+
+    assert request_key("POST", "/b", hello) != request_key("POST", "/b", french)
+    assert request_key("HEAD", "/", b"") == "HEAD /"
+
+
+def test_record_and_replay(tmp_path):
+    archive = tmp_path / "session.jsonl.gz"
+    stand_in = StandIn()
+
+    async def record():
+        transport = RecordingTransport(archive, transport=httpx.MockTransport(stand_in))
+        translator = Translator(_aclient=httpx.AsyncClient(transport=transport))
+        results = [await translator.translate(text, dest="de") for text in ("One", "Two")]
+        await translator.close()
+        return results, transport.recorded
+
+    async def replay():
+        transport = ReplayTransport(archive)
+        translator = Translator(_aclient=httpx.AsyncClient(transport=transport), retries=0)
+        results = [await translator.translate(text, dest="de") for text in ("Two", "One")]
+        with pytest.raises(ReplayMiss):
+            await translator.translate("Three", dest="de")
+        return results, transport
+
+    recorded, count = asyncio.run(record())
+    replayed, transport = asyncio.run(replay())
+
+    assert count == 2
+    assert [result.text for result in recorded] == ["[de] One", "[de] Two"]
+    assert [result.text for result in replayed] == ["[de] Two", "[de] One"]
+    assert (transport.hits, transport.misses) == (2, 1)
+    assert len(stand_in.requests) == 2
+
+
+def test_prime_cache(tmp_path):
+    archive = tmp_path / "session.jsonl.gz"
+
+    async def record():
+        transport = RecordingTransport(archive, transport=httpx.MockTransport(StandIn()))
+        translator = Translator(_aclient=httpx.AsyncClient(transport=transport))
+        await translator.translate("Hello", dest="de", src="en")
+        await translator.close()
+
+    asyncio.run(record())
+    translator = Translator(cache=Cache(100))
+
+    assert prime_cache(translator, archive) == 1
+    assert translator.cache.get(make_key("Hello", "de", "en")).text == "[de] Hello"
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from aiogtrans.scheduler import PriorityClass, RequestShed, Scheduler
+
+from .stand_in import StandIn
+
+
+async def drain(scheduler: Scheduler, calls: list) -> list:
+    """Queue the calls behind one held slot and return the order they were served in"""
+    order = []
+
+    async def call(priority, tenant, name):
+        async with scheduler.slot(priority, tenant):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    await scheduler.acquire()
+    tasks = [asyncio.ensure_future(call(*args)) for args in calls]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_higher_class_is_served_first():
+    scheduler = Scheduler(concurrency=1)
+    calls = [("bulk", None, f"bulk{index}") for index in range(3)]
+    calls += [("interactive", None, f"interactive{index}") for index in range(3)]
+
+    order = asyncio.run(drain(scheduler, calls))
+
+    assert order == ["interactive0", "interactive1", "interactive2", "bulk0", "bulk1", "bulk2"]
+
+
+def test_tenants_share_by_weight():
+    scheduler = Scheduler(concurrency=1, tenant_weights={"heavy": 3})
+    calls = [("bulk", "light", "light") for _ in range(20)]
+    calls += [("bulk", "heavy", "heavy") for _ in range(20)]
+
+    order = asyncio.run(drain(scheduler, calls))
+
+    # The light tenant queued first but the heavy one gets three slots for each of its
+    assert order[:16].count("heavy") == 12
+    assert order[:16].count("light") == 4
+
+
+def test_full_queue_is_shed():
+    scheduler = Scheduler(
+        concurrency=1, classes=[PriorityClass("interactive", max_depth=2)]
+    )
+
+    async def run():
+        await scheduler.acquire()
+        waiting = [asyncio.ensure_future(scheduler.acquire("interactive")) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(RequestShed):
+            await scheduler.acquire("interactive")
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert scheduler.stats()["classes"]["interactive"]["shed"] == 1
+
+
+def test_long_wait_is_shed():
+    scheduler = Scheduler(
+        concurrency=1, classes=[PriorityClass("interactive", max_wait=0.01)]
+    )
+
+    async def run():
+        await scheduler.acquire()
+        with pytest.raises(RequestShed):
+            await scheduler.acquire("interactive")
+        scheduler.release()
+
+    asyncio.run(run())
+
+    assert scheduler.stats() == {"active": 0, "classes": {"interactive": {"queued": 0, "shed": 1}}}
+
+
+def test_untagged_calls_are_not_shed():
+    scheduler = Scheduler(concurrency=2)
+
+    async def call():
+        async with scheduler.slot():
+            await asyncio.sleep(0.001)
+
+    async def run():
+        return await asyncio.gather(*(call() for _ in range(300)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert scheduler.default == "bulk"
+    assert not any(isinstance(result, RequestShed) for result in results)
+
+
+def test_default_class_must_exist():
+    assert Scheduler(default="interactive").default == "interactive"
+    with pytest.raises(ValueError):
+        Scheduler(default="missing")
+
+
+def test_deadline_covers_the_queue():
+    stand_in = StandIn(delays={"translate.google.com": 1.0})
+    scheduler = Scheduler(concurrency=1)
+    translator = stand_in.translator(service_urls=["translate.google.com"], scheduler=scheduler)
+
+    async def run():
+        slow = asyncio.ensure_future(translator.translate("Slow", dest="de"))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await translator.translate("Quick", dest="de", deadline=0.1)
+        waited = time.monotonic() - started
+        await slow
+        return waited
+
+    assert asyncio.run(run()) < 0.5
+    assert scheduler.stats()["active"] == 0
+    assert scheduler.stats()["classes"]["bulk"]["queued"] == 0
+
+
+def test_priority_is_passed_through_translate():
+    stand_in = StandIn()
+    scheduler = Scheduler(concurrency=1)
+    translator = stand_in.translator(scheduler=scheduler)
+
+    async def run():
+        await scheduler.acquire()
+        tasks = [
+            asyncio.ensure_future(translator.translate(f"bulk{index}", dest="de", priority="bulk"))
+            for index in range(3)
+        ]
+        tasks.append(
+            asyncio.ensure_future(translator.translate("urgent", dest="de", priority="interactive"))
+        )
+        await asyncio.sleep(0.01)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert stand_in.requests[0] == ["urgent"]
@@ -0,0 +1,76 @@
+import asyncio
+
+from aiogtrans.cache import Cache
+from aiogtrans.masking import Masker
+from aiogtrans.prefilter import Prefilter
+from aiogtrans.segments import split_segments
+
+from .stand_in import StandIn
+
+
+def test_translate_batch_packs_unique_segments():
+    stand_in = StandIn()
+    texts = [f"Item {i}. Shared heading." for i in range(20)]
+
+    batch = asyncio.run(stand_in.translator().translate_batch(texts, dest="de", max_envelopes=8))
+
+    assert [result.text for result in batch] == [
+        f"[de] Item {i}. [de] Shared heading." for i in range(20)
+    ]
+    assert batch.segments == 40
+    assert batch.unique_segments == 21
+    assert batch.requests == len(stand_in.requests) == 3
+    assert batch.requests_saved == 37
+    assert sorted(text for request in stand_in.requests for text in request) == sorted(
+        [f"Item {i}." for i in range(20)] + ["Shared heading."]
+    )
+
+
+def test_prefiltered_segments_are_checked_once():
+    stand_in = StandIn()
+    prefilter = Prefilter()
+
+    batch = asyncio.run(
+        stand_in.translator(prefilter=prefilter).translate_batch(["12345", "Hello"], dest="de")
+    )
+
+    assert [result.text for result in batch] == ["12345", "[de] Hello"]
+    assert prefilter.stats() == {"checked": 2, "skipped": 1, "reasons": {"number": 1}}
+    assert batch.requests == 1
+    assert stand_in.requests == [["Hello"]]
+
+
+def test_masked_segments_are_sent_alone():
+    stand_in = StandIn()
+    texts = ["Order 48213 shipped. Thanks.", "Thanks."]
+
+    batch = asyncio.run(stand_in.translator(masker=Masker()).translate_batch(texts, dest="de"))
+
+    assert [result.text for result in batch] == [
+        "[de] Order 48213 shipped. [de] Thanks.",
+        "[de] Thanks.",
+    ]
+    assert batch.requests == 2
+    assert sorted(stand_in.requests) == [["Order {0} shipped."], ["Thanks."]]
+
+
+def test_cached_segments_are_not_sent():
+    stand_in = StandIn()
+    translator = stand_in.translator(cache=Cache(100))
+
+    async def run():
+        await translator.translate_batch(["One. Two."], dest="de")
+        return await translator.translate_batch(["Two. One. Three."], dest="de")
+
+    batch = asyncio.run(run())
+
+    assert batch[0].text == "[de] Two. [de] One. [de] Three."
+    assert batch.requests == 1
+    assert stand_in.requests[-1] == ["Three."]
+
+
+def test_split_segments_keeps_separators():
+    pieces = split_segments("  Hello there. How are you?  ")
+
+    assert "".join(pieces) == "  Hello there. How are you?  "
+    assert [piece for piece in pieces[::2] if piece] == ["Hello there.", "How are you?"]
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from aiogtrans import server
+from aiogtrans.cache import Cache
+
+from .stand_in import StandIn
+
+
+def gateway(translator, scenario):
+    """Run scenario(client) against the gateway app around translator"""
+
+    async def run():
+        async with TestClient(TestServer(server.create_app(translator))) as client:
+            return await scenario(client)
+
+    return asyncio.run(run())
+
+
+def test_translate_and_detect():
+    async def scenario(client):
+        translated = await client.post("/translate", json={"text": "Hello", "dest": "de"})
+        detected = await client.post("/detect", json={"text": "Hello"})
+        return await translated.json(), await detected.json()
+
+    translated, detected = gateway(StandIn().translator(), scenario)
+
+    assert translated["text"] == "[de] Hello"
+    assert (translated["src"], translated["dest"], translated["origin"]) == ("en", "de", "Hello")
+    assert detected["lang"] == "en"
+
+
+def test_identical_requests_are_coalesced():
+    stand_in = StandIn(delays={"translate.google.com": 0.05})
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *(client.post("/translate", json={"text": "Hello", "dest": "de"}) for _ in range(5))
+        )
+        bodies = [await response.json() for response in responses]
+        metrics = await (await client.get("/metrics")).text()
+        return bodies, metrics
+
+    bodies, metrics = gateway(
+        stand_in.translator(service_urls=["translate.google.com"]), scenario
+    )
+
+    assert [body["text"] for body in bodies] == ["[de] Hello"] * 5
+    assert stand_in.requests == [["Hello"]]
+    assert "aiogtrans_coalesced_total 4" in metrics
+    assert 'aiogtrans_requests_total{endpoint="translate"} 5' in metrics
+
+
+def test_batch_is_packed_into_one_request():
+    stand_in = StandIn()
+
+    async def scenario(client):
+        response = await client.post(
+            "/batch", json={"texts": ["Hello", "World", "Hello"], "dest": "de", "src": "en"}
+        )
+        return await response.json()
+
+    body = gateway(stand_in.translator(), scenario)
+
+    assert [result["text"] for result in body["results"]] == ["[de] Hello", "[de] World", "[de] Hello"]
+    assert body["requests"] == 1
+    assert stand_in.requests == [["Hello", "World"]]
+
+
+def test_errors_map_to_status_codes():
+    async def scenario(client):
+        statuses = []
+        for path, body in (
+            ("/translate", "not json"),
+            ("/translate", {"text": 1}),
+            ("/translate", {"text": "Hello", "dest": "xx"}),
+            ("/translate", {"text": "Broken", "dest": "de"}),
+        ):
+            kwargs = {"data": body} if isinstance(body, str) else {"json": body}
+            statuses.append((await client.post(path, **kwargs)).status)
+        metrics = await (await client.get("/metrics")).text()
+        return statuses, metrics
+
+    statuses, metrics = gateway(StandIn(fail={"Broken"}).translator(), scenario)
+
+    assert statuses == [400, 400, 400, 502]
+    assert "aiogtrans_errors_total 2" in metrics
+
+
+def test_unknown_paths_share_one_label():
+    async def scenario(client):
+        for index in range(3):
+            await client.get(f"/missing/{index}")
+        await client.get("/health")
+        return await (await client.get("/metrics")).text()
+
+    metrics = gateway(StandIn().translator(), scenario)
+
+    assert 'aiogtrans_requests_total{endpoint="other"} 3' in metrics
+    assert 'aiogtrans_requests_total{endpoint="health"} 1' in metrics
+    assert "missing" not in metrics
+
+
+def test_cache_hits_are_reported():
+    stand_in = StandIn()
+
+    async def scenario(client):
+        for _ in range(2):
+            await client.post("/translate", json={"text": "Hello", "dest": "de"})
+        return await (await client.get("/metrics")).text()
+
+    metrics = gateway(stand_in.translator(cache=Cache(100)), scenario)
+
+    assert stand_in.requests == [["Hello"]]
+    assert "aiogtrans_cache_hits_total 1" in metrics
+    assert "aiogtrans_cache_entries 1" in metrics
+
+
+class Response:
+    """Cached result keeping a raw response of the given size"""
+
+    def __init__(self, size: int) -> None:
+        self._response = type("Body", (), {"content": b"x" * size})()
+        self.extra_data = {"parsed": []}
+
+
+def test_serve_bounds_the_cache_by_bytes(monkeypatch):
+    apps = []
+
+    def run_app(app, host, port):
+        apps.append(asyncio.run(app))
+
+    monkeypatch.setattr(server.web, "run_app", run_app)
+    server.serve(cache_bytes=1024 * 1024)
+
+    translator = apps[0][server.TRANSLATOR_KEY]
+    asyncio.run(translator.close())
+    cache = translator.cache
+    for index in range(100):
+        # Each entry keeps a large raw response alive
+        cache.add(str(index), Response(64 * 1024))
+    # The parsed tree counts as much again as the raw response
+    assert 0 < len(cache) <= 1024 * 1024 // (2 * 64 * 1024)
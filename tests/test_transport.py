@@ -0,0 +1,110 @@
+import asyncio
+import json
+import socket
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import web
+
+from aiogtrans import Translator, urls
+
+from .stand_in import frame
+
+
+class Server:
+    """The stand-in served over plain HTTP by aiohttp, records the Host of every request"""
+
+    def __init__(self) -> None:
+        self.hosts = []
+        self.requests = []
+
+    async def batchexecute(self, request: web.Request) -> web.Response:
+        self.hosts.append(request.host)
+        envelopes = json.loads(parse_qs((await request.read()).decode())["f.req"][0])[0]
+        self.requests.append([json.loads(payload)[0][0] for _, payload, _, _ in envelopes])
+        frames = "".join(frame(payload, envelope) for _, payload, _, envelope in envelopes)
+        return web.Response(text=")]}'\n\n" + frames)
+
+    async def run(self, scenario):
+        app = web.Application()
+        app.router.add_post("/_/TranslateWebserverUi/data/batchexecute", self.batchexecute)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await scenario(f"127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+        finally:
+            await runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def plain_http(monkeypatch):
+    monkeypatch.setattr(urls, "TRANSLATE_RPC", "http://{host}/_/TranslateWebserverUi/data/batchexecute")
+    for name in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_translate_through_aiohttp():
+    server = Server()
+
+    async def scenario(host):
+        translator = Translator(service_urls=[host], backend="aiohttp", dns_cache=None)
+        try:
+            single = await translator.translate("Hello", dest="de", src="en")
+            batch = await translator.translate_batch(["One", "Two", "One"], dest="de", src="en")
+            return single, batch
+        finally:
+            await translator.close()
+
+    single, batch = asyncio.run(server.run(scenario))
+
+    assert single.text == "[de] Hello"
+    assert single._response.http_version == "HTTP/1.1"
+    assert [result.text for result in batch] == ["[de] One", "[de] Two", "[de] One"]
+    assert server.requests == [["Hello"], ["One", "Two"]]
+
+
+def test_proxy_from_lower_case_environment(monkeypatch):
+    server = Server()
+
+    async def scenario(host):
+        # The stand-in acts as the proxy, requests for the service host reach it in absolute form
+        monkeypatch.setenv("http_proxy", f"http://{host}")
+        translator = Translator(service_urls=["translate.invalid"], backend="aiohttp", dns_cache=None)
+        try:
+            return await translator.translate("Hello", dest="de", src="en")
+        finally:
+            await translator.close()
+
+    result = asyncio.run(server.run(scenario))
+
+    assert result.text == "[de] Hello"
+    assert server.hosts == ["translate.invalid"]
+
+
+def test_connection_errors_are_raised_as_httpx_errors():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        translator = Translator(
+            service_urls=[f"127.0.0.1:{port}"], backend="aiohttp", dns_cache=None, retries=0
+        )
+        try:
+            await translator.translate("Hello", dest="de", src="en")
+        finally:
+            await translator.close()
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(run())
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        Translator(backend="requests")